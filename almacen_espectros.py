@@ -0,0 +1,145 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from configuracion import DIRECTORIOS_COMANDOS, DIRECTORIO_CACHE_ESPECTROS
+from entrenamiento_comandos import (
+    obtener_rutas_wav_directorio,
+    _seleccionar_directorio_existente,
+    cargar_senal_entrenamiento,
+    extraer_espectro_entrenamiento,
+)
+from banco_filtros import bordes_subbandas_lineales, bordes_subbandas_mel, reducir_subbandas
+from perfiles_reconocimiento import obtener_perfil
+from pipeline_caracteristicas import configuracion_pipeline, calcular_huella
+
+def clave_preprocesamiento(perfil):
+    return calcular_huella(perfil, incluir_subbandas=False)
+
+def _firma_archivo(ruta):
+    estado = Path(ruta).stat()
+    return f"{estado.st_size}:{estado.st_mtime_ns}"
+
+class AlmacenEspectros:
+    def __init__(self, perfil=None, directorio=DIRECTORIO_CACHE_ESPECTROS):
+        self.perfil = obtener_perfil(perfil)
+        self.clave = clave_preprocesamiento(self.perfil)
+        self.ruta_archivo = Path(directorio) / f"espectros_{self.clave}.npz"
+        self._entradas = {}
+        self._modificado = False
+        self._cargar()
+    
+    def _cargar(self):
+        if not self.ruta_archivo.exists():
+            return
+        try:
+            with np.load(self.ruta_archivo) as datos:
+                for ruta, firma, comando, espectro in zip(
+                    datos["rutas"], datos["firmas"], datos["comandos"], datos["espectros"]
+                ):
+                    self._entradas[str(ruta)] = (str(firma), str(comando), espectro)
+        except Exception as e:
+            print(f"⚠ Almacén de espectros ilegible ({self.ruta_archivo.name}): {e}")
+            self._entradas = {}
+    
+    def __len__(self):
+        return len(self._entradas)
+    
+    def buscar(self, ruta, comando):
+        entrada = self._entradas.get(str(ruta))
+        if entrada is not None and entrada[0] == _firma_archivo(ruta) and entrada[1] == comando:
+            return entrada[2]
+        return None
+    
+    def agregar(self, ruta, comando, espectro):
+        self._entradas[str(ruta)] = (_firma_archivo(ruta), comando, np.asarray(espectro, dtype=np.float32))
+        self._modificado = True
+    
+    def obtener(self, ruta, comando):
+        espectro = self.buscar(ruta, comando)
+        if espectro is None:
+            senal = cargar_senal_entrenamiento(ruta)
+            espectro = extraer_espectro_entrenamiento(senal, self.perfil)
+            self.agregar(ruta, comando, espectro)
+        return espectro
+    
+    def guardar(self):
+        if not self._modificado:
+            return
+        self.ruta_archivo.parent.mkdir(parents=True, exist_ok=True)
+        rutas = sorted(self._entradas)
+        temporal = self.ruta_archivo.with_suffix(".tmp.npz")
+        np.savez(
+            temporal,
+            rutas=np.array(rutas),
+            firmas=np.array([self._entradas[r][0] for r in rutas]),
+            comandos=np.array([self._entradas[r][1] for r in rutas]),
+            espectros=np.vstack([self._entradas[r][2] for r in rutas]).astype(np.float32),
+            config=np.array(json.dumps(configuracion_pipeline(self.perfil, incluir_subbandas=False))),
+        )
+        temporal.replace(self.ruta_archivo)
+        self._modificado = False
+    
+    def matriz(self, rutas=None):
+        if rutas is None:
+            rutas = sorted(self._entradas)
+        rutas = [str(r) for r in rutas]
+        espectros = np.vstack([self._entradas[r][2] for r in rutas])
+        etiquetas = np.array([self._entradas[r][1] for r in rutas])
+        return espectros, etiquetas, rutas
+    
+    def energias(self, K=None, bordes=None, escala="lineal", rutas=None):
+        espectros, etiquetas, _ = self.matriz(rutas)
+        if bordes is None:
+            bordes = calcular_bordes_subbandas(self.perfil, K, escala)
+        return reducir_subbandas(espectros, bordes), etiquetas
+
+def calcular_bordes_subbandas(perfil, K=None, escala="lineal"):
+    perfil = obtener_perfil(perfil)
+    K = perfil.K if K is None else K
+    if escala == "lineal":
+        return bordes_subbandas_lineales(perfil.N // 2, K)
+    if escala == "mel":
+        return bordes_subbandas_mel(perfil.N // 2, K, perfil.fs)
+    raise ValueError(f"Escala de sub-bandas desconocida: {escala}")
+
+def listar_corpus(directorios_comandos=DIRECTORIOS_COMANDOS):
+    corpus = []
+    for nombre_comando, rutas_candidatas in directorios_comandos.items():
+        directorio = _seleccionar_directorio_existente(rutas_candidatas)
+        corpus.extend((nombre_comando, ruta) for ruta in obtener_rutas_wav_directorio(directorio))
+    return corpus
+
+def construir_almacen(directorios_comandos=DIRECTORIOS_COMANDOS, perfil=None):
+    almacen = AlmacenEspectros(perfil)
+    for nombre_comando, ruta in listar_corpus(directorios_comandos):
+        try:
+            almacen.obtener(ruta, nombre_comando)
+        except Exception as e:
+            print(f"  ✗ Error en {ruta.name}: {e}")
+    almacen.guardar()
+    return almacen
+
+def explorar_disposiciones_subbandas(perfil=None, valores_K=(8, 12, 16, 24, 32), escalas=("lineal", "mel")):
+    from evaluacion_perfiles import validacion_cruzada
+    
+    inicio = time.perf_counter()
+    almacen = construir_almacen(DIRECTORIOS_COMANDOS, perfil)
+    print(f"✓ Almacén {almacen.ruta_archivo} ({len(almacen)} espectros) en {time.perf_counter() - inicio:.2f}s")
+    
+    espectros, etiquetas, _ = almacen.matriz()
+    print(f"\n{'Escala':<10}{'K':>5}{'Exactitud':>12}{'Tiempo(ms)':>13}")
+    print(f"{'-'*40}")
+    for escala in escalas:
+        for K in valores_K:
+            inicio = time.perf_counter()
+            energias = reducir_subbandas(espectros, calcular_bordes_subbandas(almacen.perfil, K, escala))
+            exactitud = validacion_cruzada(energias, etiquetas)
+            duracion_ms = 1000.0 * (time.perf_counter() - inicio)
+            print(f"{escala:<10}{K:>5}{100 * exactitud:>11.1f}%{duracion_ms:>13.2f}")
+
+if __name__ == "__main__":
+    explorar_disposiciones_subbandas(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,7 +1,10 @@
 import numpy as np
-from scipy.signal import get_window
+from scipy.signal import butter, sosfilt, lfilter
 
-def calcular_vector_energias_temporal(senal, fs, N, K, window="hamming"):
+from configuracion import PREENFASIS_ALPHA, PASO_BANCO_IIR_MS
+from perfiles_reconocimiento import obtener_ventana_analisis
+
+def calcular_espectro_potencia(senal, N, window="hamming"):
     x = senal - np.mean(senal)
     
     x = np.append(x[0], x[1:] - 0.97 * x[:-1])
@@ -14,36 +17,160 @@ def calcular_vector_energias_temporal(senal, fs, N, K, window="hamming"):
     else:
         xN = x
     
-    if window.lower() == "none" or window == "rect":
-        w = np.ones(N)
-    else:
-        w = get_window(window, N, fftbins=True)
+    w = obtener_ventana_analisis(window, N)
     
     xN_windowed = xN * w
     
-    X = np.fft.fft(xN_windowed, n=N)
+    X = np.fft.rfft(xN_windowed, n=N)
     
     N_half = N // 2
-    X_positivas = X[:N_half]
+    potencia = (1.0 / N) * np.abs(X[:N_half]) ** 2
     
+    return potencia.astype(np.float32)
+
+def bordes_subbandas_lineales(N_half, K):
     puntos_por_subbanda = N_half // K
+    bordes = np.arange(K + 1) * puntos_por_subbanda
+    bordes[-1] = N_half
+    return bordes
+
+def bordes_subbandas_mel(N_half, K, fs):
+    mel_max = 2595.0 * np.log10(1.0 + (fs / 2) / 700.0)
+    frecuencias = 700.0 * (10 ** (np.linspace(0.0, mel_max, K + 1) / 2595.0) - 1.0)
+    bordes = np.round(frecuencias / (fs / 2) * N_half).astype(int)
+    bordes = np.maximum(bordes, np.arange(K + 1))
+    bordes[-1] = N_half
+    return bordes
+
+def reducir_subbandas(espectro_potencia, bordes):
+    energias = np.add.reduceat(espectro_potencia, bordes[:-1], axis=-1, dtype=np.float64)
+    return energias.astype(np.float32)
+
+def calcular_vector_energias_temporal(senal, fs, N, K, window="hamming"):
+    espectro = calcular_espectro_potencia(senal, N, window)
+    return reducir_subbandas(espectro, bordes_subbandas_lineales(N // 2, K))
+
+def disenar_secciones_subbandas(fs, N, K, orden=2):
+    nyquist = fs / 2
+    frecuencias = bordes_subbandas_lineales(N // 2, K) * fs / N
+    secciones = []
+    for k in range(K):
+        inferior, superior = frecuencias[k] / nyquist, frecuencias[k + 1] / nyquist
+        if k == 0:
+            sos = butter(2 * orden, superior, btype='low', output='sos')
+        elif k == K - 1:
+            sos = butter(2 * orden, inferior, btype='high', output='sos')
+        else:
+            sos = butter(orden, [inferior, superior], btype='band', output='sos')
+        secciones.append(sos)
+    return np.stack(secciones)
+
+def matriz_bloque_secciones(sos, L):
+    # Respuesta exacta de sosfilt a un bloque de L muestras como una sola matriz:
+    # [y; estado_final] = M @ [x; estado_inicial], con el estado en el formato zi de sosfilt.
+    S = 2 * len(sos)
+    entradas = np.zeros((L + S, L))
+    entradas[:L] = np.eye(L)
+    zi = np.zeros((len(sos), L + S, 2))
+    for i in range(S):
+        zi[i // 2, L + i, i % 2] = 1.0
+    y, zf = sosfilt(sos, entradas, axis=-1, zi=zi)
+    M = np.empty((L + S, L + S))
+    M[:L] = y.T
+    M[L:] = zf.transpose(0, 2, 1).reshape(S, L + S)
+    return M
+
+class BancoFiltrosIIR:
+    def __init__(self, fs, N, K, window="hamming", paso_ms=PASO_BANCO_IIR_MS, constante_tiempo_ms=None):
+        self.fs = fs
+        self.K = K
+        self.paso = L = max(1, int(round(paso_ms * fs / 1000)))
+        
+        seccion_preenfasis = np.array([[1.0, -PREENFASIS_ALPHA, 0.0, 1.0, 0.0, 0.0]])
+        self.secciones = disenar_secciones_subbandas(fs, N, K)
+        self.matrices = np.stack([
+            matriz_bloque_secciones(np.vstack([seccion_preenfasis, sos]), L) for sos in self.secciones
+        ])
+        
+        if constante_tiempo_ms is None:
+            constante_tiempo_ms = 250.0 * N / fs
+        alpha = np.exp(-1000.0 / (constante_tiempo_ms * fs))
+        self._decaimiento = alpha ** L
+        self._pesos_integrador = (1.0 - alpha) * alpha ** np.arange(L - 1, -1, -1)
+        
+        # Parseval: la suma de (1/N)|X_k|^2 sobre medio espectro equivale a
+        # 0.5 * sum(w^2) veces la potencia media, igual que calcular_espectro_potencia
+        # tras normalizar la ventana a RMS 0.1.
+        w = obtener_ventana_analisis(window, N)
+        self.escala = 0.5 * float(np.dot(w, w)) * 0.01
+        
+        self._entrada = np.zeros((K, self.matrices.shape[1], 1))
+        self._salida = np.zeros_like(self._entrada)
+        self._cuadrados = np.zeros((K, L))
+        self._pendiente = np.zeros(L)
+        self.reiniciar()
     
-    energias = np.zeros(K, dtype=np.float32)
+    def reiniciar(self):
+        self._entrada[:, self.paso:] = 0.0
+        self._potencia_bandas = np.zeros(self.K)
+        self._potencia_total = 0.0
+        self._fase = 0
+        self.energias = np.zeros(self.K, dtype=np.float32)
+        self.potencia_emitida = np.zeros(0)
     
-    for i in range(K):
-        inicio = i * puntos_por_subbanda
+    def _procesar_paso(self, x):
+        L = self.paso
+        self._entrada[:, :L, 0] = x
+        np.matmul(self.matrices, self._entrada, out=self._salida)
+        self._entrada[:, L:] = self._salida[:, L:]
         
-        if i == K - 1:
-            fin = N_half
-        else:
-            fin = (i + 1) * puntos_por_subbanda
+        np.square(self._salida[:, :L, 0], out=self._cuadrados)
+        self._potencia_bandas *= self._decaimiento
+        self._potencia_bandas += self._cuadrados @ self._pesos_integrador
+        self._potencia_total = self._decaimiento * self._potencia_total + np.dot(x * x, self._pesos_integrador)
+        return self._potencia_bandas * (self.escala / max(self._potencia_total, 1e-12)), self._potencia_total
+    
+    def procesar(self, bloque):
+        x = np.asarray(bloque, dtype=np.float64)
+        L = self.paso
+        energias, potencias = [], []
+        
+        i = 0
+        if self._fase:
+            i = min(len(x), L - self._fase)
+            self._pendiente[self._fase:self._fase + i] = x[:i]
+            self._fase += i
+            if self._fase == L:
+                e, p = self._procesar_paso(self._pendiente)
+                energias.append(e)
+                potencias.append(p)
+                self._fase = 0
+        
+        while i + L <= len(x):
+            e, p = self._procesar_paso(x[i:i + L])
+            energias.append(e)
+            potencias.append(p)
+            i += L
         
-        Xi = X_positivas[inicio:fin]
+        if i < len(x):
+            self._fase = len(x) - i
+            self._pendiente[:self._fase] = x[i:]
         
-        Ei = (1.0 / N) * np.sum(np.abs(Xi) ** 2)
-        energias[i] = Ei
+        self.potencia_emitida = np.array(potencias)
+        if not energias:
+            return np.zeros((0, self.K), dtype=np.float32)
+        energias = np.array(energias, dtype=np.float32)
+        self.energias = energias[-1]
+        return energias
     
-    return energias
+    def extraer(self, senal):
+        # Modo por lotes: cada ventana es una emisión aislada, como las del entrenamiento;
+        # el estado de procesar() no se arrastra entre capturas
+        self.reiniciar()
+        energias = self.procesar(senal)
+        if len(energias) == 0:
+            return self.energias
+        return energias[int(np.argmax(self.potencia_emitida))]
 
 def calcular_vector_energias(espectro_magnitud, numero_subbandas):
     return np.zeros(numero_subbandas, dtype=np.float32)
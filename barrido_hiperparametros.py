@@ -0,0 +1,203 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from configuracion import (
+    DIRECTORIOS_COMANDOS,
+    FRECUENCIA_CORTE_PB,
+    ORDEN_FILTRO,
+    N_FFT,
+    NUMERO_SUBBANDAS,
+    VENTANA,
+    DURACION_GRABACION_SEGUNDOS,
+)
+from entrenamiento_comandos import (
+    cargar_senal_entrenamiento,
+    preprocesar_senal_entrenamiento,
+    espectro_desde_senal_preprocesada,
+    extraer_vector_entrenamiento,
+    entrenar_modelo_comandos,
+)
+from banco_filtros import bordes_subbandas_lineales, reducir_subbandas
+from almacen_espectros import AlmacenEspectros, listar_corpus
+from evaluacion_perfiles import validacion_cruzada
+from perfiles_reconocimiento import PerfilReconocimiento
+
+ESPACIO_BUSQUEDA_DEFECTO = {
+    "frecuencia_corte": [3000, FRECUENCIA_CORTE_PB, 4000, 5000],
+    "orden_filtro": [2, ORDEN_FILTRO, 6],
+    "N": [1024, 2048, N_FFT],
+    "window": [VENTANA, "hann", "blackman"],
+    "K": [8, 12, NUMERO_SUBBANDAS, 24, 32],
+}
+
+PARAMETROS_PREFIJO = ("frecuencia_corte", "orden_filtro", "N", "window")
+
+ARCHIVO_MEJOR_MODELO = Path("umbrales_barrido_mejor.json")
+ARCHIVO_RESULTADOS = Path("resultados_barrido.csv")
+
+MUESTRAS_CRONOMETRO = 25
+
+def crear_perfil_barrido(configuracion, archivo_umbrales=ARCHIVO_MEJOR_MODELO):
+    return PerfilReconocimiento(
+        "barrido",
+        N=configuracion["N"],
+        duracion=DURACION_GRABACION_SEGUNDOS,
+        archivo_umbrales=archivo_umbrales,
+        K=configuracion["K"],
+        window=configuracion["window"],
+        frecuencia_corte=configuracion["frecuencia_corte"],
+        orden_filtro=configuracion["orden_filtro"],
+    )
+
+def generar_configuraciones(espacio, muestras_aleatorias=None, semilla=0):
+    nombres = list(espacio)
+    rejilla = [dict(zip(nombres, valores)) for valores in itertools.product(*(espacio[n] for n in nombres))]
+    if muestras_aleatorias is not None and muestras_aleatorias < len(rejilla):
+        rejilla = random.Random(semilla).sample(rejilla, muestras_aleatorias)
+    return rejilla
+
+def agrupar_por_prefijo(configuraciones):
+    grupos = {}
+    for configuracion in configuraciones:
+        prefijo = tuple(configuracion[p] for p in PARAMETROS_PREFIJO)
+        grupos.setdefault(prefijo, set()).add(configuracion["K"])
+    return [(prefijo, sorted(valores_K)) for prefijo, valores_K in sorted(grupos.items(), key=lambda g: str(g[0]))]
+
+_senales_cargadas = {}
+_senales_preprocesadas = {"clave": None, "senales": {}}
+
+def _senal_preprocesada(ruta, perfil):
+    clave = (perfil.frecuencia_corte, perfil.orden_filtro)
+    if _senales_preprocesadas["clave"] != clave:
+        _senales_preprocesadas["clave"] = clave
+        _senales_preprocesadas["senales"] = {}
+    senales = _senales_preprocesadas["senales"]
+    if ruta not in senales:
+        if ruta not in _senales_cargadas:
+            _senales_cargadas[ruta] = cargar_senal_entrenamiento(ruta)
+        senales[ruta] = preprocesar_senal_entrenamiento(_senales_cargadas[ruta], perfil)
+    return senales[ruta]
+
+def _evaluar_grupo(tarea):
+    prefijo, valores_K, corpus, pliegues = tarea
+    configuracion = dict(zip(PARAMETROS_PREFIJO, prefijo))
+    perfil = crear_perfil_barrido(dict(configuracion, K=valores_K[0]))
+    
+    inicio = time.perf_counter()
+    almacen = AlmacenEspectros(perfil)
+    for nombre_comando, ruta in corpus:
+        if almacen.buscar(ruta, nombre_comando) is None:
+            espectro = espectro_desde_senal_preprocesada(_senal_preprocesada(ruta, perfil), perfil)
+            almacen.agregar(ruta, nombre_comando, espectro)
+    almacen.guardar()
+    espectros, etiquetas, _ = almacen.matriz([ruta for _, ruta in corpus])
+    tiempo_espectros = time.perf_counter() - inicio
+    
+    paso = max(1, len(corpus) // MUESTRAS_CRONOMETRO)
+    subconjunto = [
+        _senales_cargadas[ruta] if ruta in _senales_cargadas else cargar_senal_entrenamiento(ruta)
+        for _, ruta in corpus[::paso]
+    ]
+    
+    resultados = []
+    for K in valores_K:
+        # Un perfil nuevo por K: los pipelines en caché guardan su perfil y no deben cambiar de K
+        perfil_K = crear_perfil_barrido(dict(configuracion, K=K))
+        inicio = time.perf_counter()
+        energias = reducir_subbandas(espectros, bordes_subbandas_lineales(perfil_K.N // 2, K))
+        exactitud = validacion_cruzada(energias, etiquetas, pliegues)
+        tiempo_evaluacion = time.perf_counter() - inicio
+        
+        inicio = time.perf_counter()
+        for senal in subconjunto:
+            extraer_vector_entrenamiento(senal, perfil_K)
+        tiempo_utterance_ms = 1000.0 * (time.perf_counter() - inicio) / len(subconjunto)
+        
+        resultados.append(dict(
+            configuracion,
+            K=K,
+            exactitud=exactitud,
+            tiempo_utterance_ms=tiempo_utterance_ms,
+            tiempo_barrido_s=tiempo_evaluacion + tiempo_espectros / len(valores_K),
+        ))
+    return resultados
+
+def ejecutar_barrido(espacio=None, muestras_aleatorias=None, semilla=0, pliegues=5, procesos=None,
+                     directorios_comandos=DIRECTORIOS_COMANDOS):
+    espacio = espacio or ESPACIO_BUSQUEDA_DEFECTO
+    configuraciones = generar_configuraciones(espacio, muestras_aleatorias, semilla)
+    grupos = agrupar_por_prefijo(configuraciones)
+    corpus = listar_corpus(directorios_comandos)
+    procesos = procesos or os.cpu_count() or 1
+    
+    print(f"Barrido: {len(configuraciones)} configuraciones, {len(grupos)} prefijos comunes, "
+          f"{len(corpus)} grabaciones, {procesos} procesos")
+    
+    tareas = [(prefijo, valores_K, corpus, pliegues) for prefijo, valores_K in grupos]
+    tamanio_lote = max(1, len(tareas) // (procesos * 2))
+    
+    inicio = time.perf_counter()
+    resultados = []
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        for i, resultados_grupo in enumerate(ejecutor.map(_evaluar_grupo, tareas, chunksize=tamanio_lote), 1):
+            resultados.extend(resultados_grupo)
+            print(f"  Progreso: {i}/{len(tareas)} prefijos")
+    print(f"✓ Barrido completado en {time.perf_counter() - inicio:.1f}s")
+    
+    resultados.sort(key=lambda r: (-r["exactitud"], r["tiempo_utterance_ms"]))
+    return resultados
+
+def imprimir_tabla_barrido(resultados, limite=20):
+    print(f"\n{'='*92}")
+    print(f"{'fc(Hz)':>8}{'orden':>7}{'N':>7}{'ventana':>11}{'K':>5}{'Exactitud':>12}"
+          f"{'t utt(ms)':>12}{'t barrido(s)':>14}")
+    print(f"{'-'*92}")
+    for r in resultados[:limite]:
+        print(f"{r['frecuencia_corte']:>8}{r['orden_filtro']:>7}{r['N']:>7}{r['window']:>11}{r['K']:>5}"
+              f"{100 * r['exactitud']:>11.1f}%{r['tiempo_utterance_ms']:>12.3f}{r['tiempo_barrido_s']:>14.3f}")
+    print(f"{'='*92}\n")
+
+def guardar_resultados_barrido(resultados, ruta=ARCHIVO_RESULTADOS):
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=list(resultados[0]))
+        escritor.writeheader()
+        escritor.writerows(resultados)
+
+def entrenar_mejor_configuracion(resultados, directorios_comandos=DIRECTORIOS_COMANDOS,
+                                 archivo_umbrales=ARCHIVO_MEJOR_MODELO):
+    mejor = resultados[0]
+    perfil = crear_perfil_barrido(mejor, archivo_umbrales)
+    modelo = entrenar_modelo_comandos(directorios_comandos, perfil)
+    return mejor, modelo
+
+def main():
+    parser = argparse.ArgumentParser(description="Barrido de hiperparámetros del reconocedor")
+    parser.add_argument("--espacio", type=Path, help="JSON con listas de valores por parámetro")
+    parser.add_argument("--aleatorio", type=int, help="Número de configuraciones aleatorias de la rejilla")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--pliegues", type=int, default=5)
+    parser.add_argument("--procesos", type=int)
+    args = parser.parse_args()
+    
+    espacio = None
+    if args.espacio:
+        with open(args.espacio, "r", encoding="utf-8") as f:
+            espacio = dict(ESPACIO_BUSQUEDA_DEFECTO, **json.load(f))
+    
+    resultados = ejecutar_barrido(espacio, args.aleatorio, args.semilla, args.pliegues, args.procesos)
+    imprimir_tabla_barrido(resultados)
+    guardar_resultados_barrido(resultados)
+    mejor, _ = entrenar_mejor_configuracion(resultados)
+    print(f"✓ Resultados guardados en: {ARCHIVO_RESULTADOS}")
+    print(f"✓ Mejor configuración: {json.dumps({k: mejor[k] for k in ESPACIO_BUSQUEDA_DEFECTO})}")
+    print(f"✓ Modelo guardado en: {ARCHIVO_MEJOR_MODELO}")
+
+if __name__ == "__main__":
+    main()
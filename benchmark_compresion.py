@@ -0,0 +1,160 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from compresion_dct import (
+    aplicar_dct_bloques,
+    idct_bloques,
+    eliminar_coeficientes_pequenos,
+    eliminar_coeficientes_por_bloque,
+    comprimir_imagen_dct_multiple,
+    descomprimir_imagen_dct,
+    calcular_metricas_compresion,
+)
+
+ARCHIVO_BASE_BENCHMARK = Path("benchmark_compresion_base.json")
+TAMANIOS_IMAGEN = (256, 1024, 2048, 4096, 8192)
+TAMANIOS_IMAGEN_POR_DEFECTO = (256, 1024, 2048)
+TAMANIOS_BLOQUE = (8, 16)
+PORCENTAJES_BARRIDO = (50, 75, 90, 95, 99)
+TOLERANCIA_TIEMPO = 0.50
+TOLERANCIA_MEMORIA = 0.10
+
+def generar_imagen_sintetica(lado, semilla=0):
+    rng = np.random.default_rng(semilla)
+    eje = np.arange(lado, dtype=np.float32)
+    imagen = 128 + 60 * np.sin(eje / 23)[None, :] + 50 * np.cos(eje / 17)[:, None]
+    imagen += rng.integers(-20, 21, size=(lado, lado), dtype=np.int8)
+    return np.clip(imagen, 0, 255).astype(np.uint8)
+
+def medir_tiempo(funcion, repeticiones):
+    funcion()
+    tiempos = np.empty(repeticiones)
+    for i in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos[i] = time.perf_counter() - inicio
+    return 1000.0 * tiempos
+
+def medir_memoria_pico(funcion):
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        funcion()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+def etapas_compresion(imagen, tamanio_bloque):
+    B = tamanio_bloque
+    dct, _ = aplicar_dct_bloques(imagen, B)
+    filtrados, eliminados = eliminar_coeficientes_pequenos(dct, 90)
+    reconstruida = descomprimir_imagen_dct(filtrados, imagen.shape, B)
+    
+    return {
+        "dct": lambda: aplicar_dct_bloques(imagen, B),
+        "idct": lambda: idct_bloques(filtrados, B),
+        "seleccion": lambda: eliminar_coeficientes_pequenos(dct, 90),
+        "por_bloque": lambda: eliminar_coeficientes_por_bloque(dct, 90, B, "energia"),
+        "zigzag": lambda: eliminar_coeficientes_por_bloque(dct, 90, B, "zigzag"),
+        "barrido": lambda: comprimir_imagen_dct_multiple(imagen, PORCENTAJES_BARRIDO, B, dispersos=True),
+        "metricas": lambda: calcular_metricas_compresion(imagen, reconstruida, eliminados, dct.size),
+    }
+
+def evaluar_caso(lado, tamanio_bloque, repeticiones=10):
+    imagen = generar_imagen_sintetica(lado)
+    # Repeticiones proporcionales al inverso del área: el tiempo por caso queda acotado
+    # y las imágenes pequeñas acumulan suficientes muestras para un mínimo estable
+    repeticiones = int(np.clip(repeticiones * (1024 / lado) ** 2, 3, 100))
+    
+    resultados = {}
+    for nombre, funcion in etapas_compresion(imagen, tamanio_bloque).items():
+        tiempos = medir_tiempo(funcion, repeticiones)
+        resultados[nombre] = {
+            "ms": float(np.min(tiempos)),
+            "bytes_pico": int(medir_memoria_pico(funcion)),
+        }
+    return resultados
+
+def clave_caso(lado, tamanio_bloque):
+    return f"{lado}x{lado}_B{tamanio_bloque}"
+
+def comparar_con_base(resultados, base, tolerancia_tiempo=TOLERANCIA_TIEMPO, tolerancia_memoria=TOLERANCIA_MEMORIA):
+    regresiones = []
+    for clave, etapas in resultados.items():
+        for etapa, medida in etapas.items():
+            referencia = base.get(clave, {}).get(etapa)
+            if referencia is None:
+                continue
+            if medida["ms"] > referencia["ms"] * (1 + tolerancia_tiempo):
+                regresiones.append(f"{clave} {etapa}: {medida['ms']:.2f} ms (base {referencia['ms']:.2f} ms)")
+            if medida["bytes_pico"] > referencia["bytes_pico"] * (1 + tolerancia_memoria):
+                regresiones.append(
+                    f"{clave} {etapa}: {medida['bytes_pico'] / 2**20:.1f} MiB "
+                    f"(base {referencia['bytes_pico'] / 2**20:.1f} MiB)"
+                )
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del motor de compresión DCT")
+    parser.add_argument("--tamanios", type=int, nargs="*", default=list(TAMANIOS_IMAGEN_POR_DEFECTO),
+                        choices=TAMANIOS_IMAGEN, help="Lados de las imágenes sintéticas")
+    parser.add_argument("--bloques", type=int, nargs="*", default=list(TAMANIOS_BLOQUE))
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--base", type=Path, default=ARCHIVO_BASE_BENCHMARK)
+    parser.add_argument("--guardar-base", action="store_true", help="Guardar los resultados como nueva base")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_TIEMPO, help="Holgura relativa de tiempo")
+    parser.add_argument("--tolerancia-memoria", type=float, default=TOLERANCIA_MEMORIA)
+    args = parser.parse_args()
+    
+    resultados = {}
+    
+    print(f"\n{'='*84}")
+    print(f"{'Caso':<18}{'Etapa':<12}{'Mínimo(ms)':>14}{'MiB pico':>12}{'Base(ms)':>12}{'Δ tiempo':>12}")
+    print(f"{'-'*84}")
+    base = {}
+    if args.base.exists():
+        with open(args.base, "r", encoding="utf-8") as f:
+            base = json.load(f)
+    
+    for lado in args.tamanios:
+        for B in args.bloques:
+            clave = clave_caso(lado, B)
+            resultados[clave] = evaluar_caso(lado, B, args.repeticiones)
+            for etapa, medida in resultados[clave].items():
+                referencia = base.get(clave, {}).get(etapa)
+                columnas_base = (
+                    f"{referencia['ms']:>12.2f}{100 * (medida['ms'] / referencia['ms'] - 1):>+11.1f}%"
+                    if referencia else f"{'-':>12}{'-':>12}"
+                )
+                print(f"{clave:<18}{etapa:<12}{medida['ms']:>14.2f}{medida['bytes_pico'] / 2**20:>12.1f}{columnas_base}")
+    print(f"{'='*84}\n")
+    
+    if args.guardar_base:
+        base.update(resultados)
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump(base, f, indent=2)
+        print(f"✓ Base guardada en: {args.base}")
+        return
+    
+    if not base:
+        print(f"No hay base en {args.base}; ejecute con --guardar-base para crearla")
+        return
+    
+    regresiones = comparar_con_base(resultados, base, args.tolerancia, args.tolerancia_memoria)
+    if regresiones:
+        print("✗ Regresiones respecto a la base:")
+        for regresion in regresiones:
+            print(f"  {regresion}")
+        sys.exit(1)
+    print(f"✓ Sin regresiones (tolerancia {100 * args.tolerancia:.0f}% tiempo, "
+          f"{100 * args.tolerancia_memoria:.0f}% memoria)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from procesamiento_audio import filtrar_ruido_pasabajos, eliminar_silencio_voz
+from banco_filtros import calcular_vector_energias_temporal
+from pipeline_caracteristicas import PipelineCaracteristicas
+from perfiles_reconocimiento import obtener_perfil, listar_perfiles
+
+BYTES_POR_MUESTRA_PERMITIDOS = 16
+
+def generar_senal_sintetica(perfil, semilla=0):
+    rng = np.random.default_rng(semilla)
+    n = perfil.muestras_captura
+    t = np.arange(n) / perfil.fs
+    senal = 0.002 * rng.standard_normal(n)
+    inicio, fin = n // 4, 3 * n // 4
+    envolvente = np.hanning(fin - inicio)
+    for armonico, amplitud in ((220, 0.3), (440, 0.15), (880, 0.08), (1760, 0.03)):
+        senal[inicio:fin] += amplitud * envolvente * np.sin(2 * np.pi * armonico * t[inicio:fin])
+    return senal.astype(np.float32)
+
+def ciclo_original(senal, perfil):
+    N = perfil.N
+    x_completo = filtrar_ruido_pasabajos(
+        senal, perfil.fs, frecuencia_corte=perfil.frecuencia_corte, orden=perfil.orden_filtro
+    )
+    x_completo = eliminar_silencio_voz(x_completo, perfil.fs)
+    
+    mejor_energia = -1
+    mejor_inicio = 0
+    for i in range(0, max(1, len(x_completo) - N), max(1, N // 4)):
+        if i + N > len(x_completo):
+            break
+        energia = np.sum(x_completo[i:i + N] ** 2)
+        if energia > mejor_energia:
+            mejor_energia = energia
+            mejor_inicio = i
+    
+    x = x_completo[mejor_inicio:mejor_inicio + N]
+    if len(x) < N:
+        x = np.pad(x, (0, N - len(x)))
+    rms = np.sqrt(np.mean(x ** 2))
+    if rms > 1e-6:
+        x = x * (0.1 / rms)
+    
+    return calcular_vector_energias_temporal(x, perfil.fs, N, perfil.K, perfil.window)
+
+def ciclo_tiempo_real(senal, pipeline):
+    return pipeline.extraer(senal)
+
+def medir_tiempo(funcion, repeticiones):
+    funcion()
+    tiempos = np.empty(repeticiones)
+    for i in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos[i] = time.perf_counter() - inicio
+    return 1000.0 * tiempos
+
+def medir_memoria_transitoria(funcion):
+    funcion()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        funcion()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+def evaluar_perfil(perfil, repeticiones=200):
+    perfil = obtener_perfil(perfil)
+    senal = generar_senal_sintetica(perfil)
+    pipeline = PipelineCaracteristicas(perfil)
+    
+    original = lambda: ciclo_original(senal, perfil)
+    optimizado = lambda: ciclo_tiempo_real(senal, pipeline)
+    
+    E_original = original()
+    E_optimizado = optimizado().copy()
+    error = float(np.max(np.abs(E_optimizado - E_original) / np.maximum(E_original, 1e-20)))
+    
+    return {
+        "perfil": perfil.nombre,
+        "muestras": perfil.muestras_captura,
+        "tiempo_original_ms": medir_tiempo(original, repeticiones),
+        "tiempo_optimizado_ms": medir_tiempo(optimizado, repeticiones),
+        "bytes_original": medir_memoria_transitoria(original),
+        "bytes_optimizado": medir_memoria_transitoria(optimizado),
+        "presupuesto_bytes": BYTES_POR_MUESTRA_PERMITIDOS * perfil.muestras_captura,
+        "error_relativo": error,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del ciclo de reconocimiento en vivo")
+    parser.add_argument("perfiles", nargs="*")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+    
+    perfiles = [obtener_perfil(n) for n in args.perfiles] or [p for p in listar_perfiles() if p.extractor == "fft"]
+    fallos = []
+    
+    print(f"\n{'='*100}")
+    print(f"{'Perfil':<16}{'Original(ms)':>14}{'Buffers(ms)':>13}{'p99(ms)':>10}"
+          f"{'KiB original':>14}{'KiB buffers':>13}{'KiB presup.':>13}{'Error rel.':>12}")
+    print(f"{'-'*100}")
+    for perfil in perfiles:
+        r = evaluar_perfil(perfil, args.repeticiones)
+        print(f"{r['perfil']:<16}{np.median(r['tiempo_original_ms']):>14.3f}"
+              f"{np.median(r['tiempo_optimizado_ms']):>13.3f}{np.percentile(r['tiempo_optimizado_ms'], 99):>10.3f}"
+              f"{r['bytes_original'] / 1024:>14.1f}{r['bytes_optimizado'] / 1024:>13.1f}"
+              f"{r['presupuesto_bytes'] / 1024:>13.1f}{r['error_relativo']:>12.2e}")
+        if r["bytes_optimizado"] > r["presupuesto_bytes"]:
+            fallos.append(r["perfil"])
+    print(f"{'='*100}\n")
+    
+    if fallos:
+        print(f"✗ Asignaciones por ciclo por encima del presupuesto en: {', '.join(fallos)}")
+        sys.exit(1)
+    print("✓ Asignaciones por ciclo dentro del presupuesto")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import numpy as np
-import cv2
-from scipy.fftpack import dct, idct
+
+from transformadas_dct import dct_2d, idct_2d
 
 def transformacion_arnold(imagen, a, k, inversa=False):
     n, m = imagen.shape
@@ -43,57 +43,53 @@ def transformacion_arnold(imagen, a, k, inversa=False):
     
     return resultado
 
-def frdct_2d(imagen, alpha):
-    dct_result = dct(dct(imagen.T, norm='ortho').T, norm='ortho')
+def modulacion_frdct(forma, alpha, precision=np.float64):
+    N, M = forma
+    u_vals = np.arange(N).reshape(-1, 1)
+    v_vals = np.arange(M).reshape(1, -1)
+    
+    phase_u = alpha * u_vals / (2 * N)
+    phase_v = alpha * v_vals / (2 * M)
+    
+    # Re(X·e^{∓iπ(φu+φv)}) = X·cos(π(φu+φv)) para X real: no hace falta aritmética compleja
+    return np.cos(np.pi * (phase_u + phase_v)).astype(precision)
+
+def frdct_2d(imagen, alpha, precision=np.float64):
+    imagen = np.asarray(imagen, dtype=precision)
+    dct_result = dct_2d(imagen, precision)
     
     if abs(alpha) > 1e-6:
-        N, M = imagen.shape
-        u_vals = np.arange(N).reshape(-1, 1)
-        v_vals = np.arange(M).reshape(1, -1)
-        
-        phase_u = alpha * u_vals / (2 * N)
-        phase_v = alpha * v_vals / (2 * M)
-        modulation = np.exp(-1j * np.pi * (phase_u + phase_v))
-        
-        dct_result = np.real(dct_result * modulation)
+        dct_result *= modulacion_frdct(imagen.shape, alpha, precision)
     
     return dct_result
 
-def frdct_inversa_2d(matriz, alpha):
-    matriz_proc = matriz.copy()
+def frdct_inversa_2d(matriz, alpha, precision=np.float64):
+    matriz_proc = np.array(matriz, dtype=precision)
     
     if abs(alpha) > 1e-6:
-        N, M = matriz.shape
-        u_vals = np.arange(N).reshape(-1, 1)
-        v_vals = np.arange(M).reshape(1, -1)
-        
-        phase_u = alpha * u_vals / (2 * N)
-        phase_v = alpha * v_vals / (2 * M)
-        modulation_inv = np.exp(1j * np.pi * (phase_u + phase_v))
-        
-        matriz_proc = np.real(matriz_proc * modulation_inv)
-    
-    resultado = idct(idct(matriz_proc.T, norm='ortho').T, norm='ortho')
+        matriz_proc *= modulacion_frdct(matriz.shape, alpha, precision)
+    
+    resultado = idct_2d(matriz_proc, precision)
     
     return resultado
 
 def comprimir_dct(imagen, porcentaje_eliminacion):
     imagen_float = imagen.astype(np.float32)
-    dct_coef = cv2.dct(imagen_float)
+    dct_coef = dct_2d(imagen_float, np.float32)
     
     coef_flat = dct_coef.flatten()
     umbral_comp = np.percentile(np.abs(coef_flat), porcentaje_eliminacion)
     dct_comprimida = dct_coef.copy()
     dct_comprimida[np.abs(dct_comprimida) < umbral_comp] = 0
     
-    imagen_comprimida = cv2.idct(dct_comprimida)
+    imagen_comprimida = idct_2d(dct_comprimida, np.float32)
     imagen_comprimida = np.clip(imagen_comprimida, 0, 255).astype(np.uint8)
     
     coef_eliminados = np.sum(dct_comprimida == 0) / dct_comprimida.size * 100
     
     return imagen_comprimida, dct_comprimida, coef_eliminados
 
-def cifrar_imagen_completo(imagen_original, a, k, alpha, porcentaje_compresion=2.0):
+def cifrar_imagen_completo(imagen_original, a, k, alpha, porcentaje_compresion=2.0, precision=np.float64):
     print(f"\n=== PROCESO DE CIFRADO ===")
     print(f"Parámetros: a={a}, k={k}, α={alpha}")
     print(f"Compresión: {porcentaje_compresion}% de coeficientes eliminados")
@@ -109,8 +105,8 @@ def cifrar_imagen_completo(imagen_original, a, k, alpha, porcentaje_compresion=2
     print(f"✓ Compresión completada ({coef_eliminados:.2f}% coeficientes eliminados)")
     
     print("\nPASO 3: Aplicando FrDCT 2D...")
-    imagen_norm = imagen_comprimida.astype(np.float64) / 255.0
-    matriz_frdct = frdct_2d(imagen_norm, alpha)
+    imagen_norm = imagen_comprimida.astype(precision) / 255.0
+    matriz_frdct = frdct_2d(imagen_norm, alpha, precision)
     print(f"✓ FrDCT completado")
     
     imagen_cifrada = np.abs(matriz_frdct)
@@ -128,12 +124,12 @@ def cifrar_imagen_completo(imagen_original, a, k, alpha, porcentaje_compresion=2
         'coef_eliminados': coef_eliminados
     }
 
-def descifrar_imagen_completo(matriz_frdct, a, k, alpha):
+def descifrar_imagen_completo(matriz_frdct, a, k, alpha, precision=np.float64):
     print(f"\n=== PROCESO DE DESCIFRADO ===")
     print(f"Parámetros: a={a}, k={k}, α={alpha}")
     
     print("\nPASO 1: Aplicando FrDCT inversa...")
-    imagen_desc_norm = frdct_inversa_2d(matriz_frdct, alpha)
+    imagen_desc_norm = frdct_inversa_2d(matriz_frdct, alpha, precision)
     
     imagen_desc_arnold = np.abs(imagen_desc_norm)
     imagen_desc_arnold = (imagen_desc_arnold - imagen_desc_arnold.min())
@@ -0,0 +1,368 @@
+import heapq
+import struct
+import sys
+
+import numpy as np
+import cv2
+
+from compresion_dct import (
+    CoeficientesDispersos,
+    a_tensor_bloques,
+    idct_esquinas,
+    aplicar_dct_bloques,
+    eliminar_coeficientes_pequenos,
+    eliminar_coeficientes_por_bloque,
+    obtener_orden_zigzag,
+)
+
+MAGIA = b"DCTC"
+VERSION_FORMATO = 1
+PASO_CUANTIZACION = 2.0
+LONGITUD_MAXIMA_CODIGO = 16
+TAMANIO_MAXIMO_CATEGORIA = 15
+
+SIMBOLO_EOB = 0x00
+SIMBOLO_ZRL = 0xF0
+
+# magia, versión, alto, ancho, tamaño de bloque, paso de cuantización
+FORMATO_CABECERA = "<4sBIIHf"
+
+def _categoria(valores):
+    magnitudes = np.abs(valores).astype(np.int64)
+    categorias = np.zeros(len(magnitudes), dtype=np.int64)
+    no_nulos = magnitudes > 0
+    categorias[no_nulos] = np.floor(np.log2(magnitudes[no_nulos])).astype(np.int64) + 1
+    if len(categorias) and categorias.max() > TAMANIO_MAXIMO_CATEGORIA:
+        raise ValueError("Coeficiente cuantizado fuera de rango; aumente el paso de cuantización")
+    return categorias
+
+def _amplitud(valores, categorias):
+    valores = valores.astype(np.int64)
+    return np.where(valores >= 0, valores, valores + (1 << categorias) - 1)
+
+def _valor_desde_amplitud(amplitud, categoria):
+    if categoria == 0:
+        return 0
+    if amplitud >> (categoria - 1):
+        return amplitud
+    return amplitud - (1 << categoria) + 1
+
+def construir_longitudes_huffman(frecuencias):
+    frecuencias = {s: int(f) for s, f in frecuencias.items() if f > 0}
+    if len(frecuencias) == 1:
+        return {next(iter(frecuencias)): 1}
+    
+    while True:
+        monticulo = [(f, i, (s,)) for i, (s, f) in enumerate(sorted(frecuencias.items()))]
+        heapq.heapify(monticulo)
+        longitudes = dict.fromkeys(frecuencias, 0)
+        contador = len(monticulo)
+        while len(monticulo) > 1:
+            f1, _, s1 = heapq.heappop(monticulo)
+            f2, _, s2 = heapq.heappop(monticulo)
+            for s in s1 + s2:
+                longitudes[s] += 1
+            heapq.heappush(monticulo, (f1 + f2, contador, s1 + s2))
+            contador += 1
+        if max(longitudes.values()) <= LONGITUD_MAXIMA_CODIGO:
+            return longitudes
+        frecuencias = {s: (f + 1) // 2 for s, f in frecuencias.items()}
+
+def codigos_canonicos(longitudes):
+    codigos = {}
+    codigo = 0
+    longitud_anterior = 0
+    for simbolo, longitud in sorted(longitudes.items(), key=lambda x: (x[1], x[0])):
+        codigo <<= longitud - longitud_anterior
+        codigos[simbolo] = codigo
+        codigo += 1
+        longitud_anterior = longitud
+    return codigos
+
+def _tabla_codigos(longitudes):
+    codigos = codigos_canonicos(longitudes)
+    tabla_codigo = np.zeros(256, dtype=np.int64)
+    tabla_longitud = np.zeros(256, dtype=np.int64)
+    for simbolo, longitud in longitudes.items():
+        tabla_codigo[simbolo] = codigos[simbolo]
+        tabla_longitud[simbolo] = longitud
+    return tabla_codigo, tabla_longitud
+
+def _tabla_decodificacion(longitudes):
+    L = LONGITUD_MAXIMA_CODIGO
+    simbolos = np.zeros(1 << L, dtype=np.int64)
+    longitudes_tabla = np.zeros(1 << L, dtype=np.int64)
+    for simbolo, codigo in codigos_canonicos(longitudes).items():
+        longitud = longitudes[simbolo]
+        inicio = codigo << (L - longitud)
+        fin = (codigo + 1) << (L - longitud)
+        simbolos[inicio:fin] = simbolo
+        longitudes_tabla[inicio:fin] = longitud
+    return simbolos.tolist(), longitudes_tabla.tolist()
+
+def _cuantizar_zigzag(coeficientes_dct, tamanio_bloque, paso):
+    # DC cuantizado de cada bloque y entradas AC no nulas (bloque, posición zig-zag - 1,
+    # valor) ordenadas por bloque y posición
+    B = tamanio_bloque
+    if isinstance(coeficientes_dct, CoeficientesDispersos):
+        # Solo se cuantizan los coeficientes conservados, sin tensor denso
+        h, w = coeficientes_dct.forma
+        cuantizados = np.rint(coeficientes_dct.valores.astype(np.float64) / paso).astype(np.int64)
+        posiciones = np.argsort(obtener_orden_zigzag(B))[coeficientes_dct.posiciones]
+        bloques = coeficientes_dct.indices_bloque.astype(np.int64)
+        
+        es_dc = posiciones == 0
+        dc = np.zeros((h // B) * (w // B), dtype=np.int64)
+        dc[bloques[es_dc]] = cuantizados[es_dc]
+        
+        ac = ~es_dc & (cuantizados != 0)
+        bloques_ac, posiciones_ac, valores_ac = bloques[ac], posiciones[ac] - 1, cuantizados[ac]
+        orden = np.lexsort((posiciones_ac, bloques_ac))
+        return dc, bloques_ac[orden], posiciones_ac[orden], valores_ac[orden]
+    
+    bloques = a_tensor_bloques(np.asarray(coeficientes_dct, dtype=np.float64), B).reshape(-1, B * B)
+    cuantizados = np.rint(bloques[:, obtener_orden_zigzag(B)] / paso).astype(np.int64)
+    bloques_ac, posiciones_ac = np.nonzero(cuantizados[:, 1:])
+    return cuantizados[:, 0], bloques_ac, posiciones_ac, cuantizados[:, 1:][bloques_ac, posiciones_ac]
+
+def _tokens_bloques(dc, bloques_ac, posiciones_ac, valores_ac, n_coefs):
+    n_bloques = len(dc)
+    
+    diferencias_dc = np.diff(dc, prepend=0)
+    categorias_dc = _categoria(diferencias_dc)
+    
+    anterior = np.empty_like(posiciones_ac)
+    if len(anterior):
+        anterior[0] = -1
+        anterior[1:] = np.where(bloques_ac[1:] == bloques_ac[:-1], posiciones_ac[:-1], -1)
+    corridas = posiciones_ac - anterior - 1
+    n_zrl = corridas // 16
+    categorias_ac = _categoria(valores_ac)
+    
+    # Claves de orden: bloque, posición (DC = 0, AC = pos + 1, EOB = n_coefs) y sub-índice ZRL
+    escala = (n_coefs + 1) * 32
+    claves, simbolos, categorias, amplitudes, es_ac = [], [], [], [], []
+    
+    indices_bloque = np.arange(n_bloques)
+    claves.append(indices_bloque * escala)
+    simbolos.append(categorias_dc)
+    categorias.append(categorias_dc)
+    amplitudes.append(_amplitud(diferencias_dc, categorias_dc))
+    es_ac.append(np.zeros(n_bloques, dtype=bool))
+    
+    bloques_zrl = np.repeat(bloques_ac, n_zrl)
+    posiciones_zrl = np.repeat(posiciones_ac, n_zrl)
+    sub_zrl = np.arange(len(bloques_zrl)) - np.repeat(np.cumsum(n_zrl) - n_zrl, n_zrl)
+    claves.append(bloques_zrl * escala + (posiciones_zrl + 1) * 32 + sub_zrl)
+    simbolos.append(np.full(len(bloques_zrl), SIMBOLO_ZRL))
+    categorias.append(np.zeros(len(bloques_zrl), dtype=np.int64))
+    amplitudes.append(np.zeros(len(bloques_zrl), dtype=np.int64))
+    es_ac.append(np.ones(len(bloques_zrl), dtype=bool))
+    
+    claves.append(bloques_ac * escala + (posiciones_ac + 1) * 32 + n_zrl)
+    simbolos.append(((corridas % 16) << 4) | categorias_ac)
+    categorias.append(categorias_ac)
+    amplitudes.append(_amplitud(valores_ac, categorias_ac))
+    es_ac.append(np.ones(len(bloques_ac), dtype=bool))
+    
+    claves.append(indices_bloque * escala + n_coefs * 32)
+    simbolos.append(np.full(n_bloques, SIMBOLO_EOB))
+    categorias.append(np.zeros(n_bloques, dtype=np.int64))
+    amplitudes.append(np.zeros(n_bloques, dtype=np.int64))
+    es_ac.append(np.ones(n_bloques, dtype=bool))
+    
+    orden = np.argsort(np.concatenate(claves), kind="stable")
+    return (
+        np.concatenate(simbolos).astype(np.int64)[orden],
+        np.concatenate(categorias)[orden],
+        np.concatenate(amplitudes)[orden],
+        np.concatenate(es_ac)[orden],
+    )
+
+def _empaquetar_bits(valores, longitudes):
+    total = int(longitudes.sum())
+    if total == 0:
+        return b""
+    desplazamientos = np.repeat(longitudes, longitudes) - 1 - (
+        np.arange(total) - np.repeat(np.cumsum(longitudes) - longitudes, longitudes)
+    )
+    bits = (np.repeat(valores, longitudes) >> desplazamientos) & 1
+    return np.packbits(bits.astype(np.uint8)).tobytes()
+
+def _serializar_tabla(longitudes):
+    datos = struct.pack("<H", len(longitudes))
+    for simbolo, longitud in sorted(longitudes.items()):
+        datos += struct.pack("<BB", simbolo, longitud)
+    return datos
+
+def _leer_tabla(datos, posicion):
+    (n,) = struct.unpack_from("<H", datos, posicion)
+    posicion += 2
+    longitudes = {}
+    for _ in range(n):
+        simbolo, longitud = struct.unpack_from("<BB", datos, posicion)
+        longitudes[simbolo] = longitud
+        posicion += 2
+    return longitudes, posicion
+
+def codificar_coeficientes(coeficientes_dct, forma_original, tamanio_bloque=8, paso=PASO_CUANTIZACION):
+    # Acepta coeficientes densos o CoeficientesDispersos; ambos producen el mismo flujo
+    B = tamanio_bloque
+    simbolos, categorias, amplitudes, es_ac = _tokens_bloques(*_cuantizar_zigzag(coeficientes_dct, B, paso), B * B)
+    
+    longitudes_dc = construir_longitudes_huffman(dict(zip(*np.unique(simbolos[~es_ac], return_counts=True))))
+    longitudes_ac = construir_longitudes_huffman(dict(zip(*np.unique(simbolos[es_ac], return_counts=True))))
+    codigo_dc, longitud_dc = _tabla_codigos(longitudes_dc)
+    codigo_ac, longitud_ac = _tabla_codigos(longitudes_ac)
+    
+    codigos = np.where(es_ac, codigo_ac[simbolos], codigo_dc[simbolos])
+    longitudes_codigo = np.where(es_ac, longitud_ac[simbolos], longitud_dc[simbolos])
+    carga = _empaquetar_bits((codigos << categorias) | amplitudes, longitudes_codigo + categorias)
+    
+    h, w = forma_original
+    cabecera = struct.pack(FORMATO_CABECERA, MAGIA, VERSION_FORMATO, h, w, B, paso)
+    cabecera += _serializar_tabla(longitudes_dc) + _serializar_tabla(longitudes_ac)
+    return cabecera + struct.pack("<I", len(carga)) + carga
+
+def leer_cabecera(datos):
+    magia, version, h, w, B, paso = struct.unpack_from(FORMATO_CABECERA, datos, 0)
+    if magia != MAGIA or version != VERSION_FORMATO:
+        raise ValueError("El archivo no es un flujo DCT comprimido compatible")
+    posicion = struct.calcsize(FORMATO_CABECERA)
+    longitudes_dc, posicion = _leer_tabla(datos, posicion)
+    longitudes_ac, posicion = _leer_tabla(datos, posicion)
+    (longitud_carga,) = struct.unpack_from("<I", datos, posicion)
+    posicion += 4
+    return {
+        "forma": (h, w),
+        "tamanio_bloque": B,
+        "paso": paso,
+        "longitudes_dc": longitudes_dc,
+        "longitudes_ac": longitudes_ac,
+        "inicio_carga": posicion,
+        "longitud_carga": longitud_carga,
+    }
+
+def decodificar_bloques(datos):
+    cabecera = leer_cabecera(datos)
+    h, w = cabecera["forma"]
+    B = cabecera["tamanio_bloque"]
+    paso = cabecera["paso"]
+    n_coefs = B * B
+    n_bloques = -(-h // B) * -(-w // B)
+    zigzag = obtener_orden_zigzag(B)
+    
+    simbolos_dc, longitudes_dc = _tabla_decodificacion(cabecera["longitudes_dc"])
+    simbolos_ac, longitudes_ac = _tabla_decodificacion(cabecera["longitudes_ac"])
+    
+    L = LONGITUD_MAXIMA_CODIGO
+    mascara = (1 << L) - 1
+    carga = datos[cabecera["inicio_carga"]:cabecera["inicio_carga"] + cabecera["longitud_carga"]]
+    posicion = 0
+    acumulador = 0
+    n_bits = 0
+    
+    dc = 0
+    for indice in range(n_bloques):
+        zz = np.zeros(n_coefs)
+        k = 0
+        while True:
+            while n_bits < 2 * L:
+                acumulador = (acumulador << 8) | (carga[posicion] if posicion < len(carga) else 0)
+                posicion += 1
+                n_bits += 8
+            
+            vistazo = (acumulador >> (n_bits - L)) & mascara
+            if k == 0:
+                simbolo, longitud = simbolos_dc[vistazo], longitudes_dc[vistazo]
+            else:
+                simbolo, longitud = simbolos_ac[vistazo], longitudes_ac[vistazo]
+            n_bits -= longitud
+            
+            categoria = simbolo & 0x0F if k else simbolo
+            amplitud = (acumulador >> (n_bits - categoria)) & ((1 << categoria) - 1)
+            n_bits -= categoria
+            acumulador &= (1 << n_bits) - 1
+            
+            if k == 0:
+                dc += _valor_desde_amplitud(amplitud, categoria)
+                zz[0] = dc
+                k = 1
+            elif simbolo == SIMBOLO_EOB:
+                break
+            elif simbolo == SIMBOLO_ZRL:
+                k += 16
+            else:
+                k += simbolo >> 4
+                zz[k] = _valor_desde_amplitud(amplitud, categoria)
+                k += 1
+        
+        bloque = np.empty(n_coefs)
+        bloque[zigzag] = zz * paso
+        yield indice, bloque.reshape(B, B)
+
+def decodificar_imagen(datos, factor=1):
+    cabecera = leer_cabecera(datos)
+    h, w = cabecera["forma"]
+    B = cabecera["tamanio_bloque"]
+    if B % factor:
+        raise ValueError(f"El factor de reducción ({factor}) debe dividir al tamaño de bloque ({B})")
+    r = B // factor
+    bloques_ancho = -(-w // B)
+    
+    # Con factor > 1 solo se invierte la esquina r×r de baja frecuencia de cada bloque
+    imagen = np.zeros((-(-h // B) * r, bloques_ancho * r), dtype=np.uint8)
+    fila = np.zeros((1, bloques_ancho, r, r))
+    for indice, bloque in decodificar_bloques(datos):
+        i, j = divmod(indice, bloques_ancho)
+        fila[0, j] = bloque[:r, :r]
+        if j == bloques_ancho - 1:
+            tira = idct_esquinas(fila, B)
+            imagen[i * r:(i + 1) * r] = np.clip(tira, 0, 255).astype(np.uint8)
+    
+    return imagen[:-(-h // factor), :-(-w // factor)]
+
+def guardar_comprimido(ruta, datos):
+    with open(ruta, "wb") as f:
+        f.write(datos)
+
+def cargar_comprimido(ruta):
+    with open(ruta, "rb") as f:
+        return f.read()
+
+def bits_por_pixel(datos, forma_original):
+    return 8.0 * len(datos) / (forma_original[0] * forma_original[1])
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Codificador/decodificador de imágenes DCT (.dctc)")
+    parser.add_argument("entrada")
+    parser.add_argument("salida")
+    parser.add_argument("--porcentaje", type=float, default=0.0, help="% de coeficientes a eliminar")
+    parser.add_argument("--paso", type=float, default=PASO_CUANTIZACION)
+    parser.add_argument("--bloque", type=int, default=8)
+    parser.add_argument("--modo", default="global", choices=("global", "energia", "zigzag"),
+                        help="Selección global por magnitud o por bloque (mayor energía / primeros en zig-zag)")
+    parser.add_argument("--decodificar", action="store_true")
+    parser.add_argument("--escala", type=int, default=1, choices=(1, 2, 4, 8),
+                        help="Factor de reducción de la vista previa al decodificar")
+    args = parser.parse_args()
+    
+    if args.decodificar:
+        imagen = decodificar_imagen(cargar_comprimido(args.entrada), args.escala)
+        cv2.imwrite(args.salida, imagen)
+        print(f"✓ Imagen decodificada {imagen.shape[1]}x{imagen.shape[0]} guardada en: {args.salida}")
+        sys.exit(0)
+    
+    imagen = cv2.imread(args.entrada, cv2.IMREAD_GRAYSCALE)
+    if imagen is None:
+        sys.exit(f"No se pudo leer la imagen: {args.entrada}")
+    coefs, _ = aplicar_dct_bloques(imagen, args.bloque)
+    if args.modo == "global":
+        coefs, _ = eliminar_coeficientes_pequenos(coefs, args.porcentaje)
+    else:
+        coefs, _ = eliminar_coeficientes_por_bloque(coefs, args.porcentaje, args.bloque, args.modo)
+    datos = codificar_coeficientes(coefs, imagen.shape, args.bloque, args.paso)
+    guardar_comprimido(args.salida, datos)
+    print(f"✓ {len(datos):,} bytes ({bits_por_pixel(datos, imagen.shape):.3f} bpp) guardados en: {args.salida}")
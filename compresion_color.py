@@ -0,0 +1,203 @@
+import numpy as np
+import cv2
+
+from compresion_dct import (
+    comprimir_imagen_dct_multiple,
+    reconstruir_plano_dct,
+    calcular_metricas_compresion,
+    metricas_desde_mse,
+    DecodificadorRegiones,
+)
+
+PLANOS_YCBCR = ("Y", "Cb", "Cr")
+
+# Conversión JPEG (BT.601, rango completo) sobre píxeles RGB
+MATRIZ_RGB_A_YCBCR = np.array([
+    [0.299, 0.587, 0.114],
+    [-0.168736, -0.331264, 0.5],
+    [0.5, -0.418688, -0.081312],
+])
+MATRIZ_YCBCR_A_RGB = np.array([
+    [1.0, 0.0, 1.402],
+    [1.0, -0.344136, -0.714136],
+    [1.0, 1.772, 0.0],
+])
+DESPLAZAMIENTO_CROMA = np.array([0.0, 128.0, 128.0])
+
+def submuestrear_420(plano):
+    h, w = plano.shape
+    plano = np.pad(plano, ((0, h % 2), (0, w % 2)), mode='edge')
+    return plano.reshape(plano.shape[0] // 2, 2, plano.shape[1] // 2, 2).mean(axis=(1, 3))
+
+def sobremuestrear_420(plano, forma):
+    h, w = forma
+    return cv2.resize(plano, (2 * plano.shape[1], 2 * plano.shape[0]), interpolation=cv2.INTER_LINEAR)[:h, :w]
+
+def rgb_a_planos_ycbcr(imagen_rgb, submuestreo=True, precision=np.float64):
+    ycbcr = imagen_rgb.astype(precision) @ MATRIZ_RGB_A_YCBCR.T.astype(precision)
+    ycbcr += DESPLAZAMIENTO_CROMA.astype(precision)
+    
+    planos = {}
+    for i, nombre in enumerate(PLANOS_YCBCR):
+        plano = np.ascontiguousarray(ycbcr[..., i])
+        if submuestreo and nombre != "Y":
+            plano = submuestrear_420(plano)
+        planos[nombre] = plano
+    return planos
+
+def planos_ycbcr_a_rgb(planos, forma):
+    h, w = forma[:2]
+    ycbcr = np.empty((h, w, 3), dtype=np.float64)
+    for i, nombre in enumerate(PLANOS_YCBCR):
+        plano = planos[nombre].astype(np.float64)
+        if plano.shape != (h, w):
+            plano = sobremuestrear_420(plano, (h, w))
+        ycbcr[..., i] = plano
+    
+    ycbcr -= DESPLAZAMIENTO_CROMA
+    rgb = ycbcr @ MATRIZ_YCBCR_A_RGB.T
+    return np.clip(np.rint(rgb), 0, 255).astype(np.uint8)
+
+def comprimir_imagen_color_multiple(imagen_rgb, porcentajes, tamanio_bloque=8, submuestreo=True,
+                                    dispersos=False, precision=np.float64, reconstruir=False, curva=False):
+    planos = rgb_a_planos_ycbcr(imagen_rgb, submuestreo, precision)
+    
+    dct_planos = {}
+    formas_planos = {}
+    curvas_planos = {}
+    resultados = {porcentaje: {} for porcentaje in porcentajes}
+    planos_reconstruidos = {porcentaje: {} for porcentaje in porcentajes}
+    for nombre, plano in planos.items():
+        dct, forma, por_porcentaje, *extras = comprimir_imagen_dct_multiple(
+            plano, porcentajes, tamanio_bloque, dispersos=dispersos, precision=precision, reconstruir=reconstruir,
+            flotante=True, curva=curva
+        )
+        dct_planos[nombre] = dct
+        formas_planos[nombre] = forma
+        for porcentaje, (coefs, num_eliminados) in por_porcentaje.items():
+            resultados[porcentaje][nombre] = (coefs, num_eliminados)
+        if reconstruir:
+            for porcentaje, imagen_plano in extras[0].items():
+                planos_reconstruidos[porcentaje][nombre] = imagen_plano
+        if curva:
+            curvas_planos[nombre] = extras[-1]
+    
+    salida = (dct_planos, formas_planos, resultados)
+    if reconstruir:
+        salida += ({
+            porcentaje: planos_ycbcr_a_rgb(planos_porcentaje, imagen_rgb.shape)
+            for porcentaje, planos_porcentaje in planos_reconstruidos.items()
+        },)
+    if curva:
+        salida += (curvas_planos,)
+    return salida
+
+def descomprimir_imagen_color(coeficientes_planos, formas_planos, forma_original, tamanio_bloque=8,
+                              precision=np.float64):
+    planos = {
+        nombre: reconstruir_plano_dct(coeficientes_planos[nombre], formas_planos[nombre], tamanio_bloque, precision)
+        for nombre in PLANOS_YCBCR
+    }
+    return planos_ycbcr_a_rgb(planos, forma_original)
+
+class DecodificadorRegionesColor:
+    # Un decodificador por plano; las regiones de croma se piden en coordenadas
+    # del plano submuestreado y se llevan a la malla de la región de Y; los planos se
+    # decodifican en flotante y solo se redondea una vez, ya en RGB
+    def __init__(self, coeficientes_planos, formas_planos, forma_original, tamanio_bloque=8, precision=np.float64):
+        self.forma_original = forma_original
+        self.planos = {
+            nombre: DecodificadorRegiones(
+                coeficientes_planos[nombre], formas_planos[nombre], tamanio_bloque, precision, flotante=True
+            )
+            for nombre in PLANOS_YCBCR
+        }
+        self.submuestreo = formas_planos["Cb"][0] < formas_planos["Y"][0]
+    
+    @property
+    def bloques_decodificados(self):
+        return sum(decodificador.bloques_decodificados for decodificador in self.planos.values())
+    
+    def factor_para_escala(self, pixeles_por_punto):
+        return self.planos["Y"].factor_para_escala(pixeles_por_punto)
+    
+    def region(self, fila_inicio, fila_fin, columna_inicio, columna_fin, factor=1):
+        luma, limites = self.planos["Y"].region(fila_inicio, fila_fin, columna_inicio, columna_fin, factor)
+        fila_inicio, fila_fin, columna_inicio, columna_fin = limites
+        
+        planos = {"Y": luma}
+        s = 2 if self.submuestreo else 1
+        factor_croma = max(1, factor // s)
+        sobremuestrear = s * factor_croma > factor
+        # Al sobremuestrear se pide un punto de croma de margen: la interpolación bilineal
+        # del borde de la región usa sus vecinos, igual que sobre el plano completo
+        margen = 1 if sobremuestrear else 0
+        for nombre in PLANOS_YCBCR[1:]:
+            croma, (f0, _, c0, _) = self.planos[nombre].region(
+                fila_inicio // s - margen, -(-fila_fin // s) + margen,
+                columna_inicio // s - margen, -(-columna_fin // s) + margen, factor_croma
+            )
+            if sobremuestrear:
+                croma = sobremuestrear_420(croma.astype(np.float64), (s * croma.shape[0], s * croma.shape[1]))
+                croma = croma[fila_inicio - s * f0:, columna_inicio - s * c0:]
+            else:
+                # La región de croma empieza en un borde de bloque del plano: se descarta lo previo
+                croma = croma[(fila_inicio // s - f0) // factor_croma:, (columna_inicio // s - c0) // factor_croma:]
+            croma = croma[:luma.shape[0], :luma.shape[1]]
+            planos[nombre] = np.pad(
+                croma, ((0, luma.shape[0] - croma.shape[0]), (0, luma.shape[1] - croma.shape[1])), mode='edge'
+            )
+        return planos_ycbcr_a_rgb(planos, luma.shape), limites
+
+def calcular_metricas_color(imagen_original, imagen_comprimida, num_coefs_eliminados, total_coefs,
+                            bytes_comprimidos=None):
+    metricas = calcular_metricas_compresion(
+        imagen_original, imagen_comprimida, num_coefs_eliminados, total_coefs, bytes_comprimidos
+    )
+    
+    planos_original = rgb_a_planos_ycbcr(imagen_original, submuestreo=False)
+    planos_comprimida = rgb_a_planos_ycbcr(imagen_comprimida, submuestreo=False)
+    metricas['canales'] = {}
+    for nombre in PLANOS_YCBCR:
+        mse = float(np.mean((planos_original[nombre] - planos_comprimida[nombre]) ** 2))
+        metricas['canales'][nombre] = {
+            'mse': mse,
+            'psnr': float('inf') if mse == 0 else float(10 * np.log10(255**2 / mse)),
+        }
+    
+    return metricas
+
+def error_submuestreo_420(imagen_rgb):
+    # MSE por plano que introduce el 4:2:0 por sí solo (submuestrear y volver a la malla de Y)
+    planos = rgb_a_planos_ycbcr(imagen_rgb, submuestreo=False)
+    errores = {"Y": 0.0}
+    for nombre in PLANOS_YCBCR[1:]:
+        plano = planos[nombre]
+        errores[nombre] = float(np.mean((plano - sobremuestrear_420(submuestrear_420(plano), plano.shape)) ** 2))
+    return errores
+
+def estimar_metricas_color(imagen_original, curvas_planos, num_eliminados_planos, total_coefs,
+                           bytes_comprimidos=None, mse_base_planos=None):
+    # MSE por plano desde su CurvaDistorsion, más el error que no depende de los
+    # coeficientes anulados (mse_base_planos, p. ej. error_submuestreo_420); el MSE RGB
+    # suma el de cada plano ponderado por su peso cuadrático medio en la conversión
+    # YCbCr -> RGB (errores de planos distintos supuestos incorrelados)
+    mse_planos = np.array([
+        float(curvas_planos[nombre].mse(num_eliminados_planos[nombre]))
+        + (mse_base_planos[nombre] if mse_base_planos else 0.0)
+        for nombre in PLANOS_YCBCR
+    ])
+    mse = float(np.mean(MATRIZ_YCBCR_A_RGB ** 2, axis=0) @ mse_planos)
+    
+    metricas = metricas_desde_mse(
+        imagen_original, mse, sum(num_eliminados_planos.values()), total_coefs, bytes_comprimidos
+    )
+    metricas['canales'] = {
+        nombre: {
+            'mse': mse_plano,
+            'psnr': float('inf') if mse_plano == 0 else float(10 * np.log10(255**2 / mse_plano)),
+        }
+        for nombre, mse_plano in zip(PLANOS_YCBCR, mse_planos)
+    }
+    metricas['estimada'] = True
+    return metricas
@@ -1,7 +1,11 @@
 
+from functools import lru_cache
+
 import numpy as np
 import cv2
 
+from transformadas_dct import transformar_bloques
+
 def calcular_coeficientes_dct(N, M):
     beta = np.zeros(M)
     beta[0] = np.sqrt(1.0 / M)
@@ -15,68 +19,34 @@ def calcular_coeficientes_dct(N, M):
     
     return alfa, beta
 
+@lru_cache(maxsize=None)
+def _base_dct(N, precision):
+    alfa, _ = calcular_coeficientes_dct(N, N)
+    k = np.arange(N).reshape(-1, 1)
+    n = np.arange(N).reshape(1, -1)
+    base = (alfa.reshape(-1, 1) * np.cos((2 * n + 1) * np.pi * k / (2 * N))).astype(precision)
+    base.setflags(write=False)
+    return base
+
+def obtener_base_dct(N, precision=np.float64):
+    return _base_dct(N, np.dtype(precision))
+
 def dct_2d_manual(bloque):
     N, M = bloque.shape
-    alfa, beta = calcular_coeficientes_dct(N, M)
-    
-    cos_matrix_n = np.zeros((N, N))
-    cos_matrix_m = np.zeros((M, M))
+    C_N = obtener_base_dct(N)
+    C_M = obtener_base_dct(M)
     
-    for k in range(N):
-        for n in range(N):
-            cos_matrix_n[k, n] = np.cos((2 * n + 1) * np.pi * k / (2 * N))
-    
-    for l in range(M):
-        for m in range(M):
-            cos_matrix_m[l, m] = np.cos((2 * m + 1) * np.pi * l / (2 * M))
-    
-    X = np.zeros((N, M), dtype=np.float64)
-    
-    for k in range(N):
-        for l in range(M):
-            suma = 0.0
-            for n in range(N):
-                for m in range(M):
-                    suma += bloque[n, m] * cos_matrix_m[l, m] * cos_matrix_n[k, n]
-            
-            X[k, l] = alfa[k] * beta[l] * suma
-    
-    return X
+    return C_N @ np.asarray(bloque, dtype=np.float64) @ C_M.T
 
 def idct_2d_manual(coeficientes):
     N, M = coeficientes.shape
-    alfa, beta = calcular_coeficientes_dct(N, M)
-    
-    cos_matrix_n = np.zeros((N, N))
-    cos_matrix_m = np.zeros((M, M))
+    C_N = obtener_base_dct(N)
+    C_M = obtener_base_dct(M)
     
-    for k in range(N):
-        for n in range(N):
-            cos_matrix_n[k, n] = np.cos((2 * n + 1) * np.pi * k / (2 * N))
-    
-    for l in range(M):
-        for m in range(M):
-            cos_matrix_m[l, m] = np.cos((2 * m + 1) * np.pi * l / (2 * M))
-    
-    x = np.zeros((N, M), dtype=np.float64)
-    
-    for n in range(N):
-        for m in range(M):
-            suma = 0.0
-            for k in range(N):
-                for l in range(M):
-                    suma += alfa[k] * beta[l] * coeficientes[k, l] * cos_matrix_m[l, m] * cos_matrix_n[k, n]
-            
-            x[n, m] = suma
-    
-    return x
+    return C_N.T @ np.asarray(coeficientes, dtype=np.float64) @ C_M
 
-def comprimir_imagen_dct(imagen, porcentaje_compresion, tamanio_bloque=8):
-    if imagen.dtype != np.float64:
-        imagen = imagen.astype(np.float64)
-    
+def rellenar_a_bloques(imagen, tamanio_bloque=8):
     h, w = imagen.shape
-    forma_original = imagen.shape
     
     pad_h = (tamanio_bloque - (h % tamanio_bloque)) % tamanio_bloque
     pad_w = (tamanio_bloque - (w % tamanio_bloque)) % tamanio_bloque
@@ -84,117 +54,532 @@ def comprimir_imagen_dct(imagen, porcentaje_compresion, tamanio_bloque=8):
     if pad_h > 0 or pad_w > 0:
         imagen = np.pad(imagen, ((0, pad_h), (0, pad_w)), mode='edge')
     
-    h_pad, w_pad = imagen.shape
-    
-    num_bloques_h = h_pad // tamanio_bloque
-    num_bloques_w = w_pad // tamanio_bloque
-    total_bloques = num_bloques_h * num_bloques_w
-    print(f"  Procesando {total_bloques} bloques de {tamanio_bloque}x{tamanio_bloque}...")
-    
-    dct_coefs = np.zeros_like(imagen, dtype=np.float64)
-    bloque_actual = 0
-    
-    for i in range(0, h_pad, tamanio_bloque):
-        for j in range(0, w_pad, tamanio_bloque):
-            bloque = imagen[i:i+tamanio_bloque, j:j+tamanio_bloque]
-            dct_bloque = dct_2d_manual(bloque)
-            dct_coefs[i:i+tamanio_bloque, j:j+tamanio_bloque] = dct_bloque
-            
-            bloque_actual += 1
-            if bloque_actual % 100 == 0 or bloque_actual == total_bloques:
-                porcentaje_progreso = (bloque_actual / total_bloques) * 100
-                print(f"    Progreso: {bloque_actual}/{total_bloques} bloques ({porcentaje_progreso:.1f}%)")
-    
-    coefs_filtrados, num_eliminados = eliminar_coeficientes_pequenos(
-        dct_coefs, porcentaje_compresion
-    )
+    return imagen
+
+def a_tensor_bloques(matriz, tamanio_bloque=8):
+    h, w = matriz.shape
+    B = tamanio_bloque
+    return matriz.reshape(h // B, B, w // B, B).swapaxes(1, 2)
+
+def desde_tensor_bloques(tensor):
+    bh, bw, B, _ = tensor.shape
+    return tensor.swapaxes(1, 2).reshape(bh * B, bw * B)
+
+def dct_bloques(imagen_rellena, tamanio_bloque=8, precision=np.float64, backend=None):
+    bloques = a_tensor_bloques(np.asarray(imagen_rellena, dtype=precision), tamanio_bloque)
+    return desde_tensor_bloques(transformar_bloques(bloques, precision, backend=backend))
+
+def idct_bloques(coeficientes_dct, tamanio_bloque=8, precision=np.float64, backend=None):
+    bloques = a_tensor_bloques(np.asarray(coeficientes_dct, dtype=precision), tamanio_bloque)
+    return desde_tensor_bloques(transformar_bloques(bloques, precision, inversa=True, backend=backend))
+
+class CoeficientesDispersos:
+    def __init__(self, forma, tamanio_bloque, indices_bloque, posiciones, valores):
+        self.forma = tuple(forma)
+        self.tamanio_bloque = tamanio_bloque
+        self.indices_bloque = np.asarray(indices_bloque, dtype=np.int32)
+        self.posiciones = np.asarray(posiciones, dtype=np.uint16)
+        self.valores = np.asarray(valores, dtype=np.float32)
+    
+    @classmethod
+    def desde_indices(cls, dct_coefs, indices_planos, tamanio_bloque=8):
+        B = tamanio_bloque
+        w = dct_coefs.shape[1]
+        indices_planos = np.sort(indices_planos)
+        filas, columnas = np.divmod(indices_planos, w)
+        indices_bloque = (filas // B) * (w // B) + columnas // B
+        posiciones = (filas % B) * B + columnas % B
+        orden = np.argsort(indices_bloque, kind='stable')
+        return cls(
+            dct_coefs.shape, B,
+            indices_bloque[orden], posiciones[orden],
+            dct_coefs.ravel()[indices_planos[orden]],
+        )
+    
+    @classmethod
+    def desde_densa(cls, dct_coefs, tamanio_bloque=8):
+        return cls.desde_indices(dct_coefs, np.flatnonzero(dct_coefs), tamanio_bloque)
+    
+    @property
+    def size(self):
+        return self.forma[0] * self.forma[1]
+    
+    @property
+    def num_coeficientes(self):
+        return len(self.valores)
+    
+    @property
+    def nbytes(self):
+        return self.indices_bloque.nbytes + self.posiciones.nbytes + self.valores.nbytes
+    
+    def _destino_esquina(self, lado):
+        B = self.tamanio_bloque
+        # Posición en la esquina lado×lado de cada posición del bloque; las que
+        # quedan fuera van a una columna de descarte extra
+        destino = np.full((B, B), lado * lado, dtype=np.intp)
+        destino[:lado, :lado] = np.arange(lado * lado).reshape(lado, lado)
+        return destino.ravel()
+    
+    def esquinas(self, lado, precision=np.float64):
+        B = self.tamanio_bloque
+        h, w = self.forma
+        tensor = np.zeros(((h // B) * (w // B), lado * lado + 1), dtype=precision)
+        tensor[self.indices_bloque, self._destino_esquina(lado)[self.posiciones]] = self.valores
+        return tensor[:, :-1].reshape(h // B, w // B, lado, lado)
+    
+    def esquinas_bloques(self, bloques, lado, precision=np.float64):
+        # Las entradas están ordenadas por bloque: cada bloque pedido es un tramo
+        # contiguo, y el coste crece con los bloques pedidos y no con la imagen
+        inicios = np.searchsorted(self.indices_bloque, bloques, side='left')
+        cantidades = np.searchsorted(self.indices_bloque, bloques, side='right') - inicios
+        desplazamientos = np.cumsum(cantidades) - cantidades
+        entradas = np.arange(cantidades.sum()) + np.repeat(inicios - desplazamientos, cantidades)
+        
+        tensor = np.zeros((len(bloques), lado * lado + 1), dtype=precision)
+        tensor[np.repeat(np.arange(len(bloques)), cantidades),
+               self._destino_esquina(lado)[self.posiciones[entradas]]] = self.valores[entradas]
+        return tensor[:, :-1].reshape(len(bloques), lado, lado)
+    
+    def densificar(self, precision=np.float64):
+        B = self.tamanio_bloque
+        h, w = self.forma
+        tensor = np.zeros(((h // B) * (w // B), B * B), dtype=precision)
+        tensor[self.indices_bloque, self.posiciones] = self.valores
+        return desde_tensor_bloques(tensor.reshape(h // B, w // B, B, B))
+
+def comprimir_imagen_dct(imagen, porcentaje_compresion, tamanio_bloque=8, precision=np.float64, modo="global"):
+    forma_original = imagen.shape
+    
+    dct_coefs, _ = aplicar_dct_bloques(imagen, tamanio_bloque, precision)
+    
+    if modo == "global":
+        coefs_filtrados, num_eliminados = eliminar_coeficientes_pequenos(
+            dct_coefs, porcentaje_compresion
+        )
+    else:
+        coefs_filtrados, num_eliminados = eliminar_coeficientes_por_bloque(
+            dct_coefs, porcentaje_compresion, tamanio_bloque, modo
+        )
     
     return coefs_filtrados, forma_original, num_eliminados
 
-def aplicar_dct_bloques(imagen, tamanio_bloque=8):
-    if imagen.dtype != np.float64:
-        imagen = imagen.astype(np.float64)
+def comprimir_imagen_dct_multiple(imagen, porcentajes, tamanio_bloque=8, dispersos=False,
+                                  precision=np.float64, reconstruir=False, flotante=False, curva=False):
+    # Con reconstruir se añaden las imágenes por porcentaje y con curva una CurvaDistorsion
+    # que reutiliza el mismo orden de coeficientes (una sola DCT y una sola ordenación)
+    forma_original = imagen.shape
     
-    h, w = imagen.shape
+    dct_coefs, _ = aplicar_dct_bloques(imagen, tamanio_bloque, precision)
+    indices_ordenados = np.argsort(np.abs(dct_coefs), axis=None)
+    
+    resultados = {}
+    for porcentaje in porcentajes:
+        if dispersos:
+            num_eliminar = max(0, int((porcentaje / 100.0) * dct_coefs.size))
+            resultados[porcentaje] = (
+                CoeficientesDispersos.desde_indices(dct_coefs, indices_ordenados[num_eliminar:], tamanio_bloque),
+                num_eliminar,
+            )
+        else:
+            resultados[porcentaje] = anular_coeficientes_ordenados(dct_coefs, indices_ordenados, porcentaje)
+    
+    salida = (dct_coefs, forma_original, resultados)
+    if reconstruir:
+        reconstructor = ReconstructorBarrido(dct_coefs, indices_ordenados, tamanio_bloque, precision)
+        salida += (dict(reconstructor.barrer(porcentajes, forma_original, flotante)),)
+    if curva:
+        salida += (CurvaDistorsion(dct_coefs, indices_ordenados),)
+    return salida
+
+def aplicar_dct_bloques(imagen, tamanio_bloque=8, precision=np.float64):
+    if imagen.dtype != precision:
+        imagen = imagen.astype(precision)
     
-    pad_h = (tamanio_bloque - (h % tamanio_bloque)) % tamanio_bloque
-    pad_w = (tamanio_bloque - (w % tamanio_bloque)) % tamanio_bloque
+    imagen = rellenar_a_bloques(imagen, tamanio_bloque)
     
-    if pad_h > 0 or pad_w > 0:
-        imagen = np.pad(imagen, ((0, pad_h), (0, pad_w)), mode='edge')
+    return dct_bloques(imagen, tamanio_bloque, precision), imagen.shape
+
+def anular_coeficientes_ordenados(dct_coefs, indices_ordenados, porcentaje):
+    num_eliminar = int((porcentaje / 100.0) * dct_coefs.size)
+    
+    return anular_primeros_coeficientes(dct_coefs, indices_ordenados, num_eliminar)
+
+def anular_primeros_coeficientes(dct_coefs, indices_ordenados, num_eliminar):
+    if num_eliminar < 1:
+        return dct_coefs.copy(), 0
     
-    h_pad, w_pad = imagen.shape
+    coefs_filtrados = dct_coefs.flatten()
+    coefs_filtrados[indices_ordenados[:num_eliminar]] = 0
     
-    num_bloques_h = h_pad // tamanio_bloque
-    num_bloques_w = w_pad // tamanio_bloque
-    total_bloques = num_bloques_h * num_bloques_w
-    print(f"  Aplicando DCT a {total_bloques} bloques de {tamanio_bloque}x{tamanio_bloque}...")
+    return coefs_filtrados.reshape(dct_coefs.shape), num_eliminar
+
+class CurvaDistorsion:
+    # La DCT por bloques es ortonormal (Parseval): anular coeficientes produce un
+    # error cuadrático igual a la suma de sus cuadrados. Es una estimación previa
+    # al recorte a [0, 255] y a la conversión a uint8.
+    def __init__(self, dct_coefs, indices_ordenados=None):
+        if indices_ordenados is None:
+            indices_ordenados = np.argsort(np.abs(dct_coefs), axis=None)
+        self.dct_coefs = dct_coefs
+        self.indices_ordenados = indices_ordenados
+        self.total = dct_coefs.size
+        
+        self.error_acumulado = np.zeros(self.total + 1, dtype=np.float64)
+        np.cumsum(np.square(dct_coefs.ravel()[indices_ordenados], dtype=np.float64), out=self.error_acumulado[1:])
+    
+    def mse(self, num_eliminar):
+        return self.error_acumulado[num_eliminar] / self.total
+    
+    def psnr(self, num_eliminar):
+        mse = np.asarray(self.mse(num_eliminar), dtype=np.float64)
+        with np.errstate(divide='ignore'):
+            return 10 * np.log10(255**2 / mse)
+    
+    def evaluar(self, porcentajes):
+        porcentajes = np.asarray(porcentajes, dtype=np.float64)
+        num_eliminar = ((porcentajes / 100.0) * self.total).astype(np.int64)
+        return {
+            'porcentajes': porcentajes,
+            'num_eliminados': num_eliminar,
+            'mse': self.mse(num_eliminar),
+            'psnr': self.psnr(num_eliminar),
+        }
+    
+    def num_eliminar_para_psnr(self, psnr_objetivo):
+        # Búsqueda binaria sobre el error acumulado (monótono): el mayor número
+        # de coeficientes anulados que mantiene el PSNR estimado >= objetivo
+        error_maximo = self.total * 255**2 / 10 ** (psnr_objetivo / 10.0)
+        return int(np.searchsorted(self.error_acumulado, error_maximo, side='right')) - 1
+    
+    def num_eliminar_para_presupuesto(self, coefs_mantenidos):
+        return int(np.clip(self.total - coefs_mantenidos, 0, self.total))
+    
+    def filtrar(self, num_eliminar):
+        return anular_primeros_coeficientes(self.dct_coefs, self.indices_ordenados, num_eliminar)
+
+# Un paso del barrido se aplica como restas de imágenes base mientras cueste menos
+# que una IDCT completa (coeficientes × B² frente a píxeles)
+PASO_MAXIMO_INCREMENTAL = 1
+PASOS_MINIMOS_INCREMENTALES = 10
+
+class ReconstructorBarrido:
+    # La IDCT es lineal: pasar de k1 a k2 coeficientes anulados (k2 > k1) equivale a
+    # restar, por cada coeficiente de rango [k1, k2), su imagen base escalada en su bloque
+    def __init__(self, dct_coefs, indices_ordenados=None, tamanio_bloque=8, precision=np.float64):
+        if indices_ordenados is None:
+            indices_ordenados = np.argsort(np.abs(dct_coefs), axis=None)
+        B = tamanio_bloque
+        h, w = dct_coefs.shape
+        self.dct_coefs = dct_coefs
+        self.indices_ordenados = indices_ordenados
+        self.tamanio_bloque = B
+        self.precision = precision
+        self.forma_bloques = (h // B, w // B)
+        self.num_eliminados = 0
+        
+        # Imagen base de cada frecuencia (u, v): IDCT de un coeficiente unitario
+        C = obtener_base_dct(B, precision)
+        self.bases = np.einsum('ui,vj->uvij', C, C).reshape(B * B, B, B)
+        
+        self._anulados_en_coeficientes = 0
+        self.rangos = None
+        
+        # Coeficientes vigentes y reconstrucción sin recortar, como bloques contiguos (n, B, B)
+        tensor = a_tensor_bloques(np.asarray(dct_coefs, dtype=precision), B)
+        self.coeficientes = np.array(tensor, copy=True).reshape(-1, B, B)
+        self.bloques = transformar_bloques(self.coeficientes, precision, inversa=True)
+    
+    def _agrupar_por_frecuencia(self):
+        # Coeficientes agrupados por frecuencia y, dentro de cada grupo, en orden de
+        # eliminación: cada paso del barrido es un tramo contiguo por frecuencia
+        B = self.tamanio_bloque
+        w = self.dct_coefs.shape[1]
+        fila, columna = np.divmod(self.indices_ordenados, w)
+        frecuencia = ((fila % B) * B + columna % B).astype(np.uint16)
+        # Ordenamiento estable de enteros de 16 bits: radix, lineal en el número de coeficientes
+        self.rangos = np.argsort(frecuencia, kind='stable')
+        self.limites = np.searchsorted(frecuencia[self.rangos], np.arange(B * B + 1))
+        self.bloques_rango = ((fila // B) * (w // B) + columna // B)[self.rangos]
+        self.valores_rango = self.dct_coefs.ravel()[self.indices_ordenados[self.rangos]].astype(self.precision)
+    
+    def paso_incremental(self, num_nuevos):
+        return num_nuevos * self.tamanio_bloque ** 2 <= PASO_MAXIMO_INCREMENTAL * self.dct_coefs.size
+    
+    def avanzar(self, num_eliminar, incremental=True):
+        if num_eliminar < self.num_eliminados:
+            raise ValueError("El barrido solo admite porcentajes crecientes")
+        inicio = self.num_eliminados
+        self.num_eliminados = num_eliminar
+        B = self.tamanio_bloque
+        
+        if not (incremental and self.paso_incremental(num_eliminar - inicio)):
+            # Salto grande (p. ej. de 0% a 50%): ~coeficientes × B² supera a una IDCT completa.
+            # Los coeficientes vigentes solo se actualizan aquí, con todo lo anulado hasta ahora
+            nuevos = self.indices_ordenados[self._anulados_en_coeficientes:num_eliminar]
+            fila, columna = np.divmod(nuevos, self.dct_coefs.shape[1])
+            self.coeficientes[(fila // B) * self.forma_bloques[1] + columna // B, fila % B, columna % B] = 0
+            self._anulados_en_coeficientes = num_eliminar
+            self.bloques = transformar_bloques(self.coeficientes, self.precision, inversa=True)
+            return
+        
+        if self.rangos is None:
+            self._agrupar_por_frecuencia()
+        
+        # Dentro de un grupo de frecuencia cada bloque aparece una sola vez: la resta
+        # indexada no necesita acumulación y el coste total es ~coeficientes × B²
+        for f in range(len(self.bases)):
+            a, b = self.limites[f], self.limites[f + 1]
+            desde, hasta = a + np.searchsorted(self.rangos[a:b], (inicio, num_eliminar))
+            if hasta > desde:
+                self.bloques[self.bloques_rango[desde:hasta]] -= (
+                    self.valores_rango[desde:hasta, None, None] * self.bases[f]
+                )
+    
+    def reconstruccion(self, forma_original):
+        # Reconstrucción en coma flotante, sin recortar ni redondear
+        bh, bw = self.forma_bloques
+        B = self.tamanio_bloque
+        imagen_rec = desde_tensor_bloques(self.bloques.reshape(bh, bw, B, B))[:forma_original[0], :forma_original[1]]
+        # Con una sola columna de bloques el reordenamiento es una vista: se copia
+        return imagen_rec.copy() if np.may_share_memory(imagen_rec, self.bloques) else imagen_rec
+    
+    def imagen(self, forma_original):
+        # Redondeo y recorte solo a la salida, sobre los bloques contiguos y antes de reordenarlos
+        bh, bw = self.forma_bloques
+        B = self.tamanio_bloque
+        redondeados = np.rint(self.bloques)
+        np.clip(redondeados, 0, 255, out=redondeados)
+        imagen_rec = desde_tensor_bloques(redondeados.astype(np.uint8).reshape(bh, bw, B, B))
+        return imagen_rec[:forma_original[0], :forma_original[1]]
+    
+    def barrer(self, porcentajes, forma_original, flotante=False):
+        salida = self.reconstruccion if flotante else self.imagen
+        porcentajes = sorted(porcentajes)
+        objetivos = [int((porcentaje / 100.0) * self.dct_coefs.size) for porcentaje in porcentajes]
+        # Agrupar por frecuencia cuesta unas diez IDCT: solo compensa en barridos con muchos pasos pequeños
+        pasos_pequenos = sum(
+            self.paso_incremental(b - a) for a, b in zip([self.num_eliminados] + objetivos, objetivos)
+        )
+        incremental = self.rangos is not None or pasos_pequenos >= PASOS_MINIMOS_INCREMENTALES
+        for porcentaje, num_eliminar in zip(porcentajes, objetivos):
+            self.avanzar(num_eliminar, incremental)
+            yield porcentaje, salida(forma_original)
+
+def comprimir_imagen_dct_objetivo(imagen, psnr_objetivo=None, coefs_mantenidos=None, tamanio_bloque=8,
+                                  precision=np.float64):
+    if (psnr_objetivo is None) == (coefs_mantenidos is None):
+        raise ValueError("Indique exactamente uno: psnr_objetivo o coefs_mantenidos")
     
-    dct_completa = np.zeros_like(imagen, dtype=np.float64)
-    bloque_actual = 0
+    forma_original = imagen.shape
+    dct_coefs, _ = aplicar_dct_bloques(imagen, tamanio_bloque, precision)
+    curva = CurvaDistorsion(dct_coefs)
     
-    for i in range(0, h_pad, tamanio_bloque):
-        for j in range(0, w_pad, tamanio_bloque):
-            bloque = imagen[i:i+tamanio_bloque, j:j+tamanio_bloque]
-            dct_bloque = dct_2d_manual(bloque)
-            dct_completa[i:i+tamanio_bloque, j:j+tamanio_bloque] = dct_bloque
-            
-            bloque_actual += 1
-            if bloque_actual % 100 == 0 or bloque_actual == total_bloques:
-                porcentaje_progreso = (bloque_actual / total_bloques) * 100
-                print(f"    Progreso: {bloque_actual}/{total_bloques} bloques ({porcentaje_progreso:.1f}%)")
+    if psnr_objetivo is not None:
+        num_eliminar = curva.num_eliminar_para_psnr(psnr_objetivo)
+    else:
+        num_eliminar = curva.num_eliminar_para_presupuesto(coefs_mantenidos)
     
-    return dct_completa, (h_pad, w_pad)
+    coefs_filtrados, num_eliminados = curva.filtrar(num_eliminar)
+    return coefs_filtrados, forma_original, num_eliminados, curva
 
-def eliminar_coeficientes_pequenos(dct_coefs, porcentaje):
-    coefs_planos = dct_coefs.flatten()
-    total_coefs = len(coefs_planos)
+@lru_cache(maxsize=None)
+def obtener_orden_zigzag(tamanio_bloque):
+    B = tamanio_bloque
+    posiciones = sorted(
+        ((i, j) for i in range(B) for j in range(B)),
+        key=lambda p: (p[0] + p[1], p[1] if (p[0] + p[1]) % 2 == 0 else p[0]),
+    )
+    orden = np.array([i * B + j for i, j in posiciones], dtype=np.intp)
+    orden.setflags(write=False)
+    return orden
+
+def conservar_primeros_zigzag(dct_coefs, coefs_por_bloque, tamanio_bloque=8):
+    # Máscara fija por posición: sin ordenamiento, un solo recorrido del tensor
+    B = tamanio_bloque
+    rango_zigzag = np.empty(B * B, dtype=np.intp)
+    rango_zigzag[obtener_orden_zigzag(B)] = np.arange(B * B)
+    mascara = (rango_zigzag < coefs_por_bloque).reshape(B, B)
+    
+    tensor = a_tensor_bloques(dct_coefs, B)
+    filtrados = desde_tensor_bloques(tensor * mascara)
+    num_bloques = tensor.shape[0] * tensor.shape[1]
+    return filtrados, int(B * B - mascara.sum()) * num_bloques
+
+def conservar_mayores_por_bloque(dct_coefs, coefs_por_bloque, tamanio_bloque=8):
+    B = tamanio_bloque
+    num_eliminar = B * B - int(np.clip(coefs_por_bloque, 0, B * B))
+    tensor = a_tensor_bloques(dct_coefs, B)
+    bh, bw = tensor.shape[:2]
+    if num_eliminar == 0:
+        return dct_coefs.copy(), 0
     
-    num_eliminar = int((porcentaje / 100.0) * total_coefs)
+    # Partición por bloque (O(B²) por bloque) en lugar de un ordenamiento global
+    bloques = np.array(tensor, copy=True).reshape(-1, B * B)
+    eliminar = np.argpartition(np.abs(bloques), num_eliminar - 1, axis=1)[:, :num_eliminar]
+    np.put_along_axis(bloques, eliminar, 0, axis=1)
+    return desde_tensor_bloques(bloques.reshape(bh, bw, B, B)), num_eliminar * bh * bw
+
+def eliminar_coeficientes_por_bloque(dct_coefs, porcentaje, tamanio_bloque=8, modo="energia"):
+    # El porcentaje se aplica dentro de cada bloque (múltiplos de 1/B²)
+    B = tamanio_bloque
+    coefs_por_bloque = B * B - int((porcentaje / 100.0) * B * B)
+    if modo == "zigzag":
+        return conservar_primeros_zigzag(dct_coefs, coefs_por_bloque, B)
+    if modo == "energia":
+        return conservar_mayores_por_bloque(dct_coefs, coefs_por_bloque, B)
+    raise ValueError(f"Modo de selección desconocido: {modo!r}")
+
+def eliminar_coeficientes_pequenos(dct_coefs, porcentaje):
+    num_eliminar = int((porcentaje / 100.0) * dct_coefs.size)
     
     if num_eliminar < 1:
         return dct_coefs.copy(), 0
     
-    indices_ordenados = np.argsort(np.abs(coefs_planos))
+    indices_ordenados = np.argsort(np.abs(dct_coefs), axis=None)
     
-    coefs_filtrados = coefs_planos.copy()
-    coefs_filtrados[indices_ordenados[:num_eliminar]] = 0
+    return anular_coeficientes_ordenados(dct_coefs, indices_ordenados, porcentaje)
+
+def reconstruir_plano_dct(coeficientes_dct, forma_original, tamanio_bloque=8, precision=np.float64):
+    # IDCT y recorte al tamaño original, sin cuantizar: para planos que aún se transforman
+    if isinstance(coeficientes_dct, CoeficientesDispersos):
+        coeficientes_dct = coeficientes_dct.densificar(precision)
     
-    coefs_filtrados = coefs_filtrados.reshape(dct_coefs.shape)
+    imagen_rec = idct_bloques(coeficientes_dct, tamanio_bloque, precision)
     
-    return coefs_filtrados, num_eliminar
+    return imagen_rec[:forma_original[0], :forma_original[1]]
 
-def descomprimir_imagen_dct(coeficientes_dct, forma_original, tamanio_bloque=8):
-    h_pad, w_pad = coeficientes_dct.shape
-    
-    num_bloques_h = h_pad // tamanio_bloque
-    num_bloques_w = w_pad // tamanio_bloque
-    total_bloques = num_bloques_h * num_bloques_w
-    print(f"  Reconstruyendo imagen desde {total_bloques} bloques...")
+def descomprimir_imagen_dct(coeficientes_dct, forma_original, tamanio_bloque=8, precision=np.float64):
+    imagen_rec = reconstruir_plano_dct(coeficientes_dct, forma_original, tamanio_bloque, precision)
     
-    imagen_rec = np.zeros_like(coeficientes_dct, dtype=np.float64)
-    bloque_actual = 0
+    imagen_rec = np.clip(imagen_rec, 0, 255).astype(np.uint8)
     
-    for i in range(0, h_pad, tamanio_bloque):
-        for j in range(0, w_pad, tamanio_bloque):
-            bloque_dct = coeficientes_dct[i:i+tamanio_bloque, j:j+tamanio_bloque]
-            bloque_rec = idct_2d_manual(bloque_dct)
-            imagen_rec[i:i+tamanio_bloque, j:j+tamanio_bloque] = bloque_rec
-            
-            bloque_actual += 1
-            if bloque_actual % 100 == 0 or bloque_actual == total_bloques:
-                porcentaje_progreso = (bloque_actual / total_bloques) * 100
-                print(f"    Progreso: {bloque_actual}/{total_bloques} bloques ({porcentaje_progreso:.1f}%)")
+    return imagen_rec
+
+def extraer_esquinas(coeficientes_dct, lado, tamanio_bloque=8, precision=np.float64):
+    if isinstance(coeficientes_dct, CoeficientesDispersos):
+        return coeficientes_dct.esquinas(lado, precision)
+    tensor = a_tensor_bloques(np.asarray(coeficientes_dct), tamanio_bloque)
+    return np.asarray(tensor[:, :, :lado, :lado], dtype=precision)
+
+def idct_esquinas(esquinas, tamanio_bloque=8, precision=np.float64):
+    # La IDCT ortonormal de r puntos sobre la esquina r×r de un bloque B×B
+    # reconstruye el bloque submuestreado B/r veces, con ganancia B/r
+    bh, bw, r, _ = esquinas.shape
+    C = obtener_base_dct(r, precision)
+    # Dos productos matriciales grandes en lugar de bh·bw productos r×r
+    filas = (esquinas.reshape(-1, r) @ C).reshape(bh, bw, r, r)
+    bloques = (filas.swapaxes(2, 3).reshape(-1, r) @ C).reshape(bh, bw, r, r).swapaxes(2, 3)
+    bloques *= r / tamanio_bloque
+    return desde_tensor_bloques(bloques)
+
+def descomprimir_vista_previa(coeficientes_dct, forma_original, factor=8, tamanio_bloque=8, precision=np.float64):
+    if tamanio_bloque % factor:
+        raise ValueError(f"El factor de reducción ({factor}) debe dividir al tamaño de bloque ({tamanio_bloque})")
     
-    imagen_rec = imagen_rec[:forma_original[0], :forma_original[1]]
+    esquinas = extraer_esquinas(coeficientes_dct, tamanio_bloque // factor, tamanio_bloque, precision)
+    imagen_rec = idct_esquinas(esquinas, tamanio_bloque, precision)
     
-    imagen_rec = np.clip(imagen_rec, 0, 255).astype(np.uint8)
+    alto = -(-forma_original[0] // factor)
+    ancho = -(-forma_original[1] // factor)
+    imagen_rec = imagen_rec[:alto, :ancho]
     
-    return imagen_rec
+    return np.clip(imagen_rec, 0, 255).astype(np.uint8)
+
+class DecodificadorRegiones:
+    # Decodifica bajo demanda solo los bloques de una región, a la escala pedida
+    # (esquina de baja frecuencia), y guarda cada bloque para consultas posteriores.
+    # Con flotante=True devuelve el plano sin cuantizar, para planos que aún se transforman
+    def __init__(self, coeficientes_dct, forma_original, tamanio_bloque=8, precision=np.float64, flotante=False):
+        B = tamanio_bloque
+        if isinstance(coeficientes_dct, CoeficientesDispersos):
+            h, w = coeficientes_dct.forma
+        else:
+            h, w = coeficientes_dct.shape
+        self.coeficientes_dct = coeficientes_dct
+        self.forma_original = forma_original
+        self.tamanio_bloque = B
+        self.precision = precision
+        self.flotante = flotante
+        self.forma_bloques = (h // B, w // B)
+        self.bloques_por_factor = {}
+        self.bloques_decodificados = 0
+    
+    def factor_para_escala(self, pixeles_por_punto):
+        # Mayor reducción que no baja de un píxel decodificado por punto de pantalla
+        factor = 1
+        while factor * 2 <= min(pixeles_por_punto, self.tamanio_bloque) and self.tamanio_bloque % (factor * 2) == 0:
+            factor *= 2
+        return factor
+    
+    def _esquinas(self, filas, columnas, lado):
+        if isinstance(self.coeficientes_dct, CoeficientesDispersos):
+            bloques = filas * self.forma_bloques[1] + columnas
+            return self.coeficientes_dct.esquinas_bloques(bloques, lado, self.precision)
+        tensor = a_tensor_bloques(self.coeficientes_dct, self.tamanio_bloque)
+        return np.asarray(tensor[filas, columnas, :lado, :lado], dtype=self.precision)
+    
+    def region(self, fila_inicio, fila_fin, columna_inicio, columna_fin, factor=1):
+        B = self.tamanio_bloque
+        h, w = self.forma_original[:2]
+        lado = B // factor
+        fila_inicio, fila_fin = max(0, fila_inicio), min(h, fila_fin)
+        columna_inicio, columna_fin = max(0, columna_inicio), min(w, columna_fin)
+        bi0, bi1 = fila_inicio // B, -(-fila_fin // B)
+        bj0, bj1 = columna_inicio // B, -(-columna_fin // B)
+        
+        if factor not in self.bloques_por_factor:
+            bh, bw = self.forma_bloques
+            self.bloques_por_factor[factor] = (
+                np.zeros((bh, bw, lado, lado), dtype=self.precision if self.flotante else np.uint8),
+                np.zeros((bh, bw), dtype=bool),
+            )
+        bloques, decodificados = self.bloques_por_factor[factor]
+        
+        filas, columnas = np.nonzero(~decodificados[bi0:bi1, bj0:bj1])
+        if len(filas):
+            filas += bi0
+            columnas += bj0
+            # IDCT de lado puntos sobre la esquina lado×lado: bloque reducido con ganancia lado/B
+            reconstruidos = transformar_bloques(self._esquinas(filas, columnas, lado), self.precision, inversa=True)
+            reconstruidos *= lado / B
+            if not self.flotante:
+                reconstruidos = np.clip(np.rint(reconstruidos), 0, 255)
+            bloques[filas, columnas] = reconstruidos
+            decodificados[filas, columnas] = True
+            self.bloques_decodificados += len(filas)
+        
+        # Región alineada a bloques y recortada al borde de la imagen original
+        fila_inicio, columna_inicio = bi0 * B, bj0 * B
+        fila_fin, columna_fin = min(h, bi1 * B), min(w, bj1 * B)
+        imagen = desde_tensor_bloques(bloques[bi0:bi1, bj0:bj1])
+        imagen = imagen[:-(-(fila_fin - fila_inicio) // factor), :-(-(columna_fin - columna_inicio) // factor)]
+        return imagen, (fila_inicio, fila_fin, columna_inicio, columna_fin)
 
-def calcular_metricas_compresion(imagen_original, imagen_comprimida, num_coefs_eliminados, total_coefs):
+def descomprimir_progresivo(coeficientes_dct, forma_original, tamanio_bloque=8, precision=np.float64,
+                            factores=(8, 4, 2, 1)):
+    for factor in factores:
+        if factor == 1:
+            yield factor, descomprimir_imagen_dct(coeficientes_dct, forma_original, tamanio_bloque, precision)
+        else:
+            yield factor, descomprimir_vista_previa(
+                coeficientes_dct, forma_original, factor, tamanio_bloque, precision
+            )
+
+def calcular_metricas_compresion(imagen_original, imagen_comprimida, num_coefs_eliminados, total_coefs,
+                                 bytes_comprimidos=None):
     mse = np.mean((imagen_original.astype(float) - imagen_comprimida.astype(float)) ** 2)
-    
+    return metricas_desde_mse(imagen_original, mse, num_coefs_eliminados, total_coefs, bytes_comprimidos)
+
+def estimar_metricas_compresion(imagen_original, curva, num_coefs_eliminados, total_coefs, bytes_comprimidos=None):
+    # Mismas claves que calcular_metricas_compresion sin reconstruir la imagen:
+    # el MSE sale de la energía de los coeficientes anulados (CurvaDistorsion)
+    metricas = metricas_desde_mse(
+        imagen_original, float(curva.mse(num_coefs_eliminados)), num_coefs_eliminados, total_coefs, bytes_comprimidos
+    )
+    metricas['estimada'] = True
+    return metricas
+
+def metricas_desde_mse(imagen_original, mse, num_coefs_eliminados, total_coefs, bytes_comprimidos=None):
     if mse == 0:
         psnr = float('inf')
     else:
@@ -204,7 +589,7 @@ def calcular_metricas_compresion(imagen_original, imagen_comprimida, num_coefs_e
     
     coefs_mantenidos = total_coefs - num_coefs_eliminados
     
-    return {
+    metricas = {
         'mse': mse,
         'psnr': psnr,
         'tasa_compresion': tasa_compresion,
@@ -212,3 +597,15 @@ def calcular_metricas_compresion(imagen_original, imagen_comprimida, num_coefs_e
         'coefs_mantenidos': coefs_mantenidos,
         'total_coefs': total_coefs
     }
+    
+    if bytes_comprimidos is not None:
+        metricas.update(metricas_tamanio(imagen_original, bytes_comprimidos))
+    
+    return metricas
+
+def metricas_tamanio(imagen_original, bytes_comprimidos):
+    return {
+        'bytes': bytes_comprimidos,
+        'bpp': 8.0 * bytes_comprimidos / (imagen_original.shape[0] * imagen_original.shape[1]),
+        'razon_compresion': imagen_original.nbytes / bytes_comprimidos,
+    }
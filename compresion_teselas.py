@@ -0,0 +1,165 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import cv2
+
+from compresion_dct import rellenar_a_bloques, dct_bloques, idct_bloques
+from configuracion import (
+    TAMANIO_TESELA_COMPRESION,
+    CONTENEDORES_HISTOGRAMA_MAGNITUD,
+    RANGO_LOG_MAGNITUD,
+)
+
+def abrir_imagen_grande(ruta):
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == ".npy":
+        imagen = np.load(ruta, mmap_mode="r")
+    else:
+        # Los formatos comprimidos (png, jpg) se decodifican completos; para
+        # imágenes mayores que la RAM conviértalas antes a .npy
+        imagen = cv2.imread(str(ruta), cv2.IMREAD_GRAYSCALE)
+        if imagen is None:
+            raise ValueError(f"No se pudo leer la imagen: {ruta}")
+    if imagen.ndim != 2:
+        raise ValueError("Se esperaba una imagen en escala de grises (2D)")
+    return imagen
+
+def forma_rellena(forma, tamanio_bloque=8):
+    B = tamanio_bloque
+    return tuple(-(-n // B) * B for n in forma)
+
+def iterar_teselas(forma, tamanio_tesela=TAMANIO_TESELA_COMPRESION):
+    h, w = forma
+    for i in range(0, h, tamanio_tesela):
+        for j in range(0, w, tamanio_tesela):
+            yield i, j, min(i + tamanio_tesela, h), min(j + tamanio_tesela, w)
+
+def _contenedores_magnitud(coeficientes):
+    minimo, maximo = RANGO_LOG_MAGNITUD
+    n = CONTENEDORES_HISTOGRAMA_MAGNITUD
+    log_magnitud = np.log10(np.maximum(np.abs(coeficientes), 10.0 ** minimo))
+    indices = ((log_magnitud - minimo) * (n / (maximo - minimo))).astype(np.int64)
+    return np.clip(indices, 0, n - 1).ravel()
+
+def _borde_contenedor(i):
+    minimo, maximo = RANGO_LOG_MAGNITUD
+    return 10.0 ** (minimo + i * (maximo - minimo) / CONTENEDORES_HISTOGRAMA_MAGNITUD)
+
+def umbral_desde_histograma(histograma, porcentaje):
+    total = int(histograma.sum())
+    num_eliminar = int((porcentaje / 100.0) * total)
+    if num_eliminar < 1:
+        return 0.0
+    if num_eliminar >= total:
+        return np.inf
+    
+    acumulado = np.cumsum(histograma)
+    i = int(np.searchsorted(acumulado, num_eliminar))
+    # Cortar antes o después del contenedor que contiene el k-ésimo coeficiente,
+    # el que deje el número de eliminados más cercano al pedido
+    debajo = int(acumulado[i - 1]) if i > 0 else 0
+    if num_eliminar - debajo <= int(acumulado[i]) - num_eliminar:
+        return _borde_contenedor(i)
+    return _borde_contenedor(i + 1)
+
+def comprimir_imagen_por_teselas(imagen, porcentaje_compresion, ruta_salida, tamanio_bloque=8,
+                                 tamanio_tesela=TAMANIO_TESELA_COMPRESION, precision=np.float32):
+    B = tamanio_bloque
+    if tamanio_tesela % B:
+        raise ValueError("El tamaño de tesela debe ser múltiplo del tamaño de bloque")
+    
+    forma_original = imagen.shape
+    coeficientes = np.lib.format.open_memmap(
+        ruta_salida, mode="w+", dtype=precision, shape=forma_rellena(forma_original, B)
+    )
+    
+    # Pasada 1: DCT por teselas, escritura incremental e histograma de magnitudes
+    histograma = np.zeros(CONTENEDORES_HISTOGRAMA_MAGNITUD, dtype=np.int64)
+    for i0, j0, i1, j1 in iterar_teselas(forma_original, tamanio_tesela):
+        tesela = rellenar_a_bloques(np.asarray(imagen[i0:i1, j0:j1], dtype=precision), B)
+        dct = dct_bloques(tesela, B, precision)
+        coeficientes[i0:i0 + dct.shape[0], j0:j0 + dct.shape[1]] = dct
+        histograma += np.bincount(_contenedores_magnitud(dct), minlength=CONTENEDORES_HISTOGRAMA_MAGNITUD)
+    
+    umbral = umbral_desde_histograma(histograma, porcentaje_compresion)
+    
+    # Pasada 2: anular en el sitio los coeficientes por debajo del umbral global
+    num_eliminados = 0
+    for i0, j0, i1, j1 in iterar_teselas(coeficientes.shape, tamanio_tesela):
+        tesela = coeficientes[i0:i1, j0:j1]
+        mascara = np.abs(tesela) < umbral
+        tesela[mascara] = 0
+        num_eliminados += int(np.count_nonzero(mascara))
+    
+    coeficientes.flush()
+    total_coefs = coeficientes.size
+    del coeficientes
+    
+    return {
+        'ruta': str(ruta_salida),
+        'forma_original': forma_original,
+        'tamanio_bloque': B,
+        'umbral': float(umbral),
+        'num_eliminados': num_eliminados,
+        'total_coefs': total_coefs,
+    }
+
+def descomprimir_imagen_por_teselas(ruta_coeficientes, forma_original, ruta_salida, tamanio_bloque=8,
+                                    tamanio_tesela=TAMANIO_TESELA_COMPRESION, imagen_original=None):
+    B = tamanio_bloque
+    h, w = forma_original
+    coeficientes = np.load(ruta_coeficientes, mmap_mode="r")
+    salida = np.lib.format.open_memmap(ruta_salida, mode="w+", dtype=np.uint8, shape=(h, w))
+    
+    suma_error = 0.0
+    for i0, j0, i1, j1 in iterar_teselas(coeficientes.shape, tamanio_tesela):
+        tesela = idct_bloques(coeficientes[i0:i1, j0:j1], B, coeficientes.dtype)
+        tesela = np.clip(tesela[:max(0, h - i0), :max(0, w - j0)], 0, 255).astype(np.uint8)
+        salida[i0:i0 + tesela.shape[0], j0:j0 + tesela.shape[1]] = tesela
+        
+        if imagen_original is not None:
+            diferencia = tesela.astype(np.float64) - imagen_original[i0:i0 + tesela.shape[0], j0:j0 + tesela.shape[1]]
+            suma_error += float(np.einsum("ij,ij->", diferencia, diferencia))
+    
+    salida.flush()
+    del salida
+    
+    if imagen_original is None:
+        return None
+    mse = suma_error / (h * w)
+    return {
+        'mse': mse,
+        'psnr': float('inf') if mse == 0 else 10 * np.log10(255**2 / mse),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compresión DCT por teselas para imágenes grandes")
+    parser.add_argument("entrada", help="Imagen en escala de grises (.npy se lee como mapa de memoria)")
+    parser.add_argument("salida", help="Archivo .npy de coeficientes DCT filtrados")
+    parser.add_argument("--porcentaje", type=float, default=90.0, help="Porcentaje de coeficientes eliminados")
+    parser.add_argument("--bloque", type=int, default=8, help="Tamaño de bloque DCT")
+    parser.add_argument("--tesela", type=int, default=TAMANIO_TESELA_COMPRESION, help="Lado de tesela en píxeles")
+    parser.add_argument("--reconstruir", help="Archivo .npy donde escribir la imagen reconstruida")
+    args = parser.parse_args()
+    
+    try:
+        imagen = abrir_imagen_grande(args.entrada)
+    except ValueError as e:
+        sys.exit(str(e))
+    
+    resultado = comprimir_imagen_por_teselas(
+        imagen, args.porcentaje, args.salida, tamanio_bloque=args.bloque, tamanio_tesela=args.tesela
+    )
+    print(f"✓ Coeficientes guardados en: {resultado['ruta']}")
+    print(f"  Umbral global: {resultado['umbral']:.4f}")
+    print(f"  Eliminados: {resultado['num_eliminados']:,} de {resultado['total_coefs']:,} "
+          f"({100.0 * resultado['num_eliminados'] / resultado['total_coefs']:.2f}%)")
+    
+    if args.reconstruir:
+        metricas = descomprimir_imagen_por_teselas(
+            args.salida, resultado['forma_original'], args.reconstruir,
+            tamanio_bloque=args.bloque, tamanio_tesela=args.tesela, imagen_original=imagen
+        )
+        print(f"✓ Imagen reconstruida en: {args.reconstruir} (PSNR {metricas['psnr']:.2f} dB)")
@@ -19,6 +19,9 @@ N_FFT = 4096
 NUMERO_SUBBANDAS = 16
 VENTANA = "hamming"
 
+EXTRACTOR_CARACTERISTICAS = "fft"
+PASO_BANCO_IIR_MS = 4
+
 FRECUENCIA_CORTE_PB = 3500
 ORDEN_FILTRO = 4
 PREENFASIS_ALPHA = 0.97
@@ -27,5 +30,63 @@ UMBRAL_ENERGIA_SILENCIO = 0.01
 MARGEN_SILENCIO_MS = 100
 
 ARCHIVO_UMBRALES = Path("umbrales_comandos.json")
+DIRECTORIO_CACHE_ESPECTROS = Path("cache_espectros")
 
 DURACION_GRABACION_SEGUNDOS = 1.0
+
+ARCHIVO_DETECTOR_CASCADA = Path("detector_cascada.json")
+DURACION_TRAMA_DETECTOR_MS = 20
+RANGO_ACTIVIDAD_DETECTOR_DB = 20
+PERCENTIL_DETECTOR_CASCADA = 99.5
+MARGEN_DETECTOR_CASCADA = 0.1
+
+DURACION_ANILLO_SEGUNDOS = 8.0
+BLOQUE_CAPTURA_MS = 20
+PREROLL_CAPTURA_MS = 150
+UMBRAL_VAD_CAPTURA_DB = 12
+NIVEL_MINIMO_VAD_CAPTURA_DB = -70
+
+# Precisión de las transformadas de imagen (float32 basta para imágenes de 8 bits)
+PRECISION_IMAGENES = "float32"
+
+# Memoria máxima de la caché LRU de mapas y transformadas de la ventana de compresión
+MEMORIA_CACHE_VENTANA_MB = 256
+
+# Por encima de estos píxeles la ventana no reconstruye cada porcentaje al comprimir:
+# las métricas se estiman con CurvaDistorsion y la imagen completa se decodifica a demanda
+PIXELES_RECONSTRUCCION_INMEDIATA = 4_000_000
+
+# Backend de la DCT por bloques: "auto" (calibrado en esta máquina), "matriz", "scipy" u "opencv"
+BACKEND_DCT = "auto"
+ARCHIVO_CALIBRACION_DCT = Path("calibracion_dct.json")
+
+# Compresión por teselas para imágenes que no caben en memoria
+TAMANIO_TESELA_COMPRESION = 1024
+CONTENEDORES_HISTOGRAMA_MAGNITUD = 1 << 16
+RANGO_LOG_MAGNITUD = (-8.0, 8.0)
+
+PERFILES_RECONOCIMIENTO = {
+    "preciso": {
+        "N": N_FFT,
+        "duracion": DURACION_GRABACION_SEGUNDOS,
+        "archivo_umbrales": ARCHIVO_UMBRALES,
+    },
+    "baja_latencia": {
+        "N": 2048,
+        "duracion": 0.5,
+        "archivo_umbrales": Path("umbrales_baja_latencia.json"),
+    },
+    "latencia_minima": {
+        "N": 1024,
+        "duracion": 0.5,
+        "archivo_umbrales": Path("umbrales_latencia_minima.json"),
+    },
+    "continuo": {
+        "N": 1024,
+        "duracion": 0.5,
+        "archivo_umbrales": Path("umbrales_continuo.json"),
+        "extractor": "iir",
+    },
+}
+
+PERFIL_ACTIVO = "preciso"
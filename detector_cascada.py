@@ -0,0 +1,187 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from configuracion import (
+    DIRECTORIOS_COMANDOS,
+    ARCHIVO_DETECTOR_CASCADA,
+    DURACION_TRAMA_DETECTOR_MS,
+    RANGO_ACTIVIDAD_DETECTOR_DB,
+    PERCENTIL_DETECTOR_CASCADA,
+    MARGEN_DETECTOR_CASCADA,
+)
+from perfiles_reconocimiento import obtener_perfil
+
+NOMBRES_CARACTERISTICAS = ("banda_baja", "banda_alta", "zcr", "duracion_activa_ms", "dinamica_db")
+
+def calcular_caracteristicas_detector(senal, fs):
+    L = max(2, int(fs * DURACION_TRAMA_DETECTOR_MS / 1000))
+    n_tramas = len(senal) // L
+    if n_tramas == 0:
+        return np.zeros(len(NOMBRES_CARACTERISTICAS))
+    
+    tramas = np.asarray(senal[:n_tramas * L], dtype=np.float64).reshape(n_tramas, L)
+    tramas = tramas - tramas.mean()
+    
+    energia = np.einsum("ij,ij->i", tramas, tramas) + 1e-12
+    suma = tramas[:, 1:] + tramas[:, :-1]
+    diferencia = tramas[:, 1:] - tramas[:, :-1]
+    banda_baja = np.einsum("ij,ij->i", suma, suma) / energia
+    banda_alta = np.einsum("ij,ij->i", diferencia, diferencia) / energia
+    zcr = np.mean(np.signbit(tramas[:, 1:]) != np.signbit(tramas[:, :-1]), axis=1)
+    
+    energia_db = 10.0 * np.log10(energia)
+    activas = energia_db > energia_db.max() - RANGO_ACTIVIDAD_DETECTOR_DB
+    
+    return np.array([
+        np.mean(np.log(banda_baja[activas] + 1e-12)),
+        np.mean(np.log(banda_alta[activas] + 1e-12)),
+        np.mean(zcr[activas]),
+        activas.sum() * DURACION_TRAMA_DETECTOR_MS,
+        energia_db.max() - np.median(energia_db),
+    ])
+
+class DetectorCascada:
+    def __init__(self, inferior, superior, fs, perfil=None):
+        self.inferior = np.asarray(inferior, dtype=np.float64)
+        self.superior = np.asarray(superior, dtype=np.float64)
+        self.rango = np.maximum(self.superior - self.inferior, 1e-9)
+        self.fs = int(fs)
+        self.perfil = perfil
+        self.reiniciar_contadores()
+    
+    def reiniciar_contadores(self):
+        self.evaluados = 0
+        self.admitidos = 0
+        self.rechazados = 0
+        self.tiempo_detector_s = 0.0
+        self.tiempo_completo_s = 0.0
+        self.ejecuciones_completas = 0
+    
+    def puntuacion(self, senal):
+        f = calcular_caracteristicas_detector(senal, self.fs)
+        exceso = np.maximum(self.inferior - f, f - self.superior) / self.rango
+        return float(exceso.max())
+    
+    def admitir(self, senal):
+        inicio = time.perf_counter()
+        puntuacion = self.puntuacion(senal)
+        admitido = puntuacion <= 0.0
+        self.tiempo_detector_s += time.perf_counter() - inicio
+        
+        self.evaluados += 1
+        if admitido:
+            self.admitidos += 1
+        else:
+            self.rechazados += 1
+        return admitido, puntuacion
+    
+    def registrar_etapa_completa(self, segundos):
+        self.tiempo_completo_s += segundos
+        self.ejecuciones_completas += 1
+    
+    def estadisticas(self):
+        tiempo_completo_medio = (
+            self.tiempo_completo_s / self.ejecuciones_completas if self.ejecuciones_completas else 0.0
+        )
+        return {
+            "evaluados": self.evaluados,
+            "admitidos": self.admitidos,
+            "rechazados": self.rechazados,
+            "tasa_paso": self.admitidos / self.evaluados if self.evaluados else 0.0,
+            "tiempo_detector_ms": 1000.0 * self.tiempo_detector_s / self.evaluados if self.evaluados else 0.0,
+            "tiempo_completo_ms": 1000.0 * tiempo_completo_medio,
+            "cpu_ahorrado_s": max(0.0, self.rechazados * tiempo_completo_medio - self.tiempo_detector_s),
+        }
+    
+    def datos(self):
+        return {
+            "caracteristicas": list(NOMBRES_CARACTERISTICAS),
+            "inferior": self.inferior.tolist(),
+            "superior": self.superior.tolist(),
+            "fs": self.fs,
+            "duracion": obtener_perfil(self.perfil).duracion,
+        }
+
+def _cargar_archivo_detector(ruta=ARCHIVO_DETECTOR_CASCADA):
+    if not Path(ruta).exists():
+        return {}
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def guardar_detector_cascada(detector, ruta=ARCHIVO_DETECTOR_CASCADA):
+    perfil = obtener_perfil(detector.perfil)
+    datos = _cargar_archivo_detector(ruta)
+    datos[perfil.nombre] = detector.datos()
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+
+def entrenar_detector_cascada(directorios_comandos=DIRECTORIOS_COMANDOS, perfil=None,
+                              percentil=PERCENTIL_DETECTOR_CASCADA, margen=MARGEN_DETECTOR_CASCADA,
+                              corpus=None):
+    from evaluacion_perfiles import cargar_corpus, simular_captura
+    
+    perfil = obtener_perfil(perfil)
+    corpus = corpus if corpus is not None else cargar_corpus(directorios_comandos)
+    matriz = np.vstack([
+        calcular_caracteristicas_detector(simular_captura(senal, perfil), perfil.fs)
+        for _, _, senal in corpus
+    ])
+    
+    inferior = np.percentile(matriz, 100.0 - percentil, axis=0)
+    superior = np.percentile(matriz, percentil, axis=0)
+    holgura = margen * (superior - inferior)
+    return DetectorCascada(inferior - holgura, superior + holgura, perfil.fs, perfil)
+
+def obtener_detector_cascada(perfil=None, ruta=ARCHIVO_DETECTOR_CASCADA):
+    perfil = obtener_perfil(perfil)
+    datos = _cargar_archivo_detector(ruta).get(perfil.nombre)
+    if datos is not None and datos["fs"] == perfil.fs and datos["duracion"] == perfil.duracion:
+        return DetectorCascada(datos["inferior"], datos["superior"], datos["fs"], perfil)
+    
+    detector = entrenar_detector_cascada(perfil=perfil)
+    guardar_detector_cascada(detector, ruta)
+    return detector
+
+def generar_senales_rechazo(perfil, semilla=0):
+    rng = np.random.default_rng(semilla)
+    n = perfil.muestras_captura
+    t = np.arange(n) / perfil.fs
+    
+    clics = 0.001 * rng.standard_normal(n)
+    for posicion in rng.integers(0, n - 80, size=6):
+        clics[posicion:posicion + 80] += 0.3 * rng.standard_normal(80) * np.exp(-np.arange(80) / 15.0)
+    
+    return {
+        "ruido_blanco": 0.05 * rng.standard_normal(n),
+        "ruido_marron": 0.01 * np.cumsum(rng.standard_normal(n)) / np.sqrt(n),
+        "zumbido_50hz": 0.1 * np.sin(2 * np.pi * 50 * t) + 0.03 * np.sin(2 * np.pi * 150 * t),
+        "teclado": clics,
+    }
+
+if __name__ == "__main__":
+    from evaluacion_perfiles import cargar_corpus, simular_captura
+    
+    perfil = obtener_perfil(sys.argv[1] if len(sys.argv) > 1 else None)
+    corpus = cargar_corpus()
+    detector = entrenar_detector_cascada(perfil=perfil, corpus=corpus)
+    guardar_detector_cascada(detector)
+    
+    for _, _, senal in corpus:
+        detector.admitir(simular_captura(senal, perfil))
+    tasa_comandos = detector.estadisticas()["tasa_paso"]
+    
+    print(f"\n{'='*60}")
+    print(f"Detector en cascada (perfil: {perfil.nombre})")
+    print(f"{'-'*60}")
+    print(f"{'comandos (corpus)':<24}{100 * tasa_comandos:>8.1f}% admitidos")
+    for nombre, senal in generar_senales_rechazo(perfil).items():
+        admitido, puntuacion = detector.admitir(senal)
+        print(f"{nombre:<24}{'admitido' if admitido else 'rechazado':>10}  (puntuación {puntuacion:.2f})")
+    print(f"{'-'*60}")
+    print(f"Tiempo medio del detector: {detector.estadisticas()['tiempo_detector_ms']:.3f} ms")
+    print(f"✓ Detector guardado en: {ARCHIVO_DETECTOR_CASCADA}")
+    print(f"{'='*60}\n")
@@ -1,4 +1,5 @@
 import json
+import sys
 from pathlib import Path
 import numpy as np
 
@@ -13,14 +14,14 @@ from configuracion import (
 from procesamiento_audio import (
     cargar_senal_desde_wav,
     re_muestrear_senal,
-    eliminar_silencio_voz,
-    aplicar_preenfasis,
-    filtrar_ruido_pasabajos,
-    extraer_ventana_maxima_energia,
 )
 from banco_filtros import (
     calcular_estadisticos_energias,
+    bordes_subbandas_lineales,
+    reducir_subbandas,
 )
+from perfiles_reconocimiento import obtener_perfil
+from pipeline_caracteristicas import obtener_pipeline
 
 def obtener_rutas_wav_directorio(directorio):
     return sorted(Path(directorio).glob("*.wav"))
@@ -31,27 +32,33 @@ def _seleccionar_directorio_existente(rutas_candidatas):
             return Path(ruta)
     return Path(rutas_candidatas[0])
 
-def procesar_senal_entrenamiento(ruta_archivo):
-    from banco_filtros import calcular_vector_energias_temporal
-    
+def cargar_senal_entrenamiento(ruta_archivo):
     fs_original, senal = cargar_senal_desde_wav(ruta_archivo)
-    senal = re_muestrear_senal(fs_original, senal)
-    senal = filtrar_ruido_pasabajos(senal, FRECUENCIA_MUESTREO_OBJETIVO)
-    senal = eliminar_silencio_voz(senal, FRECUENCIA_MUESTREO_OBJETIVO)
-    senal = aplicar_preenfasis(senal)
-    senal = extraer_ventana_maxima_energia(senal, N_FFT)
-    
-    vector_energias = calcular_vector_energias_temporal(
-        senal,
-        fs=FRECUENCIA_MUESTREO_OBJETIVO,
-        N=N_FFT,
-        K=NUMERO_SUBBANDAS,
-        window=VENTANA
-    )
-    
-    return vector_energias
+    return re_muestrear_senal(fs_original, senal)
+
+def preprocesar_senal_entrenamiento(senal, perfil=None):
+    return obtener_pipeline(perfil).preprocesar(senal)
+
+def espectro_desde_senal_preprocesada(senal, perfil=None):
+    pipeline = obtener_pipeline(perfil)
+    return pipeline.espectro_potencia(pipeline.ventana_desde_preprocesada(senal)).copy()
 
-def entrenar_modelo_comandos(directorios_comandos):
+def extraer_espectro_entrenamiento(senal, perfil=None):
+    return obtener_pipeline(perfil).extraer_espectro(senal)
+
+def extraer_vector_entrenamiento(senal, perfil=None):
+    return obtener_pipeline(perfil).extraer(senal).copy()
+
+def procesar_senal_entrenamiento(ruta_archivo, perfil=None):
+    senal = cargar_senal_entrenamiento(ruta_archivo)
+    return extraer_vector_entrenamiento(senal, perfil)
+
+def entrenar_modelo_comandos(directorios_comandos, perfil=None, usar_almacen=True):
+    from almacen_espectros import AlmacenEspectros
+    
+    perfil = obtener_perfil(perfil)
+    almacen = AlmacenEspectros(perfil) if usar_almacen and perfil.extractor == "fft" else None
+    bordes = bordes_subbandas_lineales(perfil.N // 2, perfil.K)
     resultados = {}
     
     for nombre_comando, rutas_candidatas in directorios_comandos.items():
@@ -71,7 +78,10 @@ def entrenar_modelo_comandos(directorios_comandos):
         vectores_energia = []
         for i, ruta in enumerate(archivos_wav, 1):
             try:
-                vector = procesar_senal_entrenamiento(ruta)
+                if almacen is not None:
+                    vector = reducir_subbandas(almacen.obtener(ruta, nombre_comando), bordes)
+                else:
+                    vector = procesar_senal_entrenamiento(ruta, perfil)
                 vectores_energia.append(vector)
                 print(f"  {i}/{len(archivos_wav)} - {ruta.name}: {vector}")
             except Exception as e:
@@ -94,26 +104,25 @@ def entrenar_modelo_comandos(directorios_comandos):
         print(f"  Media: {medias}")
         print(f"  Desviación: {desviaciones}")
     
+    if almacen is not None:
+        almacen.guardar()
+    
     datos_salida = {
-        "config": {
-            "fs": FRECUENCIA_MUESTREO_OBJETIVO,
-            "N": N_FFT,
-            "K": NUMERO_SUBBANDAS,
-            "window": VENTANA
-        },
+        "config": obtener_pipeline(perfil).configuracion(),
         "commands": resultados
     }
     
-    with open(ARCHIVO_UMBRALES, "w", encoding="utf-8") as f:
+    with open(perfil.archivo_umbrales, "w", encoding="utf-8") as f:
         json.dump(datos_salida, f, indent=2, ensure_ascii=False)
     
     print(f"\n{'='*60}")
-    print(f"✓ Entrenamiento completado")
-    print(f"✓ Umbrales guardados en: {ARCHIVO_UMBRALES}")
+    print(f"✓ Entrenamiento completado (perfil: {perfil.nombre})")
+    print(f"✓ Umbrales guardados en: {perfil.archivo_umbrales}")
     print(f"{'='*60}\n")
     
     return datos_salida
 
 if __name__ == "__main__":
+    nombre_perfil = sys.argv[1] if len(sys.argv) > 1 else None
     print("Iniciando entrenamiento del modelo de comandos...")
-    entrenar_modelo_comandos(DIRECTORIOS_COMANDOS)
+    entrenar_modelo_comandos(DIRECTORIOS_COMANDOS, nombre_perfil)
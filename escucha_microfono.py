@@ -0,0 +1,65 @@
+import threading
+
+ESTADO_DETENIDO = "detenido"
+ESTADO_ACTIVO = "activo"
+ESTADO_PAUSADO = "pausado"
+ESTADO_CERRANDO = "cerrando"
+
+class ControlEscucha:
+    def __init__(self, umbrales=None):
+        self._condicion = threading.Condition()
+        self._estado = ESTADO_DETENIDO
+        self._umbrales = umbrales
+        self._version_modelo = 0
+    
+    @property
+    def estado(self):
+        with self._condicion:
+            return self._estado
+    
+    @property
+    def activo(self):
+        return self.estado == ESTADO_ACTIVO
+    
+    def _cambiar_estado(self, nuevo, permitidos):
+        with self._condicion:
+            if self._estado not in permitidos:
+                return False
+            self._estado = nuevo
+            self._condicion.notify_all()
+            return True
+    
+    def activar(self):
+        return self._cambiar_estado(ESTADO_ACTIVO, (ESTADO_DETENIDO, ESTADO_PAUSADO))
+    
+    def pausar(self):
+        return self._cambiar_estado(ESTADO_PAUSADO, (ESTADO_ACTIVO,))
+    
+    def reanudar(self):
+        return self._cambiar_estado(ESTADO_ACTIVO, (ESTADO_PAUSADO,))
+    
+    def cerrar(self):
+        return self._cambiar_estado(ESTADO_CERRANDO, (ESTADO_DETENIDO, ESTADO_ACTIVO, ESTADO_PAUSADO))
+    
+    def cambiar_modelo(self, umbrales):
+        with self._condicion:
+            self._umbrales = umbrales
+            self._version_modelo += 1
+            self._condicion.notify_all()
+    
+    def modelo(self):
+        with self._condicion:
+            return self._umbrales, self._version_modelo
+    
+    def esperar_activo(self):
+        with self._condicion:
+            self._condicion.wait_for(
+                lambda: self._estado == ESTADO_CERRANDO
+                or (self._estado == ESTADO_ACTIVO and self._umbrales is not None)
+            )
+            return self._estado == ESTADO_ACTIVO
+    
+    def esperar(self, segundos):
+        with self._condicion:
+            self._condicion.wait_for(lambda: self._estado != ESTADO_ACTIVO, timeout=segundos)
+            return self._estado == ESTADO_ACTIVO
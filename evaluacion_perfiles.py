@@ -0,0 +1,118 @@
+import sys
+import time
+
+import numpy as np
+
+from configuracion import DIRECTORIOS_COMANDOS
+from entrenamiento_comandos import (
+    obtener_rutas_wav_directorio,
+    _seleccionar_directorio_existente,
+    cargar_senal_entrenamiento,
+    extraer_vector_entrenamiento,
+)
+from banco_filtros import calcular_estadisticos_energias
+from reconocimiento_comandos import calcular_distancias_comandos
+from perfiles_reconocimiento import obtener_perfil, listar_perfiles
+
+def cargar_corpus(directorios_comandos=DIRECTORIOS_COMANDOS):
+    corpus = []
+    for nombre_comando, rutas_candidatas in directorios_comandos.items():
+        directorio = _seleccionar_directorio_existente(rutas_candidatas)
+        for ruta in obtener_rutas_wav_directorio(directorio):
+            try:
+                corpus.append((nombre_comando, ruta, cargar_senal_entrenamiento(ruta)))
+            except Exception as e:
+                print(f"  ✗ Error en {ruta.name}: {e}")
+    return corpus
+
+def simular_captura(senal, perfil):
+    muestras = perfil.muestras_captura
+    if len(senal) <= muestras:
+        return senal
+    energia_acumulada = np.concatenate(([0.0], np.cumsum(senal.astype(np.float64) ** 2)))
+    energias = energia_acumulada[muestras:] - energia_acumulada[:-muestras]
+    inicio = int(np.argmax(energias))
+    return senal[inicio:inicio + muestras]
+
+def extraer_caracteristicas_corpus(corpus, perfil):
+    perfil = obtener_perfil(perfil)
+    vectores = []
+    etiquetas = []
+    tiempos = []
+    
+    for nombre_comando, ruta, senal in corpus:
+        senal = simular_captura(senal, perfil)
+        inicio = time.perf_counter()
+        vector = extraer_vector_entrenamiento(senal, perfil)
+        tiempos.append(time.perf_counter() - inicio)
+        vectores.append(vector)
+        etiquetas.append(nombre_comando)
+    
+    return np.vstack(vectores), np.array(etiquetas), np.array(tiempos)
+
+def validacion_cruzada(vectores, etiquetas, pliegues=5):
+    indices = np.arange(len(etiquetas))
+    aciertos = 0
+    
+    for pliegue in range(pliegues):
+        prueba = indices % pliegues == pliegue
+        entrenamiento = ~prueba
+        
+        modelo = {}
+        for comando in np.unique(etiquetas[entrenamiento]):
+            medias, _ = calcular_estadisticos_energias(list(vectores[entrenamiento & (etiquetas == comando)]))
+            modelo[comando] = {"mean": medias}
+        
+        for vector, etiqueta in zip(vectores[prueba], etiquetas[prueba]):
+            distancias = calcular_distancias_comandos(vector, modelo)
+            if distancias and min(distancias, key=distancias.get) == etiqueta:
+                aciertos += 1
+    
+    return aciertos / len(etiquetas)
+
+def evaluar_perfil(corpus, perfil, pliegues=5):
+    perfil = obtener_perfil(perfil)
+    vectores, etiquetas, tiempos = extraer_caracteristicas_corpus(corpus, perfil)
+    exactitud = validacion_cruzada(vectores, etiquetas, pliegues)
+    tiempo_medio_ms = 1000.0 * float(np.mean(tiempos))
+    
+    return {
+        "perfil": perfil.nombre,
+        "N": perfil.N,
+        "duracion_captura_s": perfil.duracion,
+        "ventana_ms": perfil.duracion_ventana_ms,
+        "exactitud": exactitud,
+        "tiempo_medio_ms": tiempo_medio_ms,
+        "tiempo_p95_ms": 1000.0 * float(np.percentile(tiempos, 95)),
+        "latencia_total_ms": 1000.0 * perfil.duracion + tiempo_medio_ms,
+        "muestras": len(etiquetas),
+    }
+
+def imprimir_tabla_perfiles(resultados):
+    print(f"\n{'='*96}")
+    print(f"{'Perfil':<16}{'N':>6}{'Captura(s)':>12}{'Ventana(ms)':>13}{'Exactitud':>11}"
+          f"{'t medio(ms)':>13}{'t p95(ms)':>11}{'Latencia(ms)':>14}")
+    print(f"{'-'*96}")
+    for r in resultados:
+        print(f"{r['perfil']:<16}{r['N']:>6}{r['duracion_captura_s']:>12.2f}{r['ventana_ms']:>13.1f}"
+              f"{100 * r['exactitud']:>10.1f}%{r['tiempo_medio_ms']:>13.3f}{r['tiempo_p95_ms']:>11.3f}"
+              f"{r['latencia_total_ms']:>14.1f}")
+    print(f"{'='*96}\n")
+
+def evaluar_perfiles(nombres_perfiles=None, pliegues=5, directorios_comandos=DIRECTORIOS_COMANDOS):
+    perfiles = listar_perfiles() if not nombres_perfiles else [obtener_perfil(n) for n in nombres_perfiles]
+    
+    print("Cargando corpus de entrenamiento...")
+    corpus = cargar_corpus(directorios_comandos)
+    print(f"✓ {len(corpus)} grabaciones cargadas")
+    
+    resultados = []
+    for perfil in perfiles:
+        print(f"Evaluando perfil '{perfil.nombre}' (N={perfil.N}, {pliegues} pliegues)...")
+        resultados.append(evaluar_perfil(corpus, perfil, pliegues))
+    
+    imprimir_tabla_perfiles(resultados)
+    return resultados
+
+if __name__ == "__main__":
+    evaluar_perfiles(sys.argv[1:])
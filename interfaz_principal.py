@@ -7,9 +7,13 @@ import numpy as np
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 
-from configuracion import ARCHIVO_UMBRALES, ETIQUETAS_COMANDOS, N_FFT, FRECUENCIA_MUESTREO_OBJETIVO
+from configuracion import ETIQUETAS_COMANDOS, DIRECTORIOS_COMANDOS, N_FFT, FRECUENCIA_MUESTREO_OBJETIVO
+from perfiles_reconocimiento import obtener_perfil
+from escucha_microfono import ControlEscucha
 from entrenamiento_comandos import entrenar_modelo_comandos
-from captura_microfono import grabar_audio_microfono
+from captura_microfono import grabar_audio_crudo, preparar_audio_capturado
+from detector_cascada import obtener_detector_cascada
+from proceso_captura import CapturaProceso
 from reconocimiento_comandos import (
     cargar_umbrales_desde_archivo,
     procesar_senal_para_reconocimiento,
@@ -24,12 +28,17 @@ class AplicacionReconocimiento(tb.Window):
         self.geometry("720x400")
 
         self.ruta_imagen = None
+        self.perfil = obtener_perfil()
         self.umbrales = None
-        self.microfono_activo = False
+        self.control_escucha = ControlEscucha()
         self.hilo_microfono = None
+        self.captura_proceso = None
+        self.detector_cascada = None
 
         self.crear_componentes_interfaz()
         
+        self.protocol("WM_DELETE_WINDOW", self.al_cerrar)
+        
         self.after(500, self.auto_cargar_entrenamiento)
         
         self.after(1000, self.activar_microfono_continuo)
@@ -90,6 +99,18 @@ class AplicacionReconocimiento(tb.Window):
             "Bienvenido. Configure la base de datos de audio y siga los pasos 1 - 4."
         )
 
+    @property
+    def microfono_activo(self):
+        return self.control_escucha.activo
+    
+    def al_cerrar(self):
+        self.control_escucha.cerrar()
+        self.destroy()
+    
+    def _establecer_umbrales(self, umbrales):
+        self.umbrales = umbrales
+        self.control_escucha.cambiar_modelo(umbrales)
+    
     def agregar_linea_estado(self, mensaje):
         self.after(
             0,
@@ -172,10 +193,10 @@ class AplicacionReconocimiento(tb.Window):
             return
 
         self.agregar_linea_estado("Grabando audio desde el microfono...")
-        senal = grabar_audio_microfono()
+        senal = grabar_audio_microfono(self.perfil)
 
         self.agregar_linea_estado("Procesando senal y calculando energias...")
-        vector_energias = procesar_senal_para_reconocimiento(senal)
+        vector_energias = procesar_senal_para_reconocimiento(senal, self.perfil)
 
         comando, puntaje = reconocer_comando_por_energia(
             vector_energias, self.umbrales
@@ -211,34 +232,49 @@ class AplicacionReconocimiento(tb.Window):
     
     def auto_cargar_entrenamiento(self):
         try:
-            from pathlib import Path
-            if Path(ARCHIVO_UMBRALES).exists():
-                self.agregar_linea_estado("Cargando umbrales entrenados automáticamente...")
-                self.umbrales = cargar_umbrales_desde_archivo()
+            if self.perfil.archivo_umbrales.exists():
+                self.agregar_linea_estado(
+                    f"Cargando umbrales entrenados automáticamente (perfil: {self.perfil.nombre})..."
+                )
+                self._establecer_umbrales(cargar_umbrales_desde_archivo(self.perfil))
                 self.agregar_linea_estado("✓ Umbrales cargados. Sistema listo.")
             else:
                 self.agregar_linea_estado("⚠ No se encontraron umbrales. Entrenando modelo...")
                 self.ejecutar_entrenamiento_en_hilo()
+        except ValueError as e:
+            self.agregar_linea_estado(f"⚠ {e}")
+            self.agregar_linea_estado("Entrenando modelo con la configuración actual...")
+            self.ejecutar_entrenamiento_en_hilo()
         except Exception as e:
             self.agregar_linea_estado(f"⚠ Error al cargar umbrales: {e}")
     
+    def ejecutar_entrenamiento_en_hilo(self):
+        hilo = threading.Thread(target=self._tarea_entrenamiento, daemon=True)
+        hilo.start()
+    
+    def _tarea_entrenamiento(self):
+        try:
+            self._establecer_umbrales(entrenar_modelo_comandos(DIRECTORIOS_COMANDOS, self.perfil))
+            self.agregar_linea_estado(f"✓ Modelo entrenado (perfil: {self.perfil.nombre}). Sistema listo.")
+        except Exception as e:
+            self.agregar_linea_estado(f"⚠ Error al entrenar el modelo: {e}")
+    
     def activar_microfono_continuo(self):
-        if self.umbrales is None:
-            self.agregar_linea_estado("⏳ Esperando carga de umbrales...")
-            self.after(2000, self.activar_microfono_continuo)
-            return
+        if self.hilo_microfono is None:
+            self.hilo_microfono = threading.Thread(target=self._bucle_escucha_microfono, daemon=True)
+            self.hilo_microfono.start()
         
-        self.microfono_activo = True
+        if self.control_escucha.activar() and self.captura_proceso is not None:
+            self.captura_proceso.descartar_pendientes()
         self.label_microfono.config(text="🎤 Micrófono: ACTIVO (escuchando...)", bootstyle="success")
         self.btn_toggle_mic.config(text="⏸️ Pausar Micrófono")
-        self.agregar_linea_estado("🎤 Micrófono activado. Diga un comando...")
-        
-        self.hilo_microfono = threading.Thread(target=self._bucle_escucha_microfono, daemon=True)
-        self.hilo_microfono.start()
+        if self.umbrales is None:
+            self.agregar_linea_estado("⏳ Esperando carga de umbrales...")
+        else:
+            self.agregar_linea_estado("🎤 Micrófono activado. Diga un comando...")
     
     def toggle_microfono(self):
-        if self.microfono_activo:
-            self.microfono_activo = False
+        if self.control_escucha.pausar():
             self.label_microfono.config(text="🎤 Micrófono: PAUSADO", bootstyle="warning")
             self.btn_toggle_mic.config(text="▶️ Reanudar Micrófono")
             self.agregar_linea_estado("🎤 Micrófono pausado")
@@ -246,8 +282,7 @@ class AplicacionReconocimiento(tb.Window):
             self.activar_microfono_continuo()
     
     def pausar_microfono(self):
-        if self.microfono_activo:
-            self.microfono_activo = False
+        if self.control_escucha.pausar():
             self.label_microfono.config(text="🎤 Micrófono: PAUSADO (procesando imagen)", bootstyle="info")
             self.btn_toggle_mic.config(text="▶️ Reanudar Micrófono")
             self.agregar_linea_estado("🎤 Micrófono pausado (ventana de procesamiento abierta)")
@@ -259,7 +294,8 @@ class AplicacionReconocimiento(tb.Window):
     
     def _bucle_escucha_microfono(self):
         import time
-        ultimo_reconocimiento = 0
+        control = self.control_escucha
+        ultimo_reconocimiento = float("-inf")
         TIEMPO_ESPERA = 1.5
         
         print("[MICRÓFONO] ✅ Listo. Escuchando...")
@@ -269,24 +305,44 @@ class AplicacionReconocimiento(tb.Window):
         contador_mismo_comando = 0
         CONFIRMACIONES_NECESARIAS = 1
         
-        while True:
-            if not self.microfono_activo:
-                break
-            
+        try:
+            self.detector_cascada = obtener_detector_cascada(self.perfil)
+        except Exception as e:
+            self.agregar_linea_estado(f"⚠ Detector en cascada no disponible: {e}")
+        detector = self.detector_cascada
+        
+        try:
+            self.captura_proceso = CapturaProceso(self.perfil).iniciar()
+            print("[MICRÓFONO] Captura en proceso dedicado (anillo en memoria compartida)")
+        except Exception as e:
+            print(f"[MICRÓFONO] Captura en proceso dedicado no disponible ({e}); se graba en este hilo")
+        fuente = self.captura_proceso
+        
+        while control.esperar_activo():
             try:
-                tiempo_actual = time.time()
-                if tiempo_actual - ultimo_reconocimiento < TIEMPO_ESPERA:
-                    time.sleep(0.1)
+                tiempo_actual = time.monotonic()
+                restante = TIEMPO_ESPERA - (tiempo_actual - ultimo_reconocimiento)
+                if restante > 0:
+                    control.esperar(restante)
+                    if fuente is not None:
+                        fuente.descartar_pendientes()
                     continue
                 
-                print(f"\n[GRABANDO...] 1.0s (buscando voz...)")
+                umbrales, version_modelo = control.modelo()
                 
-                senal = grabar_audio_microfono()
+                if fuente is not None:
+                    senal_cruda = fuente.esperar_segmento(timeout=0.5)
+                    if senal_cruda is None:
+                        continue
+                else:
+                    print(f"\n[GRABANDO...] {self.perfil.duracion:.1f}s (buscando voz...)")
+                    senal_cruda = grabar_audio_crudo(self.perfil)
                 
-                if not self.microfono_activo:
-                    break
+                if not control.activo:
+                    print("[DESCARTADO] Micrófono pausado durante la captura\n")
+                    continue
                 
-                rms_val = np.sqrt(np.mean(senal ** 2))
+                rms_val = np.sqrt(np.mean(senal_cruda ** 2))
                 db = 20.0 * np.log10(max(1e-12, rms_val))
                 
                 print(f"[CAPTURA] RMS={rms_val:.6f}, dB={db:.1f}")
@@ -295,11 +351,33 @@ class AplicacionReconocimiento(tb.Window):
                     print(f"[DESCARTADO] Señal muy débil (silencio)\n")
                     continue
                 
+                if detector is not None:
+                    admitido, puntuacion = detector.admitir(senal_cruda)
+                    if not admitido:
+                        estadisticas = detector.estadisticas()
+                        print(f"[DESCARTADO] Detector en cascada: no parece un comando (puntuación={puntuacion:.2f}, "
+                              f"paso={100 * estadisticas['tasa_paso']:.0f}%, "
+                              f"CPU ahorrada={estadisticas['cpu_ahorrado_s']:.3f}s)\n")
+                        continue
+                
                 print(f"[OK] Señal detectada (RMS={rms_val:.6f}), procesando...")
                 
-                vector_energias = procesar_senal_para_reconocimiento(senal)
+                inicio_reconocimiento = time.perf_counter()
+                senal = preparar_audio_capturado(senal_cruda, self.perfil)
+                if fuente is not None and not fuente.ultimo_segmento_intacto():
+                    print(f"[DESCARTADO] Audio sobrescrito en el anillo antes de leerlo ({fuente.estadisticas()})\n")
+                    continue
+                vector_energias = procesar_senal_para_reconocimiento(senal, self.perfil)
                 
-                comando, distancia = reconocer_comando_por_energia(vector_energias, self.umbrales)
+                comando, distancia = reconocer_comando_por_energia(vector_energias, umbrales)
+                if detector is not None:
+                    detector.registrar_etapa_completa(time.perf_counter() - inicio_reconocimiento)
+                
+                if control.modelo()[1] != version_modelo:
+                    print("[DESCARTADO] El modelo cambió durante el reconocimiento\n")
+                    ultimo_comando = None
+                    contador_mismo_comando = 0
+                    continue
                 
                 if comando is None:
                     print(f"[RECHAZADO] Ningún comando cumple umbral (mejor dist={distancia:.4f})")
@@ -356,9 +434,17 @@ class AplicacionReconocimiento(tb.Window):
                 
             except Exception as e:
                 self.agregar_linea_estado(f"Error en reconocimiento: {e}")
+                if fuente is not None and not fuente.activa:
+                    fuente.detener()
+                    fuente = self.captura_proceso = None
                 ultimo_comando = None
                 contador_mismo_comando = 0
-                time.sleep(0.5)
+                control.esperar(0.5)
+        
+        if fuente is not None:
+            senal_cruda = None
+            fuente.detener()
+        print("[MICRÓFONO] Escucha finalizada")
 
 def main():
     app = AplicacionReconocimiento()
@@ -0,0 +1,106 @@
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from scipy.signal import butter, get_window
+
+from configuracion import (
+    FRECUENCIA_MUESTREO_OBJETIVO,
+    NUMERO_SUBBANDAS,
+    VENTANA,
+    EXTRACTOR_CARACTERISTICAS,
+    FRECUENCIA_CORTE_PB,
+    ORDEN_FILTRO,
+    PERFILES_RECONOCIMIENTO,
+    PERFIL_ACTIVO,
+)
+
+@lru_cache(maxsize=None)
+def obtener_ventana_analisis(window, N):
+    if window.lower() == "none" or window == "rect":
+        w = np.ones(N)
+    else:
+        w = get_window(window, N, fftbins=True)
+    w.setflags(write=False)
+    return w
+
+@lru_cache(maxsize=None)
+def obtener_coeficientes_pasabajos(fs, frecuencia_corte, orden):
+    b, a = butter(orden, frecuencia_corte / (fs / 2), btype='low')
+    b.setflags(write=False)
+    a.setflags(write=False)
+    return b, a
+
+@lru_cache(maxsize=None)
+def obtener_secciones_pasabajos(fs, frecuencia_corte, orden):
+    sos = butter(orden, frecuencia_corte / (fs / 2), btype='low', output='sos')
+    sos.setflags(write=False)
+    return sos
+
+class PerfilReconocimiento:
+    def __init__(self, nombre, N, duracion, archivo_umbrales, fs=FRECUENCIA_MUESTREO_OBJETIVO,
+                 K=NUMERO_SUBBANDAS, window=VENTANA, frecuencia_corte=FRECUENCIA_CORTE_PB,
+                 orden_filtro=ORDEN_FILTRO, extractor=EXTRACTOR_CARACTERISTICAS):
+        self.nombre = nombre
+        self.N = int(N)
+        self.duracion = float(duracion)
+        self.archivo_umbrales = Path(archivo_umbrales)
+        self.fs = int(fs)
+        self.K = int(K)
+        self.window = window
+        self.frecuencia_corte = frecuencia_corte
+        self.orden_filtro = int(orden_filtro)
+        if extractor not in ("fft", "iir"):
+            raise ValueError(f"Extractor desconocido: {extractor}. Disponibles: fft, iir")
+        self.extractor = extractor
+    
+    @property
+    def muestras_captura(self):
+        return int(self.duracion * self.fs)
+    
+    @property
+    def duracion_ventana_ms(self):
+        return 1000.0 * self.N / self.fs
+    
+    def ventana_analisis(self):
+        return obtener_ventana_analisis(self.window, self.N)
+    
+    def coeficientes_pasabajos(self):
+        return obtener_coeficientes_pasabajos(self.fs, self.frecuencia_corte, self.orden_filtro)
+    
+    def secciones_pasabajos(self):
+        return obtener_secciones_pasabajos(self.fs, self.frecuencia_corte, self.orden_filtro)
+    
+    def configuracion(self):
+        return {
+            "perfil": self.nombre,
+            "fs": self.fs,
+            "N": self.N,
+            "K": self.K,
+            "window": self.window,
+            "duracion": self.duracion,
+            "frecuencia_corte": self.frecuencia_corte,
+            "orden_filtro": self.orden_filtro,
+            "extractor": self.extractor,
+        }
+    
+    def __repr__(self):
+        return f"PerfilReconocimiento({self.nombre!r}, N={self.N}, duracion={self.duracion})"
+
+_perfiles_cargados = {}
+
+def obtener_perfil(nombre=None):
+    if isinstance(nombre, PerfilReconocimiento):
+        return nombre
+    if nombre is None:
+        nombre = PERFIL_ACTIVO
+    if nombre not in PERFILES_RECONOCIMIENTO:
+        raise ValueError(
+            f"Perfil desconocido: {nombre}. Disponibles: {', '.join(PERFILES_RECONOCIMIENTO)}"
+        )
+    if nombre not in _perfiles_cargados:
+        _perfiles_cargados[nombre] = PerfilReconocimiento(nombre, **PERFILES_RECONOCIMIENTO[nombre])
+    return _perfiles_cargados[nombre]
+
+def listar_perfiles():
+    return [obtener_perfil(nombre) for nombre in PERFILES_RECONOCIMIENTO]
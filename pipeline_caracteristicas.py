@@ -0,0 +1,236 @@
+import hashlib
+import json
+import threading
+
+import numpy as np
+from scipy.signal import sosfiltfilt
+
+from configuracion import PREENFASIS_ALPHA, UMBRAL_ENERGIA_SILENCIO, MARGEN_SILENCIO_MS, PASO_BANCO_IIR_MS
+from banco_filtros import bordes_subbandas_lineales, BancoFiltrosIIR
+from perfiles_reconocimiento import obtener_perfil
+
+VERSION_PIPELINE = 2
+
+_RFFT_ADMITE_OUT = np.lib.NumpyVersion(np.__version__) >= "2.0.0"
+
+def configuracion_pipeline(perfil, incluir_subbandas=True):
+    perfil = obtener_perfil(perfil)
+    configuracion = {
+        "version": VERSION_PIPELINE,
+        "fs": perfil.fs,
+        "N": perfil.N,
+        "window": perfil.window,
+        "frecuencia_corte": perfil.frecuencia_corte,
+        "orden_filtro": perfil.orden_filtro,
+        "preenfasis": PREENFASIS_ALPHA,
+        "umbral_silencio": UMBRAL_ENERGIA_SILENCIO,
+        "margen_silencio_ms": MARGEN_SILENCIO_MS,
+    }
+    if incluir_subbandas:
+        configuracion["K"] = perfil.K
+        configuracion["extractor"] = perfil.extractor
+        if perfil.extractor == "iir":
+            configuracion["paso_iir_ms"] = PASO_BANCO_IIR_MS
+    return configuracion
+
+def calcular_huella(perfil, incluir_subbandas=True):
+    texto = json.dumps(configuracion_pipeline(perfil, incluir_subbandas), sort_keys=True)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()[:16]
+
+class PipelineCaracteristicas:
+    def __init__(self, perfil=None):
+        self.perfil = obtener_perfil(perfil)
+        self.huella = calcular_huella(self.perfil)
+        fs = self.perfil.fs
+        N = self.perfil.N
+        
+        self.sos = self.perfil.secciones_pasabajos().astype(np.float32)
+        self.ventana = self.perfil.ventana_analisis().astype(np.float32)
+        self.bordes = bordes_subbandas_lineales(N // 2, self.perfil.K)
+        self.banco = None
+        # El banco IIR se usa por lotes sobre la ventana ya preparada (ver BancoFiltrosIIR.extraer)
+        if self.perfil.extractor == "iir":
+            self.banco = BancoFiltrosIIR(fs, N, self.perfil.K, self.perfil.window)
+        
+        self.muestras_ventana_vad = int(0.025 * fs)
+        self.margen_muestras = int(MARGEN_SILENCIO_MS * fs / 1000)
+        self._indices_vad = {}
+        self._capacidad = 0
+        self._reservar(self.perfil.muestras_captura)
+        
+        self.captura = np.zeros((self.perfil.muestras_captura, 1), dtype=np.float32)
+        self.x = np.zeros(N, dtype=np.float32)
+        self.trabajo = np.zeros(N, dtype=np.float32)
+        self.auxiliar = np.zeros(N, dtype=np.float32)
+        self.espectro = np.zeros(N // 2 + 1, dtype=np.complex64)
+        self.potencia = np.zeros(N // 2 + 1, dtype=np.float32)
+        self.energias_acumuladas = np.zeros(self.perfil.K, dtype=np.float64)
+        self.energias = np.zeros(self.perfil.K, dtype=np.float32)
+        self.rms_original = 0.0
+    
+    def configuracion(self):
+        return dict(self.perfil.configuracion(), huella=self.huella, version_pipeline=VERSION_PIPELINE)
+    
+    def _reservar(self, n):
+        if n <= self._capacidad:
+            return
+        self.energia = np.zeros(n, dtype=np.float32)
+        self.acumulada = np.zeros(n + 1, dtype=np.float64)
+        self.media_movil = np.zeros(n, dtype=np.float64)
+        self.auxiliar_vad = np.zeros(n, dtype=np.float64)
+        self.mascara = np.zeros(n, dtype=bool)
+        self._indices_vad = {}
+        self._capacidad = n
+    
+    def _indices_media_movil(self, n):
+        if n not in self._indices_vad:
+            L = self.muestras_ventana_vad
+            superior = np.arange(n) + (L - 1) // 2
+            inferior = superior - L + 1
+            self._indices_vad[n] = (
+                np.clip(superior + 1, 0, n).astype(np.intp),
+                np.clip(inferior, 0, n).astype(np.intp),
+            )
+        return self._indices_vad[n]
+    
+    def grabar(self):
+        import sounddevice as sd
+        
+        sd.rec(out=self.captura, samplerate=self.perfil.fs, channels=1, dtype='float32', blocking=True)
+        return self.captura[:, 0]
+    
+    def capturar(self):
+        return self.preparar_ventana(self.grabar())
+    
+    def filtrar(self, senal):
+        return sosfiltfilt(self.sos, np.asarray(senal, dtype=np.float32))
+    
+    def _acumular_energia(self, senal):
+        n = len(senal)
+        self._reservar(n)
+        energia = np.multiply(senal, senal, out=self.energia[:n])
+        acumulada = self.acumulada[:n + 1]
+        np.cumsum(energia, out=acumulada[1:])
+        return acumulada
+    
+    def _delimitar_voz(self, acumulada):
+        n = len(acumulada) - 1
+        superior, inferior = self._indices_media_movil(n)
+        media = self.media_movil[:n]
+        np.take(acumulada, superior, out=media)
+        np.subtract(media, np.take(acumulada, inferior, out=self.auxiliar_vad[:n]), out=media)
+        media *= 1.0 / self.muestras_ventana_vad
+        np.maximum(media, 1e-10, out=media)
+        np.log10(media, out=media)
+        media *= 10.0
+        
+        mascara = np.greater(media, media.max() + UMBRAL_ENERGIA_SILENCIO, out=self.mascara[:n])
+        if not mascara.any():
+            return 0, n
+        inicio = max(0, int(np.argmax(mascara)) - self.margen_muestras)
+        fin = min(n, n - 1 - int(np.argmax(mascara[::-1])) + self.margen_muestras)
+        return inicio, fin
+    
+    def _seleccionar_ventana(self, senal, acumulada, inicio, fin):
+        N = self.perfil.N
+        mejor_energia = -1.0
+        mejor_inicio = inicio
+        for i in range(inicio, max(inicio + 1, fin - N), max(1, N // 4)):
+            if i + N > fin:
+                break
+            energia_ventana = acumulada[i + N] - acumulada[i]
+            if energia_ventana > mejor_energia:
+                mejor_energia = energia_ventana
+                mejor_inicio = i
+        
+        longitud = min(N, fin - mejor_inicio)
+        x = self.x
+        x[:longitud] = senal[mejor_inicio:mejor_inicio + longitud]
+        x[longitud:] = 0.0
+        
+        self.rms_original = float(np.sqrt(np.dot(x, x) / N))
+        if self.rms_original > 1e-6:
+            x *= 0.1 / self.rms_original
+        return x
+    
+    def preparar_ventana(self, senal):
+        filtrada = self.filtrar(senal)
+        acumulada = self._acumular_energia(filtrada)
+        inicio, fin = self._delimitar_voz(acumulada)
+        return self._seleccionar_ventana(filtrada, acumulada, inicio, fin)
+    
+    def preprocesar(self, senal):
+        filtrada = self.filtrar(senal)
+        inicio, fin = self._delimitar_voz(self._acumular_energia(filtrada))
+        return filtrada[inicio:fin].copy()
+    
+    def ventana_desde_preprocesada(self, segmento):
+        acumulada = self._acumular_energia(segmento)
+        return self._seleccionar_ventana(segmento, acumulada, 0, len(segmento))
+    
+    def espectro_potencia(self, senal):
+        N = self.perfil.N
+        a = PREENFASIS_ALPHA
+        longitud = min(N, len(senal))
+        inicio = (len(senal) - longitud) // 2
+        media = float(np.mean(senal, dtype=np.float64))
+        segmento = senal[inicio:inicio + longitud]
+        
+        anterior = self.auxiliar[:longitud]
+        anterior[0] = senal[inicio - 1] if inicio > 0 else media
+        anterior[1:] = segmento[:-1]
+        
+        x = self.trabajo
+        np.multiply(anterior, -a, out=anterior)
+        np.add(segmento, anterior, out=x[:longitud])
+        x[:longitud] -= (1.0 - a) * media
+        x[longitud:] = 0.0
+        x *= self.ventana
+        
+        if _RFFT_ADMITE_OUT:
+            espectro = np.fft.rfft(x, out=self.espectro)
+        else:
+            espectro = np.fft.rfft(x).astype(np.complex64)
+        
+        potencia = np.abs(espectro, out=self.potencia)
+        np.square(potencia, out=potencia)
+        potencia *= 1.0 / N
+        return potencia[:N // 2]
+    
+    def calcular_energias(self, senal):
+        if self.banco is not None:
+            self.energias[:] = self.banco.extraer(senal)
+            return self.energias
+        potencia = self.espectro_potencia(senal)
+        np.add.reduceat(potencia, self.bordes[:-1], out=self.energias_acumuladas, dtype=np.float64)
+        self.energias[:] = self.energias_acumuladas
+        return self.energias
+    
+    def extraer(self, senal):
+        return self.calcular_energias(self.preparar_ventana(senal))
+    
+    def extraer_espectro(self, senal):
+        return self.espectro_potencia(self.preparar_ventana(senal)).copy()
+
+_pipelines_hilo = threading.local()
+
+def obtener_pipeline(perfil=None):
+    perfil = obtener_perfil(perfil)
+    pipelines = getattr(_pipelines_hilo, "pipelines", None)
+    if pipelines is None:
+        pipelines = _pipelines_hilo.pipelines = {}
+    huella = calcular_huella(perfil)
+    pipeline = pipelines.get(huella)
+    if pipeline is None or pipeline.perfil.muestras_captura != perfil.muestras_captura:
+        pipeline = PipelineCaracteristicas(perfil)
+        pipelines[huella] = pipeline
+    return pipeline
+
+def verificar_huella_modelo(umbrales, perfil=None):
+    huella_modelo = umbrales.get("config", {}).get("huella")
+    huella_actual = calcular_huella(perfil)
+    if huella_modelo != huella_actual:
+        raise ValueError(
+            f"El modelo fue entrenado con otra configuración del pipeline "
+            f"(huella {huella_modelo}, actual {huella_actual}). Vuelva a entrenar."
+        )
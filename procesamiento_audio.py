@@ -1,8 +1,9 @@
 import numpy as np
 from scipy.io import wavfile
-from scipy.signal import butter, filtfilt, resample
+from scipy.signal import filtfilt, resample
 
 from configuracion import FRECUENCIA_MUESTREO_OBJETIVO, FRECUENCIA_CORTE_PB, ORDEN_FILTRO, PREENFASIS_ALPHA, UMBRAL_ENERGIA_SILENCIO, MARGEN_SILENCIO_MS, N_FFT
+from perfiles_reconocimiento import obtener_coeficientes_pasabajos
 
 def extraer_ventana_maxima_energia(senal, N):
     if len(senal) <= N:
@@ -79,7 +80,7 @@ def re_muestrear_senal(fs_original, senal):
     return senal_remuestreada
 
 def filtrar_ruido_pasabajos(senal, fs, frecuencia_corte=FRECUENCIA_CORTE_PB, orden=ORDEN_FILTRO):
-    b, a = butter(orden, frecuencia_corte / (fs / 2), btype='low')
+    b, a = obtener_coeficientes_pasabajos(fs, frecuencia_corte, orden)
     return filtfilt(b, a, senal)
 
 def ajustar_longitud_potencia_de_dos(senal):
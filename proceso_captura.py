@@ -0,0 +1,196 @@
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from configuracion import (
+    DURACION_ANILLO_SEGUNDOS,
+    BLOQUE_CAPTURA_MS,
+    PREROLL_CAPTURA_MS,
+    UMBRAL_VAD_CAPTURA_DB,
+    NIVEL_MINIMO_VAD_CAPTURA_DB,
+)
+from perfiles_reconocimiento import obtener_perfil
+
+# Cabecera int64 al inicio de la memoria compartida
+INDICE_ESCRITURA = 0
+DESBORDAMIENTOS_DISPOSITIVO = 1
+DESBORDAMIENTOS_LECTURA = 2
+SEGMENTOS_PUBLICADOS = 3
+CAPTURA_ACTIVA = 4
+CAMPOS_CABECERA = 8
+
+def _vistas_memoria(buffer, capacidad):
+    cabecera = np.ndarray((CAMPOS_CABECERA,), dtype=np.int64, buffer=buffer)
+    # El anillo guarda cada muestra dos veces (posición p y p + capacidad), así que
+    # cualquier tramo de hasta `capacidad` muestras es una vista contigua.
+    anillo = np.ndarray((2 * capacidad,), dtype=np.float32, buffer=buffer, offset=CAMPOS_CABECERA * 8)
+    return cabecera, anillo
+
+def _muestras_bloque(fs):
+    return int(BLOQUE_CAPTURA_MS * fs / 1000)
+
+class EscritorAnillo:
+    def __init__(self, cabecera, anillo, capacidad, fs, muestras_segmento, cola):
+        self.cabecera = cabecera
+        self.anillo = anillo
+        self.capacidad = capacidad
+        self.muestras_segmento = muestras_segmento
+        self.preroll = int(PREROLL_CAPTURA_MS * fs / 1000)
+        self.cola = cola
+        self.piso_db = None
+        self.inicio_segmento = None
+    
+    def escribir(self, x, desbordamiento=False):
+        C = self.capacidad
+        n = len(x)
+        indice = int(self.cabecera[INDICE_ESCRITURA])
+        p = indice % C
+        
+        self.anillo[p:p + n] = x
+        primera = min(n, C - p)
+        self.anillo[p + C:p + C + primera] = x[:primera]
+        if primera < n:
+            self.anillo[:n - primera] = x[primera:]
+        
+        if desbordamiento:
+            self.cabecera[DESBORDAMIENTOS_DISPOSITIVO] += 1
+        self.cabecera[INDICE_ESCRITURA] = indice + n
+        self._detectar_voz(x, indice)
+    
+    def _detectar_voz(self, x, indice):
+        fin = indice + len(x)
+        nivel_db = 10.0 * np.log10(float(np.dot(x, x)) / max(1, len(x)) + 1e-12)
+        if self.piso_db is None:
+            self.piso_db = nivel_db
+        voz = nivel_db > max(self.piso_db + UMBRAL_VAD_CAPTURA_DB, NIVEL_MINIMO_VAD_CAPTURA_DB)
+        
+        # Piso de ruido: baja de inmediato y sube lentamente (constante de ~4 s)
+        if nivel_db < self.piso_db:
+            self.piso_db = nivel_db
+        else:
+            self.piso_db += 0.005 * (nivel_db - self.piso_db)
+        
+        if self.inicio_segmento is None and voz:
+            self.inicio_segmento = max(0, indice - self.preroll)
+        
+        if self.inicio_segmento is not None and fin >= self.inicio_segmento + self.muestras_segmento:
+            self.cola.put_nowait((self.inicio_segmento, self.muestras_segmento, time.monotonic()))
+            self.cabecera[SEGMENTOS_PUBLICADOS] += 1
+            self.inicio_segmento = None
+
+def _proceso_captura(nombre_memoria, capacidad, fs, muestras_segmento, cola, detener):
+    import sounddevice as sd
+    
+    memoria = shared_memory.SharedMemory(name=nombre_memoria)
+    try:
+        cabecera, anillo = _vistas_memoria(memoria.buf, capacidad)
+        escritor = EscritorAnillo(cabecera, anillo, capacidad, fs, muestras_segmento, cola)
+        
+        def callback(indata, frames, tiempo, status):
+            escritor.escribir(indata[:, 0], bool(status.input_overflow))
+        
+        with sd.InputStream(samplerate=fs, channels=1, dtype='float32',
+                            blocksize=_muestras_bloque(fs), callback=callback):
+            cabecera[CAPTURA_ACTIVA] = 1
+            while not detener.wait(0.1):
+                pass
+    finally:
+        cabecera = anillo = escritor = None
+        memoria.close()
+
+class CapturaProceso:
+    def __init__(self, perfil=None, duracion_anillo=DURACION_ANILLO_SEGUNDOS):
+        self.perfil = obtener_perfil(perfil)
+        self.capacidad = max(int(duracion_anillo * self.perfil.fs), 2 * self.perfil.muestras_captura)
+        self.muestras_bloque = _muestras_bloque(self.perfil.fs)
+        self.memoria = None
+        self.proceso = None
+        self._ultimo_inicio = None
+    
+    def iniciar(self, espera_maxima=5.0):
+        contexto = mp.get_context("spawn")
+        self.memoria = shared_memory.SharedMemory(create=True, size=CAMPOS_CABECERA * 8 + 2 * self.capacidad * 4)
+        self.cabecera, self.anillo = _vistas_memoria(self.memoria.buf, self.capacidad)
+        self.cabecera[:] = 0
+        self.cola = contexto.Queue()
+        self._detener = contexto.Event()
+        self.proceso = contexto.Process(
+            target=_proceso_captura,
+            args=(self.memoria.name, self.capacidad, self.perfil.fs, self.perfil.muestras_captura,
+                  self.cola, self._detener),
+            daemon=True,
+        )
+        self.proceso.start()
+        
+        limite = time.monotonic() + espera_maxima
+        while not self.cabecera[CAPTURA_ACTIVA]:
+            if not self.proceso.is_alive() or time.monotonic() > limite:
+                self.detener()
+                raise RuntimeError("No se pudo iniciar la captura de audio en el proceso hijo")
+            time.sleep(0.05)
+        return self
+    
+    @property
+    def activa(self):
+        return self.proceso is not None and self.proceso.is_alive()
+    
+    def esperar_segmento(self, timeout=None):
+        try:
+            inicio, n, _ = self.cola.get(timeout=timeout)
+        except queue.Empty:
+            if not self.activa:
+                raise RuntimeError("El proceso de captura de audio terminó")
+            return None
+        
+        if not self._segmento_intacto(inicio):
+            return None
+        self._ultimo_inicio = inicio
+        p = inicio % self.capacidad
+        return self.anillo[p:p + n]
+    
+    def ultimo_segmento_intacto(self):
+        if self._ultimo_inicio is None:
+            return False
+        return self._segmento_intacto(self._ultimo_inicio)
+    
+    def _segmento_intacto(self, inicio):
+        # El escritor copia un bloque completo antes de avanzar INDICE_ESCRITURA: mientras
+        # tanto ya puede estar pisando hasta un bloque más allá del índice publicado
+        if int(self.cabecera[INDICE_ESCRITURA]) - inicio > self.capacidad - self.muestras_bloque:
+            self.cabecera[DESBORDAMIENTOS_LECTURA] += 1
+            return False
+        return True
+    
+    def descartar_pendientes(self):
+        while True:
+            try:
+                self.cola.get_nowait()
+            except queue.Empty:
+                return
+    
+    def estadisticas(self):
+        return {
+            "muestras_escritas": int(self.cabecera[INDICE_ESCRITURA]),
+            "segmentos": int(self.cabecera[SEGMENTOS_PUBLICADOS]),
+            "desbordamientos_dispositivo": int(self.cabecera[DESBORDAMIENTOS_DISPOSITIVO]),
+            "desbordamientos_lectura": int(self.cabecera[DESBORDAMIENTOS_LECTURA]),
+        }
+    
+    def detener(self):
+        if self.proceso is not None:
+            self._detener.set()
+            self.proceso.join(timeout=2.0)
+            if self.proceso.is_alive():
+                self.proceso.terminate()
+            self.proceso = None
+        if self.memoria is not None:
+            self.cabecera = self.anillo = None
+            try:
+                self.memoria.close()
+            except BufferError:
+                pass
+            self.memoria.unlink()
+            self.memoria = None
@@ -18,30 +18,41 @@ from procesamiento_audio import (
     calcular_fft_magnitud,
 )
 from banco_filtros import calcular_vector_energias, normalizar_vector_energia
+from perfiles_reconocimiento import obtener_perfil
+from pipeline_caracteristicas import obtener_pipeline, verificar_huella_modelo
 
 EPSILON_DESVIACION = 1e-6
 
-def cargar_umbrales_desde_archivo():
-    if not Path(ARCHIVO_UMBRALES).exists():
+def cargar_umbrales_desde_archivo(perfil=None):
+    perfil = obtener_perfil(perfil)
+    archivo_umbrales = perfil.archivo_umbrales
+    if not Path(archivo_umbrales).exists():
         raise FileNotFoundError(
-            f"No se encontro el archivo de umbrales: {ARCHIVO_UMBRALES}. Ejecute primero el entrenamiento."
+            f"No se encontro el archivo de umbrales: {archivo_umbrales}. Ejecute primero el entrenamiento."
         )
-    with open(ARCHIVO_UMBRALES, "r", encoding="utf-8") as f:
+    with open(archivo_umbrales, "r", encoding="utf-8") as f:
         datos = json.load(f)
+    verificar_huella_modelo(datos, perfil)
     return datos
 
-def procesar_senal_para_reconocimiento(senal):
-    from banco_filtros import calcular_vector_energias_temporal
-    
-    vector_energias = calcular_vector_energias_temporal(
-        senal, 
-        fs=FRECUENCIA_MUESTREO_OBJETIVO,
-        N=N_FFT,
-        K=NUMERO_SUBBANDAS,
-        window=VENTANA
-    )
-    
-    return vector_energias
+def procesar_senal_para_reconocimiento(senal, perfil=None):
+    return obtener_pipeline(perfil).calcular_energias(senal)
+
+def calcular_distancias_comandos(vector_energias, umbrales):
+    E = np.asarray(vector_energias, dtype=float)
+    norma_E = np.linalg.norm(E)
+    E_norm = E / norma_E if norma_E > 1e-10 else E
+    
+    distancias = {}
+    for nombre_comando, datos_comando in umbrales.get("commands", umbrales).items():
+        umbral_vector = np.asarray(datos_comando.get("mean", []), dtype=float)
+        if len(umbral_vector) == 0:
+            continue
+        norma_umbral = np.linalg.norm(umbral_vector)
+        umbral_norm = umbral_vector / norma_umbral if norma_umbral > 1e-10 else umbral_vector
+        distancias[nombre_comando] = float(np.linalg.norm(E_norm - umbral_norm))
+    
+    return distancias
 
 def reconocer_comando_por_energia(vector_energias, umbrales):
     E = np.array(vector_energias, dtype=float)
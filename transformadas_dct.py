@@ -0,0 +1,227 @@
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import cv2
+import scipy
+import scipy.fft
+
+from configuracion import BACKEND_DCT, ARCHIVO_CALIBRACION_DCT
+
+ELEMENTOS_MAXIMOS_CALIBRACION = 1 << 20
+REPETICIONES_CALIBRACION = 3
+LADO_MAXIMO_MATRIZ = 256
+ERROR_RELATIVO_MAXIMO = {"float32": 1e-5, "float64": 1e-10}
+
+class BackendDCT:
+    nombre = None
+    
+    def admite(self, forma):
+        return True
+    
+    def directa(self, tensor, precision):
+        raise NotImplementedError
+    
+    def inversa(self, tensor, precision):
+        raise NotImplementedError
+
+class BackendMatricial(BackendDCT):
+    nombre = "matriz"
+    
+    def admite(self, forma):
+        return max(forma[-2:]) <= LADO_MAXIMO_MATRIZ
+    
+    def directa(self, tensor, precision):
+        from compresion_dct import obtener_base_dct
+        h, w = tensor.shape[-2:]
+        return obtener_base_dct(h, precision) @ np.asarray(tensor, dtype=precision) @ obtener_base_dct(w, precision).T
+    
+    def inversa(self, tensor, precision):
+        from compresion_dct import obtener_base_dct
+        h, w = tensor.shape[-2:]
+        return obtener_base_dct(h, precision).T @ np.asarray(tensor, dtype=precision) @ obtener_base_dct(w, precision)
+
+class BackendScipy(BackendDCT):
+    nombre = "scipy"
+    
+    def directa(self, tensor, precision):
+        return scipy.fft.dctn(np.asarray(tensor, dtype=precision), type=2, norm="ortho", axes=(-2, -1), workers=-1)
+    
+    def inversa(self, tensor, precision):
+        return scipy.fft.idctn(np.asarray(tensor, dtype=precision), type=2, norm="ortho", axes=(-2, -1), workers=-1)
+
+class BackendOpenCV(BackendDCT):
+    nombre = "opencv"
+    
+    def admite(self, forma):
+        # cv2.dct solo implementa longitudes pares
+        return forma[-2] % 2 == 0 and forma[-1] % 2 == 0
+    
+    def _transformar(self, tensor, precision, flags):
+        h, w = tensor.shape[-2:]
+        x = np.ascontiguousarray(tensor, dtype=precision).reshape(-1, h, w)
+        # DCT_ROWS transforma cada fila por separado: filas de todos los bloques en una
+        # sola llamada, luego lo mismo con los bloques traspuestos para las columnas
+        filas = cv2.dct(x.reshape(-1, w), flags=flags | cv2.DCT_ROWS).reshape(-1, h, w)
+        traspuesta = np.ascontiguousarray(filas.transpose(0, 2, 1)).reshape(-1, h)
+        columnas = cv2.dct(traspuesta, flags=flags | cv2.DCT_ROWS).reshape(-1, w, h)
+        return columnas.transpose(0, 2, 1).reshape(tensor.shape)
+    
+    def directa(self, tensor, precision):
+        return self._transformar(tensor, precision, 0)
+    
+    def inversa(self, tensor, precision):
+        return self._transformar(tensor, precision, cv2.DCT_INVERSE)
+
+BACKENDS_DCT = {}
+
+def registrar_backend(backend):
+    BACKENDS_DCT[backend.nombre] = backend
+    return backend
+
+registrar_backend(BackendMatricial())
+registrar_backend(BackendScipy())
+registrar_backend(BackendOpenCV())
+
+_calibracion = None
+
+def firma_entorno():
+    return {
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "opencv": cv2.__version__,
+        "maquina": platform.machine(),
+        "procesador": platform.processor(),
+        "nucleos": os.cpu_count(),
+    }
+
+def clave_calibracion(forma, precision):
+    h, w = forma[-2:]
+    lotes = int(np.prod(forma[:-2], dtype=np.int64))
+    # Lotes agrupados por potencias de 4: la calibración se repite solo al cambiar de escala
+    return f"{h}x{w}_n{int(np.log2(max(1, lotes))) // 2}_{np.dtype(precision).name}"
+
+def cargar_calibracion(ruta=ARCHIVO_CALIBRACION_DCT):
+    global _calibracion
+    _calibracion = {"entorno": firma_entorno(), "casos": {}}
+    if ruta.exists():
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+            if datos.get("entorno") == _calibracion["entorno"]:
+                _calibracion = datos
+        except (OSError, ValueError):
+            pass
+    return _calibracion
+
+def guardar_calibracion(ruta=ARCHIVO_CALIBRACION_DCT):
+    try:
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(_calibracion, f, indent=2)
+    except OSError:
+        pass
+
+def _tensor_calibracion(forma, precision, semilla=0):
+    h, w = forma[-2:]
+    lotes = int(np.prod(forma[:-2], dtype=np.int64))
+    lotes = max(1, min(lotes, ELEMENTOS_MAXIMOS_CALIBRACION // (h * w)))
+    return np.random.default_rng(semilla).standard_normal((lotes, h, w)).astype(precision)
+
+def error_backend(backend, tensor, precision):
+    referencia = scipy.fft.dctn(tensor.astype(np.float64), type=2, norm="ortho", axes=(-2, -1))
+    directa = backend.directa(tensor, precision)
+    inversa = backend.inversa(directa, precision)
+    escala = np.abs(referencia).max()
+    return max(
+        float(np.abs(directa - referencia).max() / escala),
+        float(np.abs(inversa - tensor).max() / np.abs(tensor).max()),
+    )
+
+def calibrar(forma, precision, repeticiones=REPETICIONES_CALIBRACION):
+    tensor = _tensor_calibracion(forma, precision)
+    limite = ERROR_RELATIVO_MAXIMO[np.dtype(precision).name]
+    
+    tiempos = {}
+    for nombre, backend in BACKENDS_DCT.items():
+        if not backend.admite(tensor.shape):
+            continue
+        # Un backend que no reproduce la DCT ortonormal de referencia queda descartado
+        if error_backend(backend, tensor, precision) > limite:
+            continue
+        mejor = np.inf
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            backend.inversa(backend.directa(tensor, precision), precision)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        tiempos[nombre] = 1000.0 * mejor
+    
+    if not tiempos:
+        raise RuntimeError(f"Ningún backend de DCT admite la forma {forma}")
+    return min(tiempos, key=tiempos.get), tiempos
+
+def seleccionar_backend(forma, precision=np.float64):
+    if BACKEND_DCT != "auto":
+        backend = BACKENDS_DCT[BACKEND_DCT]
+        if backend.admite(forma):
+            return backend
+    
+    if _calibracion is None:
+        cargar_calibracion()
+    clave = clave_calibracion(forma, precision)
+    caso = _calibracion["casos"].get(clave)
+    if caso is None or caso["backend"] not in BACKENDS_DCT:
+        elegido, tiempos = calibrar(forma, precision)
+        caso = _calibracion["casos"][clave] = {"backend": elegido, "tiempos_ms": tiempos}
+        guardar_calibracion()
+    return BACKENDS_DCT[caso["backend"]]
+
+def transformar_bloques(tensor, precision=np.float64, inversa=False, backend=None):
+    backend = BACKENDS_DCT[backend] if backend is not None else seleccionar_backend(tensor.shape, precision)
+    if inversa:
+        return backend.inversa(tensor, precision)
+    return backend.directa(tensor, precision)
+
+def dct_2d(matriz, precision=np.float64, backend=None):
+    return transformar_bloques(matriz, precision, backend=backend)
+
+def idct_2d(matriz, precision=np.float64, backend=None):
+    return transformar_bloques(matriz, precision, inversa=True, backend=backend)
+
+def verificar_equivalencia(formas=((64, 8, 8), (32, 16, 16), (4, 5, 5), (1, 96, 128), (1, 75, 61)),
+                           precisiones=(np.float64, np.float32)):
+    filas = []
+    for forma in formas:
+        for precision in precisiones:
+            tensor = _tensor_calibracion(forma, precision, semilla=1)
+            limite = ERROR_RELATIVO_MAXIMO[np.dtype(precision).name]
+            for nombre, backend in BACKENDS_DCT.items():
+                if not backend.admite(forma):
+                    continue
+                error = error_backend(backend, tensor, precision)
+                filas.append((forma, np.dtype(precision).name, nombre, error, error <= limite))
+    return filas
+
+if __name__ == "__main__":
+    correcto = True
+    
+    print(f"\n{'='*72}")
+    print("Equivalencia entre backends (error relativo frente a scipy float64)")
+    print(f"{'-'*72}")
+    for forma, precision, nombre, error, dentro in verificar_equivalencia():
+        correcto &= dentro
+        print(f"{str(forma):<16}{precision:<10}{nombre:<10}{error:>12.2e}  {'✓' if dentro else '✗'}")
+    
+    print(f"{'-'*72}")
+    print("Calibración (ida y vuelta, ms)")
+    print(f"{'-'*72}")
+    for forma in ((64, 64, 8, 8), (32, 32, 16, 16), (256, 256, 8, 8), (512, 512)):
+        for precision in (np.float64, np.float32):
+            elegido, tiempos = calibrar(forma, precision)
+            detalle = "  ".join(f"{n}={t:.2f}" for n, t in tiempos.items())
+            print(f"{str(forma):<18}{np.dtype(precision).name:<10}{elegido:<10}{detalle}")
+    print(f"{'='*72}\n")
+    
+    sys.exit(0 if correcto else 1)
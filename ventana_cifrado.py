@@ -14,6 +14,7 @@ from cifrado_arnold_frdct import (
     cifrar_imagen_completo,
     descifrar_imagen_completo
 )
+from configuracion import PRECISION_IMAGENES
 
 class VentanaCifradoFrDCT:
     def __init__(self, parent, ruta_imagen, pausar_callback=None, reanudar_callback=None):
@@ -198,7 +199,8 @@ class VentanaCifradoFrDCT:
             self.ventana.update()
             
             resultado = cifrar_imagen_completo(
-                self.imagen_original, a, k, alpha, self.porcentaje_compresion
+                self.imagen_original, a, k, alpha, self.porcentaje_compresion,
+                precision=PRECISION_IMAGENES
             )
             
             self.imagen_arnold = resultado['imagen_arnold']
@@ -235,7 +237,7 @@ class VentanaCifradoFrDCT:
             alpha = self.parametros['alpha']
             
             self.imagen_descifrada = descifrar_imagen_completo(
-                self.matriz_frdct, a, k, alpha
+                self.matriz_frdct, a, k, alpha, precision=PRECISION_IMAGENES
             )
             
             self.crear_tab_descifrado()
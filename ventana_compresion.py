@@ -1,4 +1,7 @@
 
+from collections import OrderedDict
+from pathlib import Path
+
 import numpy as np
 import cv2
 import tkinter as tk
@@ -7,30 +10,93 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.figure import Figure
 
 from compresion_dct import (
-    comprimir_imagen_dct,
-    descomprimir_imagen_dct,
-    calcular_metricas_compresion
+    comprimir_imagen_dct_multiple,
+    reconstruir_plano_dct,
+    calcular_metricas_compresion,
+    estimar_metricas_compresion,
+    metricas_tamanio,
+    DecodificadorRegiones
+)
+from compresion_color import (
+    comprimir_imagen_color_multiple,
+    descomprimir_imagen_color,
+    calcular_metricas_color,
+    estimar_metricas_color,
+    error_submuestreo_420,
+    rgb_a_planos_ycbcr,
+    DecodificadorRegionesColor,
+    PLANOS_YCBCR
 )
+from codificacion_dct import codificar_coeficientes, guardar_comprimido
+from configuracion import PRECISION_IMAGENES, MEMORIA_CACHE_VENTANA_MB, PIXELES_RECONSTRUCCION_INMEDIATA
 
-def cargar_imagen_unicode(ruta):
+def cargar_imagen_unicode(ruta, color=False):
     try:
         with open(ruta, 'rb') as f:
             datos = f.read()
         
         arr = np.frombuffer(datos, dtype=np.uint8)
         
+        if color:
+            imagen = cv2.imdecode(arr, cv2.IMREAD_COLOR)
+            if imagen is not None:
+                imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2RGB)
+            return imagen
+        
         return cv2.imdecode(arr, cv2.IMREAD_GRAYSCALE)
     except Exception as e:
         print(f"Error cargando imagen: {e}")
         return None
 
+def _tamanio_en_bytes(valor):
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    if isinstance(valor, dict):
+        return sum(_tamanio_en_bytes(v) for v in valor.values())
+    return 64
+
+class CacheLRU:
+    def __init__(self, memoria_maxima_mb=MEMORIA_CACHE_VENTANA_MB):
+        self.bytes_maximos = int(memoria_maxima_mb * 1024 * 1024)
+        self.entradas = OrderedDict()
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def obtener(self, clave, calcular):
+        if clave in self.entradas:
+            self.entradas.move_to_end(clave)
+            self.aciertos += 1
+            return self.entradas[clave][0]
+        
+        self.fallos += 1
+        valor = calcular()
+        tamanio = _tamanio_en_bytes(valor)
+        if tamanio > self.bytes_maximos:
+            return valor
+        
+        self.entradas[clave] = (valor, tamanio)
+        self.bytes_usados += tamanio
+        while self.bytes_usados > self.bytes_maximos:
+            _, (_, tamanio_expulsado) = self.entradas.popitem(last=False)
+            self.bytes_usados -= tamanio_expulsado
+        return valor
+    
+    def vaciar(self):
+        self.entradas.clear()
+        self.bytes_usados = 0
+
 class VentanaCompresionDCT:
     def __init__(self, parent, ruta_imagen, pausar_callback=None, reanudar_callback=None):
         self.parent = parent
         self.ruta_imagen = ruta_imagen
         self.reanudar_callback = reanudar_callback
         
-        self.imagen_original = cargar_imagen_unicode(str(ruta_imagen))
+        self.imagen_gris = cargar_imagen_unicode(str(ruta_imagen))
+        self.imagen_color = cargar_imagen_unicode(str(ruta_imagen), color=True)
+        self.imagen_original = self.imagen_gris
         
         if self.imagen_original is None:
             messagebox.showerror(
@@ -43,6 +109,7 @@ class VentanaCompresionDCT:
         
         self.coeficientes_dct = None
         self.dct_completa = None
+        self.curva = None
         self.forma_original = None
         self.imagen_comprimida = None
         self.num_coefs_eliminados = 0
@@ -52,6 +119,9 @@ class VentanaCompresionDCT:
         
         self.resultados_porcentajes = {}
         self.porcentajes_procesados = []
+        self.cache = CacheLRU()
+        self.decodificadores = {}
+        self.formas_planos = None
         
         self.ventana = tk.Toplevel(parent)
         self.ventana.title("Compresión de Imágenes mediante DCT-2D")
@@ -110,6 +180,33 @@ class VentanaCompresionDCT:
             font=('Segoe UI', 9)
         ).pack(side=tk.LEFT, padx=8)
         
+        self.var_color = tk.BooleanVar(value=False)
+        self.var_submuestreo = tk.BooleanVar(value=True)
+        
+        tk.Checkbutton(
+            frame_botones2,
+            text="Color (YCbCr)",
+            variable=self.var_color,
+            bg='#2c3e50',
+            fg='white',
+            selectcolor='#34495e',
+            activebackground='#2c3e50',
+            activeforeground='white',
+            font=('Segoe UI', 10)
+        ).pack(side=tk.LEFT, padx=5)
+        
+        tk.Checkbutton(
+            frame_botones2,
+            text="Submuestreo 4:2:0",
+            variable=self.var_submuestreo,
+            bg='#2c3e50',
+            fg='white',
+            selectcolor='#34495e',
+            activebackground='#2c3e50',
+            activeforeground='white',
+            font=('Segoe UI', 10)
+        ).pack(side=tk.LEFT, padx=5)
+        
         self.btn_comprimir = tk.Button(
             frame_botones2,
             text="Procesar",
@@ -136,7 +233,7 @@ class VentanaCompresionDCT:
         
         fig = Figure(figsize=(10, 7), dpi=100)
         ax = fig.add_subplot(1, 1, 1)
-        ax.imshow(self.imagen_original, cmap='gray', interpolation='nearest')
+        ax.imshow(self.imagen_color, interpolation='nearest')
         ax.set_title("Imagen Original - Lista para Comprimir", fontsize=14, fontweight='bold', pad=10)
         ax.axis('on')
         ax.grid(True, alpha=0.3)
@@ -170,43 +267,23 @@ class VentanaCompresionDCT:
             self.btn_comprimir.config(state=tk.DISABLED)
             self.ventana.update()
             
-            from compresion_dct import aplicar_dct_bloques
-            print("Aplicando DCT-2D completa...")
-            self.dct_completa, _ = aplicar_dct_bloques(self.imagen_original)
+            self.porcentajes_procesados = sorted(porcentajes)
+            
+            color = self.var_color.get()
+            self.imagen_original = self.imagen_color if color else self.imagen_gris
             
             tabs = self.notebook.tabs()
             for tab in tabs[1:]:
                 self.notebook.forget(tab)
             
             self.resultados_porcentajes = {}
-            self.porcentajes_procesados = sorted(porcentajes)
+            self.cache.vaciar()
+            self.decodificadores = {}
             
-            for i, porcentaje in enumerate(self.porcentajes_procesados, 1):
-                print(f"\n[{i}/{len(self.porcentajes_procesados)}] Procesando {porcentaje}%...")
-                self.ventana.title(f"Compresión DCT - Procesando {i}/{len(self.porcentajes_procesados)} ({porcentaje}%)")
-                
-                coefs_dct, forma, num_eliminados = comprimir_imagen_dct(
-                    self.imagen_original, porcentaje, tamanio_bloque=8
-                )
-                
-                img_reconstruida = descomprimir_imagen_dct(
-                    coefs_dct, forma, tamanio_bloque=8
-                )
-                
-                total_coefs = coefs_dct.size
-                metricas = calcular_metricas_compresion(
-                    self.imagen_original,
-                    img_reconstruida,
-                    num_eliminados,
-                    total_coefs
-                )
-                
-                self.resultados_porcentajes[porcentaje] = {
-                    'coeficientes': coefs_dct,
-                    'imagen_reconstruida': img_reconstruida,
-                    'num_eliminados': num_eliminados,
-                    'metricas': metricas
-                }
+            if color:
+                self.procesar_color(self.var_submuestreo.get())
+            else:
+                self.procesar_gris()
             
             print("\nCreando pestañas...")
             self.crear_tab_resumen_general()
@@ -229,20 +306,271 @@ class VentanaCompresionDCT:
             import traceback
             traceback.print_exc()
     
+    def reconstruccion_inmediata(self):
+        h, w = self.imagen_original.shape[:2]
+        return h * w <= PIXELES_RECONSTRUCCION_INMEDIATA
+    
+    def procesar_gris(self):
+        print("Aplicando DCT-2D completa...")
+        reconstruir = self.reconstruccion_inmediata()
+        self.dct_completa, _, coeficientes_filtrados, *imagenes, self.curva = comprimir_imagen_dct_multiple(
+            self.imagen_original, self.porcentajes_procesados, tamanio_bloque=8, dispersos=True,
+            precision=PRECISION_IMAGENES, reconstruir=reconstruir, curva=True
+        )
+        
+        for i, porcentaje in enumerate(self.porcentajes_procesados, 1):
+            print(f"\n[{i}/{len(self.porcentajes_procesados)}] Procesando {porcentaje}%...")
+            self.ventana.title(f"Compresión DCT - Procesando {i}/{len(self.porcentajes_procesados)} ({porcentaje}%)")
+            
+            coefs_dct, num_eliminados = coeficientes_filtrados[porcentaje]
+            
+            total_coefs = coefs_dct.size
+            datos = {
+                'coeficientes': coefs_dct,
+                'num_eliminados': num_eliminados
+            }
+            if reconstruir:
+                datos['imagen_reconstruida'] = imagenes[0][porcentaje]
+                datos['metricas'] = calcular_metricas_compresion(
+                    self.imagen_original,
+                    datos['imagen_reconstruida'],
+                    num_eliminados,
+                    total_coefs
+                )
+            else:
+                datos['metricas'] = estimar_metricas_compresion(
+                    self.imagen_original, self.curva, num_eliminados, total_coefs
+                )
+            
+            self.resultados_porcentajes[porcentaje] = datos
+    
+    def procesar_color(self, submuestreo):
+        print(f"Aplicando DCT-2D por plano YCbCr{' (4:2:0)' if submuestreo else ''}...")
+        reconstruir = self.reconstruccion_inmediata()
+        dct_planos, formas_planos, coeficientes_filtrados, *imagenes, curvas_planos = comprimir_imagen_color_multiple(
+            self.imagen_original, self.porcentajes_procesados, tamanio_bloque=8,
+            submuestreo=submuestreo, dispersos=True, precision=PRECISION_IMAGENES, reconstruir=reconstruir,
+            curva=True
+        )
+        self.dct_completa = dct_planos['Y']
+        self.formas_planos = formas_planos
+        self.curva = curvas_planos['Y']
+        mse_base_planos = error_submuestreo_420(self.imagen_original) if submuestreo and not reconstruir else None
+        
+        for i, porcentaje in enumerate(self.porcentajes_procesados, 1):
+            print(f"\n[{i}/{len(self.porcentajes_procesados)}] Procesando {porcentaje}%...")
+            self.ventana.title(f"Compresión DCT - Procesando {i}/{len(self.porcentajes_procesados)} ({porcentaje}%)")
+            
+            coefs_planos = {nombre: coefs for nombre, (coefs, _) in coeficientes_filtrados[porcentaje].items()}
+            num_eliminados_planos = {nombre: n for nombre, (_, n) in coeficientes_filtrados[porcentaje].items()}
+            num_eliminados = sum(num_eliminados_planos.values())
+            
+            total_coefs = sum(coefs.size for coefs in coefs_planos.values())
+            datos = {
+                'coeficientes': coefs_planos['Y'],
+                'coeficientes_planos': coefs_planos,
+                'num_eliminados': num_eliminados
+            }
+            if reconstruir:
+                datos['imagen_reconstruida'] = imagenes[0][porcentaje]
+                datos['metricas'] = calcular_metricas_color(
+                    self.imagen_original,
+                    datos['imagen_reconstruida'],
+                    num_eliminados,
+                    total_coefs
+                )
+            else:
+                datos['metricas'] = estimar_metricas_color(
+                    self.imagen_original, curvas_planos, num_eliminados_planos, total_coefs,
+                    mse_base_planos=mse_base_planos
+                )
+            
+            self.resultados_porcentajes[porcentaje] = datos
+    
+    def decodificador_regiones(self, porcentaje):
+        if porcentaje not in self.decodificadores:
+            datos = self.resultados_porcentajes[porcentaje]
+            if 'coeficientes_planos' in datos:
+                decodificador = DecodificadorRegionesColor(
+                    datos['coeficientes_planos'], self.formas_planos, self.imagen_original.shape,
+                    tamanio_bloque=8, precision=PRECISION_IMAGENES
+                )
+            else:
+                decodificador = DecodificadorRegiones(
+                    datos['coeficientes'], self.imagen_original.shape, tamanio_bloque=8, precision=PRECISION_IMAGENES
+                )
+            self.decodificadores[porcentaje] = decodificador
+        return self.decodificadores[porcentaje]
+    
+    def actualizar_region_visible(self, ax, artista, decodificador):
+        x0, x1 = sorted(ax.get_xlim())
+        y0, y1 = sorted(ax.get_ylim())
+        columna_inicio, columna_fin = int(np.floor(x0 + 0.5)), int(np.ceil(x1 + 0.5))
+        fila_inicio, fila_fin = int(np.floor(y0 + 0.5)), int(np.ceil(y1 + 0.5))
+        
+        # Píxeles de imagen por punto de pantalla: fija la escala de decodificación
+        extension = ax.get_window_extent()
+        pixeles_por_punto = min(
+            (columna_fin - columna_inicio) / max(1.0, extension.width),
+            (fila_fin - fila_inicio) / max(1.0, extension.height),
+        )
+        factor = decodificador.factor_para_escala(pixeles_por_punto)
+        
+        imagen, (f0, f1, c0, c1) = decodificador.region(fila_inicio, fila_fin, columna_inicio, columna_fin, factor)
+        if imagen.size == 0:
+            return
+        artista.set_data(imagen)
+        artista.set_extent((c0 - 0.5, c1 - 0.5, f1 - 0.5, f0 - 0.5))
+    
+    def mostrar_reconstruccion_visible(self, ax, porcentaje):
+        # Solo se decodifican los bloques que cortan los límites actuales del eje, a la
+        # escala de pantalla; zoom y desplazamiento piden los bloques que falten
+        decodificador = self.decodificador_regiones(porcentaje)
+        h, w = self.imagen_original.shape[:2]
+        artista = ax.imshow(np.zeros((1, 1), dtype=np.uint8), cmap='gray', vmin=0, vmax=255,
+                            interpolation='nearest', extent=(-0.5, w - 0.5, h - 0.5, -0.5))
+        ax.set_xlim(-0.5, w - 0.5)
+        ax.set_ylim(h - 0.5, -0.5)
+        ax.set_autoscale_on(False)
+        self.actualizar_region_visible(ax, artista, decodificador)
+        
+        pendiente = {'id': None}
+        
+        def actualizar():
+            pendiente['id'] = None
+            self.actualizar_region_visible(ax, artista, decodificador)
+            ax.figure.canvas.draw_idle()
+        
+        def programar(*_):
+            # xlim y ylim cambian juntos en cada zoom: una sola actualización por evento
+            if pendiente['id'] is None:
+                pendiente['id'] = self.ventana.after_idle(actualizar)
+        
+        ax.callbacks.connect('xlim_changed', programar)
+        ax.callbacks.connect('ylim_changed', programar)
+        ax.figure.canvas.mpl_connect('resize_event', programar)
+        return artista
+    
+    def mapa_log(self, clave, obtener_coeficientes):
+        return self.cache.obtener(
+            (clave, 'mapa_log'),
+            lambda: np.log1p(np.abs(obtener_coeficientes())).astype(np.float32)
+        )
+    
+    def luminancia(self, imagen):
+        if imagen.ndim == 3:
+            return rgb_a_planos_ycbcr(imagen, submuestreo=False)['Y']
+        return imagen
+    
+    def flujo_comprimido(self, porcentaje):
+        # El flujo entrópico se codifica al pedirlo (tamaño, guardado) y vive en la caché;
+        # el tamaño queda en las métricas
+        datos = self.resultados_porcentajes[porcentaje]
+        flujo = self.cache.obtener((porcentaje, 'flujo'), lambda: self.codificar_porcentaje(datos))
+        if 'bytes' not in datos['metricas']:
+            bytes_comprimidos = len(flujo) if isinstance(flujo, bytes) else sum(len(f) for f in flujo.values())
+            datos['metricas'].update(metricas_tamanio(self.imagen_original, bytes_comprimidos))
+        return flujo
+    
+    def codificar_porcentaje(self, datos):
+        if 'coeficientes_planos' in datos:
+            return {
+                nombre: codificar_coeficientes(datos['coeficientes_planos'][nombre], self.formas_planos[nombre],
+                                               tamanio_bloque=8)
+                for nombre in PLANOS_YCBCR
+            }
+        return codificar_coeficientes(datos['coeficientes'], self.imagen_original.shape, tamanio_bloque=8)
+    
+    def imagen_reconstruida(self, porcentaje):
+        datos = self.resultados_porcentajes[porcentaje]
+        if 'imagen_reconstruida' in datos:
+            return datos['imagen_reconstruida']
+        # Imagen grande: se decodifica completa solo cuando se pide y vive en la caché;
+        # la primera decodificación sustituye las métricas estimadas por las medidas
+        return self.cache.obtener((porcentaje, 'imagen'), lambda: self.decodificar_completa(porcentaje))
+    
+    def decodificar_completa(self, porcentaje):
+        datos = self.resultados_porcentajes[porcentaje]
+        metricas = datos['metricas']
+        if 'coeficientes_planos' in datos:
+            imagen = descomprimir_imagen_color(
+                datos['coeficientes_planos'], self.formas_planos, self.imagen_original.shape,
+                tamanio_bloque=8, precision=PRECISION_IMAGENES
+            )
+            medir = calcular_metricas_color
+        else:
+            imagen = reconstruir_plano_dct(
+                datos['coeficientes'], self.imagen_original.shape, tamanio_bloque=8, precision=PRECISION_IMAGENES
+            )
+            imagen = np.clip(np.rint(imagen), 0, 255).astype(np.uint8)
+            medir = calcular_metricas_compresion
+        if metricas.get('estimada'):
+            datos['metricas'] = medir(
+                self.imagen_original, imagen, metricas['coefs_eliminados'], metricas['total_coefs'],
+                bytes_comprimidos=metricas.get('bytes')
+            )
+        return imagen
+    
+    def mapa_diferencia(self, porcentaje):
+        diferencia = np.abs(
+            self.imagen_original.astype(np.float32) - self.imagen_reconstruida(porcentaje).astype(np.float32)
+        )
+        if diferencia.ndim == 3:
+            diferencia = diferencia.mean(axis=2)
+        return diferencia
+    
+    def dibujar_diferencia(self, fig, ax, porcentaje):
+        diferencia = self.cache.obtener((porcentaje, 'diferencia'), lambda: self.mapa_diferencia(porcentaje))
+        im = ax.imshow(diferencia, cmap='hot', interpolation='nearest')
+        cbar = fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+        cbar.set_label('Error', rotation=270, labelpad=15, fontsize=8)
+    
+    def texto_metricas(self, metricas):
+        estimada = " (est.)" if metricas.get('estimada') else ""
+        texto = (
+            f"PSNR{estimada}: {metricas['psnr']:.2f} dB   |   "
+            f"MSE{estimada}: {metricas['mse']:.2f}   |   "
+            f"Compresión: {metricas['tasa_compresion']:.2f}%   |   "
+            + (f"Archivo: {metricas['bytes']:,} bytes ({metricas['bpp']:.3f} bpp)" if 'bytes' in metricas
+               else "Archivo: sin codificar")
+        )
+        if 'canales' in metricas:
+            texto += f"   |   PSNR{estimada} " + " / ".join(
+                f"{nombre} {canal['psnr']:.1f}" for nombre, canal in metricas['canales'].items()
+            ) + " dB"
+        return texto
+    
+    def medir_porcentaje(self, porcentaje, fig, ax, canvas, etiqueta, boton):
+        try:
+            self.flujo_comprimido(porcentaje)
+            if not ax.images:
+                self.dibujar_diferencia(fig, ax, porcentaje)
+                for texto in list(ax.texts):
+                    texto.remove()
+                canvas.draw_idle()
+            etiqueta.config(text="(x, y) = (coordenada del mouse)   |   " + self.texto_metricas(
+                self.resultados_porcentajes[porcentaje]['metricas']
+            ))
+            boton.config(state=tk.DISABLED)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al medir la reconstrucción:\n{str(e)}")
+            import traceback
+            traceback.print_exc()
+    
     def crear_tab_resumen_general(self):
         tab = tk.Frame(self.notebook, bg='white')
         self.notebook.add(tab, text="Resumen general")
         
-        fig = Figure(figsize=(14, 7), dpi=100)
+        fig = Figure(figsize=(18, 7), dpi=100)
         
-        ax1 = fig.add_subplot(1, 2, 1)
+        ax1 = fig.add_subplot(1, 3, 1)
         ax1.imshow(self.imagen_original, cmap='gray', interpolation='nearest')
         ax1.set_title('Imagen original', fontsize=12, fontweight='bold', pad=10)
         ax1.axis('on')
         ax1.grid(True, alpha=0.3, linestyle=':', linewidth=0.5)
         
-        ax2 = fig.add_subplot(1, 2, 2)
-        dct_log_completo = np.log1p(np.abs(self.dct_completa))
+        ax2 = fig.add_subplot(1, 3, 2)
+        dct_log_completo = self.mapa_log('completa', lambda: self.dct_completa)
         im2 = ax2.imshow(dct_log_completo, cmap='hot', interpolation='nearest', aspect='auto')
         ax2.set_title('Mapa DCT completa (log)', fontsize=12, fontweight='bold', pad=10)
         ax2.set_xlabel('Frecuencia horizontal', fontsize=10)
@@ -251,6 +579,24 @@ class VentanaCompresionDCT:
         cbar2 = fig.colorbar(im2, ax=ax2, fraction=0.046, pad=0.04)
         cbar2.set_label('log(1+|DCT|)', rotation=270, labelpad=15, fontsize=9)
         
+        # Curva completa sin ninguna IDCT adicional: error = energía de los coeficientes anulados
+        curva = self.cache.obtener(('completa', 'curva'), lambda: self.curva.evaluar(np.linspace(0, 100, 1001)))
+        color = self.imagen_original.ndim == 3
+        ax3 = fig.add_subplot(1, 3, 3)
+        ax3.plot(curva['porcentajes'], curva['psnr'], color='#2980b9', linewidth=1.5, label='Estimado (Parseval)')
+        medidos = [
+            (p, metricas['canales']['Y']['psnr'] if color else metricas['psnr'])
+            for p, metricas in ((p, self.resultados_porcentajes[p]['metricas']) for p in self.porcentajes_procesados)
+            if not metricas.get('estimada')
+        ]
+        if medidos:
+            ax3.plot(*zip(*medidos), 'o', color='#c0392b', label='Medido')
+        ax3.set_title(f"Curva tasa-distorsión{' (plano Y)' if color else ''}", fontsize=12, fontweight='bold', pad=10)
+        ax3.set_xlabel('% coeficientes eliminados', fontsize=10)
+        ax3.set_ylabel('PSNR (dB)', fontsize=10)
+        ax3.grid(True, alpha=0.3, linestyle=':', linewidth=0.5)
+        ax3.legend(fontsize=9)
+        
         fig.tight_layout(pad=2.0)
         
         canvas = FigureCanvasTkAgg(fig, tab)
@@ -278,13 +624,13 @@ class VentanaCompresionDCT:
         ax1.grid(True, alpha=0.3, linestyle=':', linewidth=0.5)
         
         ax2 = fig.add_subplot(2, 2, 2)
-        ax2.imshow(datos['imagen_reconstruida'], cmap='gray', interpolation='nearest')
+        self.mostrar_reconstruccion_visible(ax2, porcentaje)
         ax2.set_title(f'Reconstruida ({porcentaje:.1f}% coef. eliminados)', fontsize=11, fontweight='bold', pad=8)
         ax2.axis('on')
         ax2.grid(True, alpha=0.3, linestyle=':', linewidth=0.5)
         
         ax3 = fig.add_subplot(2, 2, 3)
-        dct_log = np.log1p(np.abs(datos['coeficientes']))
+        dct_log = self.mapa_log(porcentaje, datos['coeficientes'].densificar)
         im3 = ax3.imshow(dct_log, cmap='hot', interpolation='nearest', aspect='auto')
         ax3.set_title('Mapa DCT filtrada (log)', fontsize=11, fontweight='bold', pad=8)
         ax3.set_xlabel('Frecuencia horizontal', fontsize=9)
@@ -294,14 +640,18 @@ class VentanaCompresionDCT:
         cbar3.set_label('log(1+|DCT|)', rotation=270, labelpad=15, fontsize=8)
         
         ax4 = fig.add_subplot(2, 2, 4)
-        diferencia = np.abs(self.imagen_original.astype(float) - datos['imagen_reconstruida'].astype(float))
-        im4 = ax4.imshow(diferencia, cmap='hot', interpolation='nearest')
         ax4.set_title('Diferencia absoluta |Original - Reconstruida|', fontsize=11, fontweight='bold', pad=8)
         ax4.set_xlabel('x', fontsize=9)
         ax4.set_ylabel('y', fontsize=9)
         ax4.grid(False)
-        cbar4 = fig.colorbar(im4, ax=ax4, fraction=0.046, pad=0.04)
-        cbar4.set_label('Error', rotation=270, labelpad=15, fontsize=8)
+        # Con métricas estimadas la reconstrucción completa aún no existe: la diferencia
+        # se calcula al pulsar "Medir"
+        estimada = datos['metricas'].get('estimada', False)
+        if estimada:
+            ax4.text(0.5, 0.5, 'Pulse "📏 Medir" para calcular', ha='center', va='center',
+                     transform=ax4.transAxes, fontsize=10, color='#7f8c8d')
+        else:
+            self.dibujar_diferencia(fig, ax4, porcentaje)
         
         fig.subplots_adjust(left=0.06, right=0.97, top=0.94, bottom=0.06, hspace=0.32, wspace=0.25)
         
@@ -318,29 +668,42 @@ class VentanaCompresionDCT:
         frame_info = tk.Frame(tab, bg='#34495e', pady=8)
         frame_info.pack(fill=tk.X, padx=0, pady=0, side=tk.BOTTOM)
         
-        metricas = datos['metricas']
-        
         frame_metricas = tk.Frame(frame_info, bg='#34495e')
         frame_metricas.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        info_texto = (
-            f"(x, y) = (coordenada del mouse)   |   "
-            f"PSNR: {metricas['psnr']:.2f} dB   |   "
-            f"MSE: {metricas['mse']:.2f}   |   "
-            f"Compresión: {metricas['tasa_compresion']:.2f}%"
-        )
+        info_texto = "(x, y) = (coordenada del mouse)   |   " + self.texto_metricas(datos['metricas'])
         
-        tk.Label(
+        etiqueta_metricas = tk.Label(
             frame_metricas,
             text=info_texto,
             bg='#34495e',
             fg='white',
             font=('Segoe UI', 10)
-        ).pack()
+        )
+        etiqueta_metricas.pack()
         
         frame_boton = tk.Frame(frame_info, bg='#34495e')
         frame_boton.pack(side=tk.RIGHT, padx=10)
         
+        # Medir codifica el flujo (tamaño y bpp) y, si hace falta, reconstruye y calcula la diferencia
+        if estimada or 'bytes' not in datos['metricas']:
+            boton_medir = tk.Button(
+                frame_boton,
+                text="📏 Medir",
+                bg='#e67e22',
+                fg='white',
+                font=('Segoe UI', 10, 'bold'),
+                padx=15,
+                pady=5,
+                cursor='hand2',
+                relief=tk.RAISED,
+                bd=2
+            )
+            boton_medir.config(command=lambda: self.medir_porcentaje(
+                porcentaje, fig, ax4, canvas, etiqueta_metricas, boton_medir
+            ))
+            boton_medir.pack(side=tk.LEFT, padx=5)
+        
         tk.Button(
             frame_boton,
             text="🔍 Ver Descompresión",
@@ -368,6 +731,63 @@ class VentanaCompresionDCT:
             relief=tk.RAISED,
             bd=2
         ).pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(
+            frame_boton,
+            text="🗜️ Guardar Comprimido",
+            command=lambda p=porcentaje: self.guardar_flujo_comprimido(p),
+            bg='#16a085',
+            fg='white',
+            font=('Segoe UI', 10, 'bold'),
+            padx=15,
+            pady=5,
+            cursor='hand2',
+            relief=tk.RAISED,
+            bd=2
+        ).pack(side=tk.LEFT, padx=5)
+    
+    def guardar_flujo_comprimido(self, porcentaje):
+        try:
+            datos = self.resultados_porcentajes.get(porcentaje)
+            if datos is None:
+                messagebox.showwarning("Advertencia", f"No hay datos para el porcentaje {porcentaje}%")
+                return
+            
+            ruta_guardar = filedialog.asksaveasfilename(
+                title=f"Guardar imagen comprimida ({porcentaje}%)",
+                defaultextension=".dctc",
+                filetypes=[
+                    ("Flujo DCT comprimido", "*.dctc"),
+                    ("Todos los archivos", "*.*")
+                ],
+                initialfile=f"imagen_comprimida_{porcentaje}pct.dctc"
+            )
+            
+            if ruta_guardar:
+                flujo_porcentaje = self.flujo_comprimido(porcentaje)
+                if isinstance(flujo_porcentaje, dict):
+                    # El formato .dctc es de un solo plano: un archivo por plano YCbCr
+                    base = Path(ruta_guardar)
+                    rutas = []
+                    for nombre, flujo in flujo_porcentaje.items():
+                        ruta_plano = base.with_name(f"{base.stem}_{nombre}{base.suffix}")
+                        guardar_comprimido(ruta_plano, flujo)
+                        rutas.append(str(ruta_plano))
+                    ruta_guardar = "\n".join(rutas)
+                else:
+                    guardar_comprimido(ruta_guardar, flujo_porcentaje)
+                messagebox.showinfo(
+                    "Éxito",
+                    f"Imagen comprimida guardada exitosamente:\n\n"
+                    f"{ruta_guardar}\n\n"
+                    f"Tamaño: {datos['metricas']['bytes']:,} bytes\n"
+                    f"Tasa: {datos['metricas']['bpp']:.3f} bits por píxel"
+                )
+                
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al guardar imagen comprimida:\n{str(e)}")
+            import traceback
+            traceback.print_exc()
     
     def guardar_imagen_descomprimida(self, porcentaje):
         try:
@@ -390,7 +810,9 @@ class VentanaCompresionDCT:
             )
             
             if ruta_guardar:
-                imagen_guardar = datos['imagen_reconstruida'].astype(np.uint8)
+                imagen_guardar = self.imagen_reconstruida(porcentaje).astype(np.uint8)
+                if imagen_guardar.ndim == 3:
+                    imagen_guardar = cv2.cvtColor(imagen_guardar, cv2.COLOR_RGB2BGR)
                 cv2.imwrite(ruta_guardar, imagen_guardar)
                 
                 messagebox.showinfo(
@@ -432,7 +854,10 @@ class VentanaCompresionDCT:
             frame_grafico.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
             
             from compresion_dct import aplicar_dct_bloques
-            dct_reconstruida, _ = aplicar_dct_bloques(datos['imagen_reconstruida'])
+            dct_log_reconstruida = self.mapa_log(
+                (porcentaje, 'reconstruida'),
+                lambda: aplicar_dct_bloques(self.luminancia(self.imagen_reconstruida(porcentaje)))[0]
+            )
             
             fig = Figure(figsize=(14, 9), dpi=100)
             
@@ -443,14 +868,14 @@ class VentanaCompresionDCT:
             ax1.grid(True, alpha=0.3, linestyle=':', linewidth=0.5)
             
             ax2 = fig.add_subplot(2, 2, 2)
-            ax2.imshow(datos['imagen_reconstruida'], cmap='gray', interpolation='nearest')
+            self.mostrar_reconstruccion_visible(ax2, porcentaje)
             ax2.set_title(f'Imagen Descomprimida (Reconstruida)\n({porcentaje:.1f}% coef. eliminados)', 
                          fontsize=11, fontweight='bold', pad=8)
             ax2.axis('on')
             ax2.grid(True, alpha=0.3, linestyle=':', linewidth=0.5)
             
             ax3 = fig.add_subplot(2, 2, 3)
-            dct_log_filtrado = np.log1p(np.abs(datos['coeficientes']))
+            dct_log_filtrado = self.mapa_log(porcentaje, datos['coeficientes'].densificar)
             im3 = ax3.imshow(dct_log_filtrado, cmap='hot', interpolation='nearest', aspect='auto')
             ax3.set_title(f'Mapa DCT Filtrada (log)\n({porcentaje:.1f}% eliminados)', 
                          fontsize=10, fontweight='bold', pad=8)
@@ -462,7 +887,6 @@ class VentanaCompresionDCT:
             cbar3.ax.tick_params(labelsize=7)
             
             ax4 = fig.add_subplot(2, 2, 4)
-            dct_log_reconstruida = np.log1p(np.abs(dct_reconstruida))
             im4 = ax4.imshow(dct_log_reconstruida, cmap='hot', interpolation='nearest', aspect='auto')
             ax4.set_title('Mapa DCT Reconstruida (log)\n(Después de aplicar IDCT)', 
                          fontsize=10, fontweight='bold', pad=8)
@@ -534,7 +958,9 @@ class VentanaCompresionDCT:
             frame_grafico.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
             
             from compresion_dct import aplicar_dct_bloques
-            dct_comprimida, _ = aplicar_dct_bloques(self.imagen_comprimida)
+            dct_log_descomprimida = self.mapa_log(
+                ('comprimida', 'reconstruida'), lambda: aplicar_dct_bloques(self.imagen_comprimida)[0]
+            )
             
             fig = Figure(figsize=(14, 9), dpi=100)
             
@@ -554,7 +980,7 @@ class VentanaCompresionDCT:
             ax2.grid(True, alpha=0.3, linestyle=':', linewidth=0.5)
             
             ax3 = fig.add_subplot(2, 2, 3)
-            dct_log_filtrado = np.log1p(np.abs(self.coeficientes_dct))
+            dct_log_filtrado = self.mapa_log('comprimida', lambda: self.coeficientes_dct)
             im3 = ax3.imshow(dct_log_filtrado, cmap='inferno', interpolation='nearest', aspect='auto')
             ax3.set_title(f'Mapa DCT Comprimida (log)\n({porcentaje:.1f}% eliminados)', 
                          fontsize=10, fontweight='bold', pad=8)
@@ -567,7 +993,6 @@ class VentanaCompresionDCT:
             cbar3.ax.tick_params(labelsize=7)
             
             ax4 = fig.add_subplot(2, 2, 4)
-            dct_log_descomprimida = np.log1p(np.abs(dct_comprimida))
             im4 = ax4.imshow(dct_log_descomprimida, cmap='inferno', interpolation='nearest', aspect='auto')
             ax4.set_title('Mapa DCT Descomprimida (log)\n(Después de IDCT-2D)', 
                          fontsize=10, fontweight='bold', pad=8)
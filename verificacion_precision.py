@@ -0,0 +1,96 @@
+import contextlib
+import io
+import sys
+
+import numpy as np
+import cv2
+
+from compresion_dct import comprimir_imagen_dct, descomprimir_imagen_dct, calcular_metricas_compresion
+from cifrado_arnold_frdct import cifrar_imagen_completo, descifrar_imagen_completo
+
+# Cotas aceptadas para float32 frente a float64
+DIFERENCIA_MAXIMA_PIXEL = 1
+DIFERENCIA_MAXIMA_MSE = 0.25
+ERROR_RELATIVO_MAXIMO_FRDCT = 1e-5
+PORCENTAJES_VERIFICACION = (0, 50, 90, 99)
+
+def imagen_sintetica(alto=512, ancho=640, semilla=0):
+    rng = np.random.default_rng(semilla)
+    y, x = np.mgrid[0:alto, 0:ancho]
+    imagen = 128 + 60 * np.sin(x / 23.0) + 50 * np.cos(y / 17.0) + rng.normal(0, 12, x.shape)
+    return np.clip(imagen, 0, 255).astype(np.uint8)
+
+def verificar_compresion(imagen, porcentajes=PORCENTAJES_VERIFICACION):
+    filas = []
+    for porcentaje in porcentajes:
+        resultados = {}
+        for precision in (np.float64, np.float32):
+            coefs, forma, eliminados = comprimir_imagen_dct(imagen, porcentaje, precision=precision)
+            reconstruida = descomprimir_imagen_dct(coefs, forma, precision=precision)
+            resultados[precision] = (
+                reconstruida,
+                calcular_metricas_compresion(imagen, reconstruida, eliminados, coefs.size),
+            )
+        
+        rec_64, met_64 = resultados[np.float64]
+        rec_32, met_32 = resultados[np.float32]
+        filas.append({
+            'porcentaje': porcentaje,
+            'psnr_64': met_64['psnr'],
+            'psnr_32': met_32['psnr'],
+            'diferencia_mse': abs(met_32['mse'] - met_64['mse']),
+            'diferencia_pixel': int(np.abs(rec_32.astype(int) - rec_64.astype(int)).max()),
+        })
+    return filas
+
+def verificar_cifrado(imagen, a=1, k=3, alpha=0.7):
+    resultados = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for precision in (np.float64, np.float32):
+            cifrado = cifrar_imagen_completo(imagen, a, k, alpha, precision=precision)
+            descifrada = descifrar_imagen_completo(cifrado['matriz_frdct'], a, k, alpha, precision=precision)
+            resultados[precision] = (cifrado['matriz_frdct'], descifrada)
+    
+    frdct_64, desc_64 = resultados[np.float64]
+    frdct_32, desc_32 = resultados[np.float32]
+    return {
+        'dtype_frdct': str(frdct_32.dtype),
+        'error_relativo_frdct': float(np.abs(frdct_32 - frdct_64).max() / np.abs(frdct_64).max()),
+        'diferencia_pixel': int(np.abs(desc_32.astype(int) - desc_64.astype(int)).max()),
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        imagen = cv2.imread(sys.argv[1], cv2.IMREAD_GRAYSCALE)
+        if imagen is None:
+            sys.exit(f"No se pudo leer la imagen: {sys.argv[1]}")
+    else:
+        imagen = imagen_sintetica()
+    
+    correcto = True
+    
+    print(f"\n{'='*64}")
+    print(f"Compresión DCT: float32 frente a float64 ({imagen.shape[1]}x{imagen.shape[0]})")
+    print(f"{'-'*64}")
+    print(f"{'%':>6}{'PSNR 64':>12}{'PSNR 32':>12}{'ΔMSE':>12}{'Δpíxel':>10}")
+    for fila in verificar_compresion(imagen):
+        dentro = (fila['diferencia_pixel'] <= DIFERENCIA_MAXIMA_PIXEL
+                  and fila['diferencia_mse'] <= DIFERENCIA_MAXIMA_MSE)
+        correcto &= dentro
+        print(f"{fila['porcentaje']:>6}{fila['psnr_64']:>12.3f}{fila['psnr_32']:>12.3f}"
+              f"{fila['diferencia_mse']:>12.4f}{fila['diferencia_pixel']:>10}  {'✓' if dentro else '✗'}")
+    
+    # Arnold es O(n²) por iteración en Python: se verifica sobre un recorte cuadrado
+    lado = min(128, *imagen.shape)
+    cifrado = verificar_cifrado(imagen[:lado, :lado])
+    dentro = (cifrado['error_relativo_frdct'] <= ERROR_RELATIVO_MAXIMO_FRDCT
+              and cifrado['diferencia_pixel'] <= DIFERENCIA_MAXIMA_PIXEL)
+    correcto &= dentro
+    print(f"{'-'*64}")
+    print(f"Cifrado Arnold + FrDCT ({lado}x{lado}, matriz {cifrado['dtype_frdct']})")
+    print(f"  error relativo FrDCT:     {cifrado['error_relativo_frdct']:.2e} (cota {ERROR_RELATIVO_MAXIMO_FRDCT:.0e})")
+    print(f"  diferencia descifrado:    {cifrado['diferencia_pixel']} niveles (cota {DIFERENCIA_MAXIMA_PIXEL})  "
+          f"{'✓' if dentro else '✗'}")
+    print(f"{'='*64}\n")
+    
+    sys.exit(0 if correcto else 1)